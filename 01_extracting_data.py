@@ -1,60 +1,42 @@
-import pandas as pd
-import json
-import numpy as np
+import os
+from extraction import extract_stream
+from instrumentation import span
+from storage import read_head
 
 # --- KONFIGURASI ---
 INPUT_FILENAME = 'raw_data.csv'
-OUTPUT_FILENAME = 'extracted_data.csv'
-LUAS_RUANGAN = 176.0
+OUTPUT_FILENAME = 'extracted_data.parquet'  # .csv / .feather juga bisa (selalu ditulis ulang penuh)
+CHUNK_SIZE = 200_000  # Jumlah baris raw yang diproses per batch (membatasi pemakaian RAM)
+INCREMENTAL = True  # Raw append-only: hanya baris setelah checkpoint yang diekstrak (False = ekstrak ulang penuh)
+CHECKPOINT_FILENAME = 'extraction_state.json'  # Offset raw + generation (dibaca 02 untuk reset state agregasi)
 
 print("="*50)
 print("🚀  EXTRACTING DATA IOT")
 print("="*50)
 
-# 1. LOAD DATA
-print(f"\n📂  [1/2] Membaca file: {INPUT_FILENAME}...")
-try:
-    df = pd.read_csv(INPUT_FILENAME)
-    print(f"    ✅ Berhasil! Ditemukan {len(df)} baris data mentah.")
-except FileNotFoundError:
+# 1. CEK DATA
+print(f"\n📂  [1/2] Membaca file: {INPUT_FILENAME} (streaming, {CHUNK_SIZE:,} baris/chunk)...")
+if not os.path.exists(INPUT_FILENAME):
     print(f"    ❌ Error: File '{INPUT_FILENAME}' tidak ditemukan!")
     exit()
 
 # 2. EKSTRAKSI FITUR
 print("\n⚙️   [2/2] Mengekstrak data JSON (Payload)...")
 
-def extract_features(row):
-    try:
-        # Menangani string JSON yang menggunakan tanda kutip tunggal
-        payload_raw = row['payload']
-        if isinstance(payload_raw, str):
-            data = json.loads(payload_raw.replace("'", '"'))
-        else:
-            data = payload_raw
-            
-        sensor_type = row['sensor_name']
-        result = {}
-            
-        if sensor_type == 'hvac':
-            result['temp'] = float(data.get('temp', np.nan))
-            result['hum'] = float(data.get('hum', np.nan))
-            result['noise'] = float(data.get('noise', np.nan))
-        elif sensor_type == 'lux-meter':
-            result['lux'] = float(data.get('light_level', np.nan))
-        return pd.Series(result)
-    except Exception:
-        return pd.Series({})
+def report_progress(rows, elapsed):
+    print(f"    ⏳ {rows:,} baris diproses ({rows / max(elapsed, 1e-9):,.0f} baris/detik)")
 
-df_extracted = df.apply(extract_features, axis=1)
-
-df_combined = pd.concat([df['timestamp'], df_extracted], axis=1)
-df_combined['timestamp'] = pd.to_datetime(df_combined['timestamp'])
-df_combined = df_combined.sort_values('timestamp')
-
-df_combined.to_csv(OUTPUT_FILENAME, index=False)
+with span('extract', chunksize=CHUNK_SIZE, incremental=INCREMENTAL) as s:
+    stats = extract_stream(INPUT_FILENAME, OUTPUT_FILENAME, chunksize=CHUNK_SIZE, on_chunk=report_progress,
+                           checkpoint_path=CHECKPOINT_FILENAME, resume=INCREMENTAL)
+    s.rows_in = s.rows_out = stats['rows']
+    s.set(total_rows=stats['total_rows'], resumed=stats['resumed'], generation=stats['generation'])
+if INCREMENTAL and not stats['resumed']:
+    print("    ♻️ Belum ada checkpoint / raw ditulis ulang, ekstraksi dari awal.")
 
 print("\n" + "="*50)
-print(f"✅  SELESAI! Total baris : {len(df_combined)}. Preview 5 baris teratas: ")
+print(f"✅  SELESAI! Baris baru : {stats['rows']:,} dalam {stats['seconds']:.2f} detik "
+      f"({stats['rows_per_sec']:,.0f} baris/detik), total {stats['total_rows']:,} baris. Preview 5 baris teratas: ")
 print("="*50)
-print(df_combined.head(5))
-print("\n")
\ No newline at end of file
+print(read_head(OUTPUT_FILENAME, 5))
+print("\n")
@@ -1,52 +1,81 @@
-import pandas as pd
-import os
+import aggregation
+import extraction
+import storage
+from instrumentation import span
 
 # --- KONFIGURASI ---
-INPUT_FILENAME = 'extracted_data.csv'
-OUTPUT_FILENAME = 'clean_data.csv'
+INPUT_FILENAME = 'extracted_data.parquet'
+OUTPUT_FILENAME = 'clean_data.parquet'  # Folder part per hari; .csv / .feather juga bisa (ditulis ulang penuh)
 THRESHOLD_RATIO = 0.3
+INCREMENTAL = True  # False = hitung ulang dari seluruh data (state direset)
+STATE_FILENAME = 'aggregation_state.parquet'  # Folder partisi sum/count per hari
+CHECKPOINT_FILENAME = 'aggregation_state.json'
+EXTRACT_CHECKPOINT_FILENAME = 'extraction_state.json'  # Checkpoint 01: generation berubah -> state direset
+CHUNK_SIZE = 500_000
+GAP_FILENAME = 'gap_intervals.parquet'  # Tabel interval gap hasil deteksi otomatis (dipakai 03)
+SHORT_GAP_S = 300  # Gap <= ini (detik) diinterpolasi di 03, lebih panjang diisi data sintetis
 
 print("="*50)
 print("🧹   CLEANING & AGGREGATION")
 print("="*50)
 
-# 1. LOAD DATA
-if not os.path.exists(INPUT_FILENAME):
+# 1. CEK DATA
+if not storage.exists(INPUT_FILENAME):
     print(f"❌ Error: File '{INPUT_FILENAME}' tidak ditemukan!")
     exit()
 
-df = pd.read_csv(INPUT_FILENAME)
-df['timestamp'] = pd.to_datetime(df['timestamp'])
-
 # 2. AGGREGATION
 print("\n⚙️   [1/3] Melakukan Aggregasi per Detik (Tanpa mengisi gap)...")
-df['timestamp'] = df['timestamp'].dt.floor('S')
-df_clean = df.groupby('timestamp').mean()
+state = aggregation.AggregationState.load(STATE_FILENAME, CHECKPOINT_FILENAME) if INCREMENTAL \
+    else aggregation.AggregationState()
+rows_before = state.rows_consumed
+with span('aggregate', incremental=INCREMENTAL) as s:
+    new_rows = aggregation.update_state(state, storage.resolve_path(INPUT_FILENAME), chunksize=CHUNK_SIZE,
+                                        generation=extraction.generation(EXTRACT_CHECKPOINT_FILENAME))
+    s.rows_in = new_rows
+    s.set(buckets=state.n_buckets, rows_consumed=state.rows_consumed, partitions_changed=len(state.changed))
+if state.rows_consumed == new_rows and rows_before > 0:
+    print("    ♻️ File input berubah total, state dibangun ulang dari awal.")
+print(f"    ➕ Baris baru diproses: {new_rows:,} (total sejak awal: {state.rows_consumed:,}), "
+      f"{len(state.changed)} dari {len(state.partitions)} partisi harian berubah")
 
 # 3. MISSING VALUE
-total_rows = len(df_clean)
-rows_with_nan = df_clean.isnull().any(axis=1).sum()
-missing_percentage = rows_with_nan / total_rows if total_rows > 0 else 0
-
-print(f"    📊 Total Baris: {total_rows}")
-print(f"    ⚠️ Baris dengan NaN: {rows_with_nan} ({missing_percentage:.1%})")
+print("\n⚙️   [2/3] Menentukan penanganan Missing Value...")
+print(f"    📊 Total Baris: {state.n_buckets}")
+print(f"    ⚠️ Baris dengan NaN: {state.n_incomplete} ({state.missing_ratio:.1%})")
 
-if missing_percentage < THRESHOLD_RATIO:
+# Output ditulis per partisi harian: hanya partisi yang berubah (kecuali keputusan berubah / FILL MEDIAN)
+with span('missing_value', rows_in=state.n_buckets) as s:
+    decision, written = aggregation.finalize(state, THRESHOLD_RATIO, OUTPUT_FILENAME)
+    s.rows_out = storage.count_rows(OUTPUT_FILENAME)
+    s.set(decision=decision, incomplete=state.n_incomplete, partitions_written=written)
+if decision == 'drop':
     print(f"\n Karena Missing Value < {THRESHOLD_RATIO*100}%, keputusan: DROP ROWS")
-    df_final = df_clean.dropna()   
 else:
     print(f"\n Karena Missing Value >= {THRESHOLD_RATIO*100}%, keputusan: FILL MEDIAN")
-    median_vals = df_clean.median(numeric_only=True)
-    df_final = df_clean.fillna(median_vals)
+print(f"    📝 {OUTPUT_FILENAME}: {written} dari {len(state.partitions)} partisi harian ditulis ulang")
+if INCREMENTAL:
+    state.save(CHECKPOINT_FILENAME)
 
-df_final = df_final.reset_index()
+# Detik tanpa data sama sekali -> tabel interval gap, tanpa konstanta per outage.
+# Dideteksi dari bucket state (sebelum drop): detik yang di-drop karena NaN bukan gap, jadi tidak diisi ulang di 03
+bucket_ts = state.timestamps()
+with span('detect_gaps', rows_in=len(bucket_ts)) as s:
+    gaps = aggregation.detect_gaps(bucket_ts, short_gap_s=SHORT_GAP_S)
+    s.rows_out = len(gaps)
+    s.set(short=int((gaps['kind'] == 'short').sum()), long=int((gaps['kind'] == 'long').sum()))
+for kind, label in (('short', f'pendek (<= {SHORT_GAP_S} detik, interpolasi)'), ('long', 'panjang (data sintetis)')):
+    part = gaps[gaps['kind'] == kind]
+    print(f"    🕳️ Gap {label}: {len(part):,} interval, {part['seconds'].sum():,.0f} detik")
 
 # 4. SAVE
-print(f"\n💾  [3/3] Menyimpan hasil ke: {OUTPUT_FILENAME}...")
-df_final.to_csv(OUTPUT_FILENAME, index=False)
+print(f"\n💾  [3/3] Menyimpan tabel gap ke: {GAP_FILENAME}...")
+with span('save', rows_in=len(gaps)) as s:
+    storage.save_frame(gaps, GAP_FILENAME)
+    s.rows_out = len(gaps)
 
 print("\n" + "="*50)
 print("✅  SELESAI!")
 print("="*50)
-print(df_final.head(10))
-print("\n")
\ No newline at end of file
+print(storage.read_head(OUTPUT_FILENAME, 10))
+print("\n")
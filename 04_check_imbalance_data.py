@@ -1,27 +1,37 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-import os
+import storage
+import summary_cube
+from instrumentation import span
 
 # --- KONFIGURASI ---
-FILENAME = 'train_data.csv'
-
-print(f"📂 Membaca file '{FILENAME}'...")
-if not os.path.exists(FILENAME):
-    print("❌ File tidak ditemukan! Generate dulu datanya.")
-    exit()
-
-df = pd.read_csv(FILENAME)
+CUBE_FILENAME = 'summary_cube.parquet'  # Ditulis 03 bersama train_data
+FILENAME = 'train_data.parquet'         # Fallback jika cube belum ada
+ROOM_ID = None                          # None = semua ruangan di cube (cube 03 = ruangan di train_data)
+
+with span('load') as s:
+    cube = summary_cube.load(CUBE_FILENAME)
+    if cube is not None:
+        print(f"📂 Membaca summary cube '{CUBE_FILENAME}' ({len(cube):,} baris)...")
+        counts = summary_cube.status_counts(cube, ROOM_ID)
+    elif storage.exists(FILENAME):
+        print(f"📂 Cube belum ada, membaca file '{FILENAME}'...")
+        counts = storage.load_frame(FILENAME, columns=['status'])['status'].astype(str).value_counts()
+    else:
+        print("❌ File tidak ditemukan! Generate dulu datanya.")
+        exit()
+    s.rows_out = int(counts.sum())
 
 plt.figure(figsize=(12, 6))
 sns.set_style("whitegrid")
 
-ax = sns.countplot(
-    x='status', 
-    data=df, 
-    order=df['status'].value_counts().index, 
+# Jumlah per status sudah dihitung (cube), jadi barplot langsung dari counts
+ax = sns.barplot(
+    x=counts.index,
+    y=counts.to_numpy(),
+    order=counts.index,
     palette='viridis',
-    hue='status', 
+    hue=counts.index,
     legend=False
 )
 
@@ -32,7 +42,7 @@ plt.ylabel('Jumlah Data', fontsize=12)
 plt.xticks(rotation=45)
 
 # --- MENAMBAHKAN LABEL ANGKA & PERSENTASE ---
-total = len(df)
+total = counts.sum()
 for container in ax.containers:
     labels = [f'{v.get_height()} ({v.get_height()/total*100:.1f}%)' for v in container]
     ax.bar_label(container, labels=labels, padding=3, fontsize=10)
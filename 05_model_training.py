@@ -4,10 +4,13 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import time
 import warnings
+import model_benchmark
+import storage
+from temporal_features import feature_names
+from instrumentation import span
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.metrics import accuracy_score, f1_score, mean_absolute_error, r2_score, mean_squared_error
-from sklearn.multioutput import MultiOutputRegressor
 
 # --- IMPORT 4 MODEL ---
 from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
@@ -18,22 +21,37 @@ from sklearn.neighbors import KNeighborsClassifier, KNeighborsRegressor
 warnings.filterwarnings('ignore')
 
 # --- KONFIGURASI ---
-INPUT_FILENAME = 'train_data.csv' 
+INPUT_FILENAME = 'train_data.parquet'
+USE_TEMPORAL_FEATURES = False  # True -> tambah fitur temporal dari feature_engineering.py
+TEMPORAL_FILENAME = 'train_features.parquet'
+USE_COMPACTED = False  # True -> data compact dari steady_state_compaction.py, kolom `weight` jadi sample_weight
+COMPACT_FILENAME = 'train_compact.parquet'
+CORE_BUDGET = model_benchmark.default_core_budget()  # Total thread untuk semua job yang berjalan bersamaan
 
 # --- 1. PERSIAPAN DATA ---
 print("📂 Loading Data...")
-if 'timestamp' in pd.read_csv(INPUT_FILENAME).columns:
-    df = pd.read_csv(INPUT_FILENAME)
-else:
-    print("File tidak ditemukan atau format salah"); exit()
-
 # FITUR
 features = ['occupancy', 'temp', 'hum', 'lux', 'noise', 'luas']
+if USE_TEMPORAL_FEATURES:
+    INPUT_FILENAME = TEMPORAL_FILENAME
+    features = features + feature_names()
+targets  = ['status', 'energy_kwh', 'pmv', 'ppd']
+if USE_COMPACTED:
+    INPUT_FILENAME = COMPACT_FILENAME
+    targets = targets + ['weight']
+
+if not storage.exists(INPUT_FILENAME) or not set(features + targets) <= set(storage.read_columns(INPUT_FILENAME)):
+    print("File tidak ditemukan atau format salah"); exit()
+with span('load') as s:
+    df = storage.load_frame(INPUT_FILENAME, columns=features + targets, compact=True)  # Hanya kolom yang dipakai
+    s.rows_out = len(df)
+
 X = df[features]
 
 # TARGET
 y_status = df['status']
 y_reg    = df[['energy_kwh', 'pmv', 'ppd']]
+weight   = df['weight'].to_numpy() if USE_COMPACTED else None  # Jumlah baris asli per baris compact
 
 # Encode Status ke Angka
 le = LabelEncoder()
@@ -42,83 +60,99 @@ print(f"   Label Mapping: {dict(zip(le.classes_, le.transform(le.classes_)))}")
 
 # Split Data (Stratified)
 print("✂️ Splitting Data (80/20)...")
-X_train_raw, X_test_raw, y_stat_train, y_stat_test, y_reg_train, y_reg_test = train_test_split(
-    X, y_status_enc, y_reg, test_size=0.2, random_state=42, stratify=y_status_enc
+X_train_raw, X_test_raw, y_stat_train, y_stat_test, y_reg_train, y_reg_test, w_train, w_test = train_test_split(
+    X, y_status_enc, y_reg, weight if USE_COMPACTED else np.ones(len(X)),
+    test_size=0.2, random_state=42, stratify=y_status_enc
 )
+if not USE_COMPACTED:
+    w_train = w_test = None
 
 # --- 2. SCALING ---
 print("⚖️ Melakukan Standardisasi Data...")
 scaler = StandardScaler()
 
 # Fit pada Training, Transform pada Training & Test
-X_train = scaler.fit_transform(X_train_raw)
+X_train = scaler.fit_transform(X_train_raw, sample_weight=w_train)
 X_test  = scaler.transform(X_test_raw)
 
 
 # --- 3. DEFINISI 4 MODEL ---
+# Setiap model berupa factory yang menerima jumlah thread hasil alokasi scheduler.
+# Tambah kandidat baru cukup dengan menambah dict di list ini (lihat model_benchmark.py).
 models = [
     {
         'name': 'Decision Tree',
-        'clf': DecisionTreeClassifier(random_state=42, class_weight='balanced'),
-        'reg': DecisionTreeRegressor(random_state=42)
+        'clf': lambda threads: DecisionTreeClassifier(random_state=42, class_weight='balanced'),
+        'reg': lambda threads: DecisionTreeRegressor(random_state=42),
+        'parallel': False, 'cost': 1
     },
     {
         'name': 'Random Forest',
-        'clf': RandomForestClassifier(n_estimators=50, random_state=42, class_weight='balanced', n_jobs=-1),
-        'reg': RandomForestRegressor(n_estimators=50, random_state=42, n_jobs=-1)
+        'clf': lambda threads: RandomForestClassifier(n_estimators=50, random_state=42, class_weight='balanced', n_jobs=threads),
+        'reg': lambda threads: RandomForestRegressor(n_estimators=50, random_state=42, n_jobs=threads),
+        'cost': 4
     },
     {
         'name': 'XGBoost',
-        'clf': XGBClassifier(eval_metric='mlogloss', random_state=42, n_jobs=-1),
-        'reg': MultiOutputRegressor(XGBRegressor(objective='reg:squarederror', random_state=42, n_jobs=-1))
+        'clf': lambda threads: XGBClassifier(eval_metric='mlogloss', random_state=42, n_jobs=threads),
+        # Satu job per target (pengganti MultiOutputRegressor yang melatih 3 regressor berurutan)
+        'reg': lambda threads: XGBRegressor(objective='reg:squarederror', random_state=42, n_jobs=threads),
+        'cost': 2, 'per_target': True
     },
     {
         'name': 'K-Nearest Neighbors (KNN)',
-        'clf': KNeighborsClassifier(n_neighbors=5, n_jobs=-1),
-        'reg': KNeighborsRegressor(n_neighbors=5, n_jobs=-1)
+        'clf': lambda threads: KNeighborsClassifier(n_neighbors=5, n_jobs=threads),
+        'reg': lambda threads: KNeighborsRegressor(n_neighbors=5, n_jobs=threads),
+        'cost': 2
     }
 ]
 
 # --- 4. TRAINING ---
 results = []
+reg_targets = list(y_reg.columns)
+jobs = model_benchmark.allocate_threads(model_benchmark.build_jobs(models, reg_targets), CORE_BUDGET)
+data = {'clf': (X_train, X_test, y_stat_train, y_stat_test),
+        'reg': (X_train, X_test, y_reg_train, y_reg_test), 'sample_weight': w_train}
 
-print("\n🥊 MULAI BENCHMARKING 4 MODEL...")
+print(f"\n🥊 MULAI BENCHMARKING {len(models)} MODEL ({len(jobs)} job, budget {CORE_BUDGET} core)...")
 print("="*90)
 
-for m in models:
-    print(f"⚙️  Sedang melatih {m['name']}...", end=" ")
-    start_time = time.time()
-    
-    # A. Latih Classifier (Status)
-    m['clf'].fit(X_train, y_stat_train)
-    pred_stat = m['clf'].predict(X_test)
-    
-    # B. Latih Regressor (Angka)
-    m['reg'].fit(X_train, y_reg_train)
-    pred_reg = m['reg'].predict(X_test)
-    
-    duration = time.time() - start_time
-    print(f"✅ Selesai ({duration:.2f} detik)")
-    
-    # C. Hitung Skor
+
+def report(job):
+    r = job.result
+    print(f"✅ {job.label:<40} {job.threads:>2} thread   fit {r['fit_s']:7.2f}s   predict {r['predict_s']:6.2f}s")
+
+
+wall_start = time.perf_counter()
+with span('benchmark', rows_in=len(X_train), jobs=len(jobs), core_budget=CORE_BUDGET):
+    model_benchmark.run_jobs(jobs, data, CORE_BUDGET, on_done=report)
+wall = time.perf_counter() - wall_start
+print(f"⏱️  Total waktu benchmark (wall): {wall:.2f} detik")
+
+for name, m in model_benchmark.collect_predictions(jobs, reg_targets).items():
+    pred_stat, pred_reg = m['pred_clf'], m['pred_reg']
+
+    # C. Hitung Skor (data compact: dibobot jumlah baris asli)
     # Klasifikasi
-    acc = accuracy_score(y_stat_test, pred_stat)
-    f1  = f1_score(y_stat_test, pred_stat, average='macro') 
+    acc = accuracy_score(y_stat_test, pred_stat, sample_weight=w_test)
+    f1  = f1_score(y_stat_test, pred_stat, average='macro', sample_weight=w_test)
     
     # Regresi (MAE, MSE, RMSE)
-    mae_avg = mean_absolute_error(y_reg_test, pred_reg)
-    mse_avg = mean_squared_error(y_reg_test, pred_reg)
+    mae_avg = mean_absolute_error(y_reg_test, pred_reg, sample_weight=w_test)
+    mse_avg = mean_squared_error(y_reg_test, pred_reg, sample_weight=w_test)
     rmse_avg = np.sqrt(mse_avg)                
-    r2_avg  = r2_score(y_reg_test, pred_reg)
+    r2_avg  = r2_score(y_reg_test, pred_reg, sample_weight=w_test)
     
     results.append({
-        'Model': m['name'],
+        'Model': name,
         'F1-Score (Status)': f1,        
         'Accuracy (Status)': acc,      
         'MAE (Angka)': mae_avg,
         'RMSE (Angka)': rmse_avg,
         'R2 Score (Angka)': r2_avg,     
-        'Waktu (s)': duration
+        'Fit (s)': m['fit_s'],
+        'Predict (s)': m['predict_s'],
+        'Waktu (s)': m['fit_s'] + m['predict_s']
     })
 
 # --- 5. TAMPILKAN HASIL ---
@@ -1,62 +1,240 @@
-import pandas as pd
 import joblib
 import os
+import tempfile
+import incremental_forest
+import out_of_core
+import storage
+from hyperparameter_search import load_best_params
+from temporal_features import feature_names
+from instrumentation import span
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
 from sklearn.metrics import classification_report, mean_absolute_error, r2_score
 
 # --- KONFIGURASI ---
-INPUT_FILENAME  = 'train_data.csv'
+INPUT_FILENAME  = 'train_data.parquet'
+USE_TEMPORAL_FEATURES = False  # True -> tambah fitur temporal dari feature_engineering.py
+TEMPORAL_FILENAME = 'train_features.parquet'
+USE_COMPACTED = False  # True -> data compact dari steady_state_compaction.py, kolom `weight` jadi sample_weight
+COMPACT_FILENAME = 'train_compact.parquet'
 MODEL_DIR       = 'models/'
+PARAMS_FILENAME = 'models/best_params.json'  # Hasil hyperparameter_search.py (opsional)
+DEFAULT_PARAMS  = {'n_estimators': 100}
+TRAINING_MODE   = 'full'   # 'full' = latih ulang semua data, 'incremental' = tambah pohon dari data baru saja,
+                           # 'out_of_core' = latih ulang semua data dibaca per chunk (data lebih besar dari RAM)
+CHUNK_SIZE      = 500_000  # out_of_core: baris per chunk (memori puncak ~ satu chunk + model)
+NEW_TREES       = 20       # incremental: pohon baru per model per update
+MAX_TREES       = 100      # incremental: batas ukuran ensemble, pohon tertua dipensiunkan
+RECENT_FRACTION = 0.2      # incremental: porsi data baru paling akhir untuk validasi
+MAX_SCORE_DROP  = 0.005    # incremental: update tidak dipromosikan jika skor recent window turun lebih dari ini
+RANDOM_SEED     = 42
 if not os.path.exists(MODEL_DIR): os.makedirs(MODEL_DIR)
 
-# 1. LOAD DATA
-print("📂 Loading Final Data...")
-df = pd.read_csv(INPUT_FILENAME)
+STATUS_MODEL, ENERGY_MODEL = 'rf_status_model', 'rf_energy_model'
+state = incremental_forest.load_state(MODEL_DIR) or {'models': {}}
+mode = TRAINING_MODE
+if mode == 'incremental' and not all(
+        name in state['models'] and os.path.exists(f'{MODEL_DIR}{name}.pkl') for name in (STATUS_MODEL, ENERGY_MODEL)):
+    print("⚠️ Belum ada model/state training sebelumnya, beralih ke training full.")
+    mode = 'full'
 
+# 1. LOAD DATA
+print(f"📂 Loading Final Data (mode {mode})...")
 # FITUR # Tanpa scaling karena model yang dipakai RF
 features = ['occupancy', 'temp', 'hum', 'lux', 'noise', 'luas']
-X = df[features]
+if USE_TEMPORAL_FEATURES:
+    # Fitur dihitung oleh temporal_features.TemporalFeatures, sama dengan jalur online (inference_server)
+    INPUT_FILENAME = TEMPORAL_FILENAME
+    features = features + feature_names()
+targets  = ['status', 'energy_kwh', 'pmv', 'ppd']
+if USE_COMPACTED:
+    INPUT_FILENAME = COMPACT_FILENAME
+    targets = targets + ['weight']
+reg_targets = ['energy_kwh', 'pmv', 'ppd']
+if mode == 'out_of_core':
+    # Data tidak dimuat: pass pertama hanya menghitung baris per kelas untuk split stratified
+    with span('scan', mode=mode) as s:
+        split = out_of_core.StratifiedSplit.scan(INPUT_FILENAME, 'status', test_size=0.2, seed=42, chunksize=CHUNK_SIZE)
+        s.rows_out = split.n_rows
+    print(f"   {split.n_rows:,} baris, dibaca per chunk {CHUNK_SIZE:,} baris")
+else:
+    # Incremental: hanya baris setelah data terakhir yang sudah dipakai model (paling lama di antara 2 model)
+    since = min(m['last_timestamp'] for m in state['models'].values()) if mode == 'incremental' else None
+    with span('load', mode=mode) as s:
+        df = storage.load_frame(INPUT_FILENAME, columns=['timestamp'] + features + targets, compact=True, since=since)
+        s.rows_out = len(df)
+    if mode == 'incremental':
+        print(f"   {len(df):,} baris baru sejak {since}")
+        if len(df) == 0:
+            print("✅ Tidak ada data baru, model tidak berubah.")
+            exit()
+    X = df[features]
+
+    # TARGET
+    y_class = df['status']
+    y_reg   = df[reg_targets]
+    weight  = df['weight'] if USE_COMPACTED else None  # Jumlah baris asli per baris compact
+
+if mode == 'full':
+    # SPLIT (Tetap split buat validasi terakhir)
+    print("✂️ Splitting Data...")
+    X_train, X_test, y_cls_train, y_cls_test, y_reg_train, y_reg_test = train_test_split(
+        X, y_class, y_reg, test_size=0.2, random_state=42, stratify=y_class
+    )
+    w_train = weight.loc[X_train.index].to_numpy() if USE_COMPACTED else None
+    w_test  = weight.loc[X_test.index].to_numpy() if USE_COMPACTED else None
+
+    # --- 2. TRAINING FINAL ---
+
+    # A. MODEL STATUS (Klasifikasi)
+    print("\n🌲 Melatih RANDOM FOREST CLASSIFIER (Status)...")
+    # Default n_estimators=100, atau parameter hasil tuning jika ada. class_weight='balanced' wajib.
+    clf_params = load_best_params('Random Forest', 'clf', PARAMS_FILENAME) or DEFAULT_PARAMS
+    print(f"   Parameter: {clf_params}")
+    clf = RandomForestClassifier(**clf_params, random_state=42, class_weight='balanced', n_jobs=-1)
+    with span('fit_status', rows_in=len(X_train)):
+        clf.fit(X_train, y_cls_train, sample_weight=w_train)
+
+    # Evaluasi Singkat
+    with span('eval_status', rows_in=len(X_test)) as s:
+        acc = clf.score(X_test, y_cls_test, sample_weight=w_test)
+        s.set(accuracy=acc)
+    print(f"   ✅ Akurasi Status: {acc*100:.4f}% (Sempurna)")
+
+    # B. MODEL METRIK (Regresi)
+    print("\n🌲 Melatih RANDOM FOREST REGRESSOR (kWh, PMV, PPD)...")
+    reg_params = load_best_params('Random Forest', 'reg', PARAMS_FILENAME) or DEFAULT_PARAMS
+    print(f"   Parameter: {reg_params}")
+    reg = RandomForestRegressor(**reg_params, random_state=42, n_jobs=-1)
+    with span('fit_energy', rows_in=len(X_train)):
+        reg.fit(X_train, y_reg_train, sample_weight=w_train)
 
-# TARGET
-y_class = df['status']                     
-y_reg   = df[['energy_kwh', 'pmv', 'ppd']] 
+    # Evaluasi Singkat
+    with span('eval_energy', rows_in=len(X_test)) as s:
+        r2 = reg.score(X_test, y_reg_test, sample_weight=w_test)
+        y_pred_reg = reg.predict(X_test)
+        mae = mean_absolute_error(y_reg_test, y_pred_reg, sample_weight=w_test)
+        s.set(r2=r2, mae=mae)
+    print(f"   ✅ R2 Score Angka: {r2:.4f} (Sangat Presisi)")
+    print(f"   ✅ Rata-rata Meleset (MAE): {mae:.5f}")
 
-# SPLIT (Tetap split buat validasi terakhir)
-print("✂️ Splitting Data...")
-X_train, X_test, y_cls_train, y_cls_test, y_reg_train, y_reg_test = train_test_split(
-    X, y_class, y_reg, test_size=0.2, random_state=42, stratify=y_class
-)
+    updates = {
+        STATUS_MODEL: {'model': clf, 'targets': None, 'promote': True, 'tree_versions': None,
+                       'info': {'score': {'accuracy': acc}, 'rows_train': len(X_train)}},
+        ENERGY_MODEL: {'model': reg, 'targets': reg_targets, 'promote': True, 'tree_versions': None,
+                       'info': {'score': {'r2': r2, 'mae': mae}, 'rows_train': len(X_train)}},
+    }
+elif mode == 'out_of_core':
+    # --- 2. TRAINING OUT-OF-CORE (pohon per bucket, split stratified streaming) ---
+    print(f"✂️ Split stratified streaming: {split.n_train:,} train, {split.n_test:,} test")
+    # Baris train diacak ke bucket sementara di MODEL_DIR (satu pass), dipakai kedua model.
+    # Folder bucket selalu dihapus, juga jika training gagal / dihentikan
+    with tempfile.TemporaryDirectory(prefix='buckets_', dir=MODEL_DIR) as bucket_dir:
+        with span('shuffle', rows_in=split.n_rows) as s:
+            buckets = out_of_core.shuffle_buckets(INPUT_FILENAME, features + targets, split, bucket_dir, CHUNK_SIZE)
+            s.set(buckets=len(buckets))
 
-# --- 2. TRAINING FINAL ---
+        def report(i, rows, trees):
+            print(f"   bucket {i + 1}/{len(buckets)}: {rows:,} baris train -> {trees} pohon")
 
-# A. MODEL STATUS (Klasifikasi)
-print("\n🌲 Melatih RANDOM FOREST CLASSIFIER (Status)...")
-# n_estimators=100 sudah cukup. class_weight='balanced' wajib.
-clf = RandomForestClassifier(n_estimators=100, random_state=42, class_weight='balanced', n_jobs=-1)
-clf.fit(X_train, y_cls_train)
+        print("\n🌲 Melatih RANDOM FOREST CLASSIFIER (Status) per bucket...")
+        clf_params = load_best_params('Random Forest', 'clf', PARAMS_FILENAME) or DEFAULT_PARAMS
+        print(f"   Parameter: {clf_params}")
+        clf = RandomForestClassifier(**clf_params, random_state=42, class_weight='balanced', n_jobs=-1)
+        with span('fit_status', rows_in=split.n_train):
+            clf = out_of_core.fit_forest(clf, buckets, features, ['status'], split.classes, on_chunk=report)
 
-# Evaluasi Singkat
-acc = clf.score(X_test, y_cls_test)
-print(f"   ✅ Akurasi Status: {acc*100:.4f}% (Sempurna)")
+        print("\n🌲 Melatih RANDOM FOREST REGRESSOR (kWh, PMV, PPD) per bucket...")
+        reg_params = load_best_params('Random Forest', 'reg', PARAMS_FILENAME) or DEFAULT_PARAMS
+        print(f"   Parameter: {reg_params}")
+        reg = RandomForestRegressor(**reg_params, random_state=42, n_jobs=-1)
+        with span('fit_energy', rows_in=split.n_train):
+            reg = out_of_core.fit_forest(reg, buckets, features, reg_targets, on_chunk=report)
 
-# B. MODEL METRIK (Regresi)
-print("\n🌲 Melatih RANDOM FOREST REGRESSOR (kWh, PMV, PPD)...")
-reg = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
-reg.fit(X_train, y_reg_train)
+    # Evaluasi streaming di baris test (dibobot `weight` jika data compact)
+    with span('eval', rows_in=split.n_test) as s:
+        scores = out_of_core.evaluate_models(INPUT_FILENAME, features, reg_targets, split,
+                                             clf.predict, reg.predict, CHUNK_SIZE)
+        s.set(**scores)
+    print(f"\n   ✅ Akurasi Status: {scores['accuracy']*100:.4f}%  (F1 macro {scores['f1_macro']:.5f})")
+    print(f"   ✅ R2 Score Angka: {scores['r2']:.4f}")
+    print(f"   ✅ Rata-rata Meleset (MAE): {scores['mae']:.5f}")
 
-# Evaluasi Singkat
-r2 = reg.score(X_test, y_reg_test)
-print(f"   ✅ R2 Score Angka: {r2:.4f} (Sangat Presisi)")
-y_pred_reg = reg.predict(X_test)
-mae = mean_absolute_error(y_reg_test, y_pred_reg)
-print(f"   ✅ Rata-rata Meleset (MAE): {mae:.5f}")
+    updates = {
+        STATUS_MODEL: {'model': clf, 'targets': None, 'promote': True, 'tree_versions': None,
+                       'info': {'score': {'accuracy': scores['accuracy'], 'f1_macro': scores['f1_macro']},
+                                'rows_train': split.n_train}},
+        ENERGY_MODEL: {'model': reg, 'targets': reg_targets, 'promote': True, 'tree_versions': None,
+                       'info': {'score': {'r2': scores['r2'], 'mae': scores['mae']}, 'rows_train': split.n_train}},
+    }
+else:
+    # --- 2. UPDATE INCREMENTAL (windowed tree replacement) ---
+    # Data baru dipisah menurut waktu: bagian paling akhir jadi validasi (recent window)
+    train_df, recent_df = incremental_forest.recent_split(df, RECENT_FRACTION)
+    print(f"✂️ {len(train_df):,} baris untuk pohon baru, {len(recent_df):,} baris recent window "
+          f"({recent_df['timestamp'].min()} s/d {recent_df['timestamp'].max()})")
+    tasks = [(STATUS_MODEL, 'Status', ['status'], None),
+             (ENERGY_MODEL, 'kWh, PMV, PPD', reg_targets, reg_targets)]
+    updates = {}
+    for name, label, cols, model_targets in tasks:
+        print(f"\n🌲 Update {name} ({label}): +{NEW_TREES} pohon, maks {MAX_TREES}...")
+        model_state = state['models'][name]
+        new = train_df[train_df['timestamp'] > model_state['last_timestamp']]
+        if len(new) == 0:
+            print("   Tidak ada data baru di luar recent window, dilewati.")
+            continue
+        y_new = new[cols[0]] if len(cols) == 1 else new[cols]
+        y_recent = recent_df[cols[0]] if len(cols) == 1 else recent_df[cols]
+        w_new = new['weight'].to_numpy() if USE_COMPACTED else None
+        w_recent = recent_df['weight'].to_numpy() if USE_COMPACTED else None
+        old = joblib.load(f'{MODEL_DIR}{name}.pkl')
+        with span('update', rows_in=len(new), model=name) as s:
+            score_before = old.score(recent_df[features], y_recent, sample_weight=w_recent)
+            version = model_state['version'] + 1
+            model, tree_versions, retired = incremental_forest.update_forest(
+                old, new[features], y_new, NEW_TREES, MAX_TREES, RANDOM_SEED + version,
+                model_state['tree_versions'], version, sample_weight=w_new)
+            score_after = model.score(recent_df[features], y_recent, sample_weight=w_recent)
+            promote = score_after >= score_before - MAX_SCORE_DROP
+            s.set(score_before=score_before, score_after=score_after, retired=retired, promoted=promote)
+        print(f"   {len(new):,} baris baru, {retired} pohon tertua dipensiunkan, {len(model.estimators_)} pohon")
+        print(f"   Skor recent window: {score_before:.5f} -> {score_after:.5f} "
+              f"{'✅ dipromosikan' if promote else '⚠️ TIDAK dipromosikan (skor turun)'}")
+        updates[name] = {'model': model, 'targets': model_targets, 'promote': promote, 'tree_versions': tree_versions,
+                         'info': {'score': {'recent_before': score_before, 'recent_after': score_after},
+                                  'rows_train': len(new), 'rows_recent': len(recent_df), 'retired': retired,
+                                  'parent_version': model_state['active_version']}}
 
 
 # --- 3. SIMPAN MODEL ---
 print("\n💾 Menyimpan Model Final...")
-joblib.dump(clf, f'{MODEL_DIR}rf_status_model.pkl')
-joblib.dump(reg, f'{MODEL_DIR}rf_energy_model.pkl')
+# Incremental: recent window belum dipakai melatih pohon, jadi ikut jadi data baru di update berikutnya
+if mode == 'out_of_core':
+    data_window = split.window
+    last_timestamp = split.window[1] if split.window else None
+else:
+    data_window = incremental_forest.time_window(df)
+    last_timestamp = str((df if mode == 'full' else train_df)['timestamp'].max())
+with span('save'):
+    for name, u in updates.items():
+        model_state = state['models'].get(name, {'version': 0})
+        version = model_state['version'] + 1
+        tree_versions = u['tree_versions'] or [version] * len(u['model'].estimators_)
+        info = {'mode': mode, 'data_window': data_window, 'tree_versions': tree_versions,
+                **u['info']}
+        # Versi disimpan di models/versions/<model>/vNNNN/; versi yang dipromosikan juga ditulis ke
+        # models/<model>.pkl & artifact models/<model>/ (dipakai inference_server)
+        incremental_forest.save_version(u['model'], MODEL_DIR, name, version, features, info,
+                                        targets=u['targets'], promote=u['promote'])
+        if u['promote']:
+            state['models'][name] = {'version': version, 'active_version': version,
+                                     'last_timestamp': last_timestamp, 'tree_versions': tree_versions}
+        else:
+            # Model aktif tetap; data baru belum masuk model sehingga dipakai lagi di update berikutnya
+            state['models'][name] = {**model_state, 'version': version}
+        print(f"   {name}: versi {version} ({len(u['model'].estimators_)} pohon)"
+              f"{'' if u['promote'] else ' - tidak dipromosikan'}")
+    incremental_forest.save_state(MODEL_DIR, state)
 
 print("\n🎉 SELESAI! Model Random Forest siap dideploy.")
-print(f"   Lokasi: {MODEL_DIR}")
\ No newline at end of file
+print(f"   Lokasi: {MODEL_DIR}")
@@ -0,0 +1,344 @@
+"""
+Agregasi per detik secara incremental.
+
+State yang disimpan adalah jumlah (sum) dan banyaknya nilai valid (count) per kolom
+untuk setiap bucket detik, ditambah checkpoint jumlah baris input yang sudah diproses.
+Setiap run hanya membaca baris baru, lalu menambahkannya ke bucket yang sesuai,
+termasuk baris terlambat yang jatuh ke bucket lama. Rata-rata per detik = sum / count.
+
+State dipartisi per hari (satu file parquet per hari di folder state). Run hanya memuat partisi
+yang disentuh baris baru, counter missing value diperbarui dari bucket yang berubah saja, dan
+hanya partisi itu yang ditulis ulang (state maupun output clean). Biaya sebanding dengan data baru,
+bukan seluruh arsip, kecuali saat keputusan FILL MEDIAN (median global -> semua partisi dihitung ulang).
+
+Gap (detik yang tidak punya data sama sekali) dicari otomatis dari index per detik dengan
+`detect_gaps`: satu pass np.diff di timestamp yang sudah urut (per ruangan), tanpa loop Python.
+Hasilnya tabel interval kecil (satu baris per gap) yang dipakai tahap berikutnya:
+  short  panjang <= SHORT_GAP_S -> diisi interpolasi linear dari tetangga (`fill_short_gaps`)
+  long   lebih panjang          -> diisi data sintetis (synthetic_data.generate_gap_data)
+"""
+import json
+import os
+import numpy as np
+import pandas as pd
+import storage
+from pandas.tseries.frequencies import to_offset
+
+TIMESTAMP = 'timestamp'
+ROOM = 'room_id'
+SHORT_GAP_S = 300  # Gap <= 5 menit (1 interval keyframe data sintetis) cukup diinterpolasi
+PARTITION_FORMAT = '%Y-%m-%d'  # Satu partisi state / output clean per hari
+PENDING_SUFFIX = '.pending.parquet'
+
+
+def _incomplete(table):
+    """Jumlah bucket yang punya minimal satu kolom tanpa nilai (count == 0)."""
+    counts = table[[c for c in table.columns if c.endswith('_count')]]
+    return int((counts == 0).any(axis=1).sum())
+
+
+def _means(table):
+    """DataFrame rata-rata per detik (NaN jika bucket tidak punya nilai untuk kolom itu)."""
+    out = pd.DataFrame(index=table.index)
+    for col in [c[:-len('_count')] for c in table.columns if c.endswith('_count')]:
+        count = table[f'{col}_count'].to_numpy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[col] = np.where(count > 0, table[f'{col}_sum'].to_numpy() / count, np.nan)
+    return out
+
+
+def _commit(path, keys):
+    """Pasang partisi pending hasil save (rename ke nama final). Aman diulang."""
+    for key in keys:
+        pending = os.path.join(path, f'.{key}{PENDING_SUFFIX}')
+        if os.path.exists(pending):
+            os.replace(pending, os.path.join(path, f'{key}.parquet'))
+
+
+class AggregationState:
+    """
+    Sum/count per detik (partisi per hari) + counter untuk keputusan drop/fill (rasio baris dengan NaN).
+    Partisi di disk baru dibaca saat dibutuhkan; partisi yang berubah ditahan di memori sampai `save`.
+    `path` = folder partisi (None = state hanya di memori, mis. INCREMENTAL = False).
+    """
+
+    def __init__(self, path=None, rows_consumed=0, source=None, n_incomplete=0, partitions=None, decision=None,
+                 generation=None):
+        self.path = path
+        self.reset(rows_consumed, source, n_incomplete, partitions, decision, generation)
+
+    def reset(self, rows_consumed=0, source=None, n_incomplete=0, partitions=None, decision=None, generation=None):
+        self.rows_consumed = rows_consumed
+        self.source = source
+        self.generation = generation  # generation ekstraksi (extraction.generation) saat baris terakhir dibaca
+        # Jumlah bucket yang punya minimal satu kolom tanpa nilai (count == 0)
+        self.n_incomplete = n_incomplete
+        self.partitions = dict(partitions or {})  # hari -> jumlah bucket
+        self.decision = decision  # keputusan missing value saat output terakhir ditulis
+        self.tables = {}          # hari -> tabel sum/count yang berubah sejak save terakhir
+        # Partisi di disk tidak berlaku lagi (state baru / dibangun ulang): dihapus saat save
+        self.cleared = partitions is None
+
+    @property
+    def n_buckets(self):
+        return sum(self.partitions.values())
+
+    @property
+    def missing_ratio(self):
+        return self.n_incomplete / self.n_buckets if self.n_buckets > 0 else 0
+
+    @property
+    def changed(self):
+        return sorted(self.tables)
+
+    def _file(self, key):
+        return os.path.join(self.path, f'{key}.parquet')
+
+    def table(self, key):
+        """Tabel sum/count satu hari (index timestamp), kosong jika belum ada."""
+        if key in self.tables:
+            return self.tables[key]
+        if key not in self.partitions or self.cleared or self.path is None:
+            return pd.DataFrame()
+        table = storage.load_frame(self._file(key)).set_index(TIMESTAMP)
+        if len(table) != self.partitions[key]:
+            raise ValueError(f"Partisi state '{key}' tidak sinkron dengan checkpoint (hapus state untuk membangun ulang)")
+        return table
+
+    def fold(self, df):
+        """Menambahkan baris mentah baru ke state. Return jumlah bucket yang tersentuh."""
+        if df.empty:
+            return 0
+        values = df.drop(columns=[TIMESTAMP])
+        buckets = pd.to_datetime(df[TIMESTAMP]).dt.floor('s')
+        grouped = values.groupby(buckets)
+        delta = pd.concat([grouped.sum().add_suffix('_sum'), grouped.count().add_suffix('_count')], axis=1)
+        delta.index.name = TIMESTAMP
+
+        # Hanya partisi hari yang tersentuh yang dimuat; counter dihitung dari bucket yang tersentuh saja
+        for key, part in delta.groupby(delta.index.strftime(PARTITION_FORMAT)):
+            table = self.table(key)
+            if table.empty:
+                merged, before = part.sort_index(axis=1), 0
+            else:
+                touched_before = table.reindex(part.index).dropna(how='all')
+                before = _incomplete(touched_before) if len(touched_before) else 0
+                merged = table.add(part, fill_value=0)
+            self.n_incomplete += _incomplete(merged.loc[part.index]) - before
+            self.tables[key] = merged
+            self.partitions[key] = len(merged)
+        return len(delta)
+
+    def means(self, key):
+        return _means(self.table(key))
+
+    def timestamps(self):
+        """Semua bucket detik (urut), hanya kolom timestamp yang dibaca dari partisi di disk."""
+        parts = []
+        for key in sorted(self.partitions):
+            if key in self.tables or self.cleared or self.path is None:
+                parts.append(self.table(key).index.to_series())
+            else:
+                parts.append(storage.load_frame(self._file(key), columns=[TIMESTAMP])[TIMESTAMP])
+        if not parts:
+            return pd.Series([], dtype='datetime64[ns]', name=TIMESTAMP)
+        return pd.concat(parts, ignore_index=True)
+
+    # --- Persistensi ---
+    def save(self, checkpoint_path):
+        """
+        Tulis partisi yang berubah. Dua fase: partisi ditulis sebagai file pending, checkpoint (berisi
+        daftar pending) di-rename atomik, baru pending dipasang. Proses yang terhenti di tengah
+        diselesaikan (atau dibatalkan, jika checkpoint belum tertulis) oleh `load`.
+        """
+        if self.cleared:
+            storage.remove(self.path)
+        os.makedirs(self.path, exist_ok=True)
+        pending = self.changed
+        for key in pending:
+            storage.save_frame(self.tables[key].reset_index(), os.path.join(self.path, f'.{key}{PENDING_SUFFIX}'))
+        with open(checkpoint_path + '.tmp', 'w') as f:
+            json.dump({'rows_consumed': self.rows_consumed, 'source': self.source,
+                       'n_incomplete': self.n_incomplete, 'n_buckets': self.n_buckets,
+                       'decision': self.decision, 'generation': self.generation, 'partitions': self.partitions,
+                       'pending': pending}, f, indent=2)
+        os.replace(checkpoint_path + '.tmp', checkpoint_path)
+        _commit(self.path, pending)
+        self.tables = {}
+        self.cleared = False
+
+    @classmethod
+    def load(cls, path, checkpoint_path):
+        if not (os.path.isdir(path) and os.path.exists(checkpoint_path)):
+            return cls(path)
+        with open(checkpoint_path) as f:
+            meta = json.load(f)
+        if 'partitions' not in meta:
+            return cls(path)  # Format state lama (satu file) -> bangun ulang
+        _commit(path, meta.get('pending', []))
+        for name in os.listdir(path):
+            if name.endswith(PENDING_SUFFIX):  # Save terhenti sebelum checkpoint tertulis -> dibuang
+                os.remove(os.path.join(path, name))
+        return cls(path, meta['rows_consumed'], meta.get('source'), meta['n_incomplete'],
+                   meta['partitions'], meta.get('decision'), meta.get('generation'))
+
+
+def update_state(state, source, chunksize=500_000, generation=None):
+    """
+    Membaca baris `source` yang belum diproses lalu memasukkannya ke state.
+    `generation` = extraction.generation(checkpoint 01): jika berbeda dari yang tersimpan di state, `source`
+    sudah diekstrak ulang penuh (raw ditulis ulang, panjangnya bisa sama / lebih) -> state dibangun dari awal.
+    Begitu juga jika path sumber berbeda atau file lebih pendek dari checkpoint. Return jumlah baris baru.
+    """
+    total = storage.count_rows(source)
+    if state.source != source or total < state.rows_consumed or generation != state.generation:
+        state.reset(source=source)
+
+    new_rows = 0
+    for chunk in storage.iter_chunks(source, chunksize=chunksize, start_row=state.rows_consumed):
+        state.fold(chunk)
+        new_rows += len(chunk)
+    state.rows_consumed += new_rows
+    state.source = source
+    state.generation = generation
+    return new_rows
+
+
+def finalize(state, threshold_ratio, output_path):
+    """
+    Keputusan missing value: DROP jika rasio < threshold, selain itu FILL MEDIAN. Rata-rata per detik
+    ditulis ke `output_path`: parquet -> folder part per hari. Jika keputusan tetap DROP, hanya partisi
+    yang berubah yang ditulis ulang; FILL MEDIAN / keputusan berubah / format lain -> semua partisi.
+    Dipanggil sebelum `state.save`. Return (keputusan, jumlah partisi yang ditulis).
+    """
+    decision = 'drop' if state.missing_ratio < threshold_ratio else 'median'
+    partitioned = storage.detect_format(output_path) == 'parquet'
+    full = not partitioned or decision == 'median' or decision != state.decision or state.cleared \
+        or not storage.is_dataset(output_path)
+    keys = sorted(state.partitions) if full else state.changed
+    if decision == 'median':
+        fill = pd.concat([state.means(k) for k in keys]).median(numeric_only=True) if keys else None
+
+    frames = []
+    if full:
+        storage.remove(output_path)
+    for key in keys:
+        means = state.means(key)
+        out = (means.dropna() if decision == 'drop' else means.fillna(fill)).reset_index()
+        if partitioned:
+            storage.write_part(out, output_path, f'{key}.parquet')
+        else:
+            frames.append(out)
+    if not partitioned or (full and not keys):
+        empty = pd.DataFrame(columns=[TIMESTAMP])
+        storage.save_frame(pd.concat(frames, ignore_index=True) if frames else empty, output_path)
+    state.decision = decision
+    return decision, len(keys)
+
+
+# --- GAP ---
+def detect_gaps(timestamps, rooms=None, short_gap_s=SHORT_GAP_S, resolution='s'):
+    """
+    Interval waktu yang hilang di antara `timestamps` (boleh tidak urut / duplikat).
+    `rooms` (opsional, sepanjang timestamps): gap dicari per ruangan, kolom room_id ikut di output.
+    Return DataFrame: start & end = slot pertama & terakhir yang hilang, seconds = panjang gap
+    (jumlah slot x resolusi), kind = 'short' / 'long'.
+    """
+    step = pd.Timedelta(to_offset(resolution)).value
+    t = pd.to_datetime(pd.Series(timestamps)).to_numpy(dtype='datetime64[ns]').view('int64') // step
+    if rooms is not None:
+        if np.ndim(rooms):
+            codes, names = pd.factorize(rooms)  # Categorical (schema.compact) -> langsung pakai kode
+        else:
+            codes, names = np.zeros(len(t), dtype='int64'), [rooms]
+        # Kunci gabungan (ruangan << 40 | slot relatif) -> cukup satu np.sort, tanpa argsort/lexsort
+        base = t.min() if len(t) else 0
+        key = np.sort((codes.astype('int64') << 40) | (t - base))
+        codes, t = key >> 40, (key & ((1 << 40) - 1)) + base
+        same = codes[1:] == codes[:-1]
+    else:
+        t = np.sort(t)
+        same = np.ones(max(len(t) - 1, 0), dtype=bool)
+
+    diff = np.diff(t)
+    idx = np.flatnonzero(same & (diff > 1))
+    slots = diff[idx] - 1
+    seconds = slots * step / 1e9
+    gaps = pd.DataFrame({
+        'start': ((t[idx] + 1) * step).astype('datetime64[ns]'),
+        'end': ((t[idx + 1] - 1) * step).astype('datetime64[ns]'),
+        'seconds': seconds,
+        'kind': np.where(seconds <= short_gap_s, 'short', 'long'),
+    })
+    if rooms is not None:
+        gaps.insert(0, ROOM, np.asarray(names, dtype=str)[codes[idx]])
+    return gaps
+
+
+def gap_windows(gaps, kind='long'):
+    """List (start, end) untuk gap jenis `kind`, format input synthetic_data.generate_gap_data."""
+    rows = gaps[gaps['kind'] == kind]
+    return list(zip(rows['start'], rows['end']))
+
+
+def trim_windows(windows, timestamps, occupied=(), resolution='s'):
+    """
+    Potong window [(start, end), ...] agar tidak memuat slot yang sudah ada di `timestamps` maupun
+    di window `occupied` (mis. gap panjang terdeteksi yang juga diisi data sintetis).
+    Dipakai untuk window sintetis tambahan supaya tidak ada timestamp ganda setelah merge.
+    Return list (start, end) sisa window (slot pertama & terakhir, inklusif), urut waktu.
+    """
+    step = pd.Timedelta(to_offset(resolution)).value
+    t = np.unique(pd.to_datetime(pd.Series(timestamps)).to_numpy(dtype='datetime64[ns]').view('int64') // step)
+    # Slot yang sudah terisi sebagai interval: run berurutan dari timestamps + window occupied
+    brk = np.flatnonzero(np.diff(t) > 1)
+    starts = [t[np.r_[0, brk + 1]] if len(t) else t]
+    ends = [t[np.r_[brk, len(t) - 1]] if len(t) else t]
+    for start, end in occupied:
+        starts.append([-(-pd.Timestamp(start).value // step)])
+        ends.append([pd.Timestamp(end).value // step])
+    starts, ends = np.concatenate(starts).astype('int64'), np.concatenate(ends).astype('int64')
+    order = np.argsort(starts, kind='stable')
+    # Setelah diurutkan, end kumulatif tetap di dalam gabungan interval -> keduanya naik (bisa searchsorted)
+    starts, ends = starts[order], np.maximum.accumulate(ends[order]) if len(ends) else ends
+
+    out = []
+    for start, end in windows:
+        a, b = -(-pd.Timestamp(start).value // step), pd.Timestamp(end).value // step
+        for i in range(np.searchsorted(ends, a, 'left'), np.searchsorted(starts, b, 'right')):
+            if starts[i] > a:
+                out.append((a, min(starts[i] - 1, b)))
+            a = max(a, ends[i] + 1)
+            if a > b:
+                break
+        if a <= b:
+            out.append((a, b))
+    return sorted((pd.Timestamp(a * step), pd.Timestamp(b * step)) for a, b in out)
+
+
+def fill_short_gaps(df, gaps, resolution='s'):
+    """
+    Isi semua slot di gap 'short' dengan interpolasi linear kolom angka dari baris tetangga.
+    `df` satu ruangan. Return DataFrame baru (urut waktu) berisi baris asli + baris isian.
+    """
+    short = gaps[gaps['kind'] == 'short']
+    df = df.sort_values(TIMESTAMP, kind='stable').reset_index(drop=True)
+    if short.empty or len(df) < 2:
+        return df
+    step = pd.Timedelta(to_offset(resolution)).value
+    starts = short['start'].to_numpy(dtype='datetime64[ns]').view('int64')
+    n = ((short['end'].to_numpy(dtype='datetime64[ns]').view('int64') - starts) // step + 1).astype('int64')
+    # Semua slot gap sekaligus: start tiap gap diulang n kali + offset 0..n-1 di dalam gap
+    offset = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+    t_new = np.repeat(starts, n) + offset * step
+
+    t = df[TIMESTAMP].to_numpy(dtype='datetime64[ns]').view('int64')
+    filled = pd.DataFrame({TIMESTAMP: t_new.astype('datetime64[ns]')})
+    for col in df.columns:
+        if col != TIMESTAMP and pd.api.types.is_numeric_dtype(df[col]):
+            values = np.interp(t_new, t, df[col].to_numpy(dtype='float64'))
+            if pd.api.types.is_integer_dtype(df[col]):
+                values = np.round(values)
+            filled[col] = values.astype(df[col].dtype)
+    out = pd.concat([df, filled], ignore_index=True)
+    return out.sort_values(TIMESTAMP, kind='stable').reset_index(drop=True)
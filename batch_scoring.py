@@ -0,0 +1,236 @@
+"""
+Batch scoring: terapkan model status & energi ke file histori besar (backfill label & kWh).
+
+    python batch_scoring.py --input history.parquet                 # satu file
+    python batch_scoring.py --input rooms/ --workers 8              # folder: satu file per ruangan
+    python batch_scoring.py --input history.parquet --merge predictions.parquet
+
+Input dibaca per chunk (streaming) oleh proses utama lalu dibagi ke process pool. Setiap worker
+memuat model SEKALI (initializer), memprediksi chunk, dan menulis hasilnya sendiri sebagai
+<output>/<partisi>/part-NNNNN.parquet (ditulis ke file .tmp lalu di-rename). Chunk yang sedang
+diproses dibatasi 2 x worker, jadi memori tetap = worker x (model + chunk) berapa pun ukuran input.
+
+Resume: part yang sudah ada dilewati, jadi setelah crash cukup jalankan perintah yang sama.
+_manifest.json menyimpan chunksize & model; resume dengan konfigurasi berbeda ditolak.
+
+Engine:
+  sklearn   .pkl di tiap worker (n_jobs=1); paling cepat untuk chunk besar (default)
+  artifact  artifact mmap (model_artifact.py); memori model dibagi antar worker lewat page cache
+Model dengan fitur temporal: fitur dihitung di proses utama dengan TemporalFeatures yang
+stateful per partisi (input harus urut waktu per ruangan), sehingga hasil sama dengan 1 kali jalan.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import pandas as pd
+import model_artifact
+import schema
+import storage
+from instrumentation import span
+from temporal_features import TemporalFeatures, ROOM, TIMESTAMP
+
+# --- KONFIGURASI ---
+INPUT_FILENAME = 'train_data.parquet'    # file, atau folder berisi satu file per partisi (ruangan)
+OUTPUT_DIR     = 'predictions/'
+MODEL_DIR      = 'models/'
+STATUS_MODEL   = 'rf_status_model'
+ENERGY_MODEL   = 'rf_energy_model'
+FEATURES       = ['occupancy', 'temp', 'hum', 'lux', 'noise', 'luas']
+REG_TARGETS    = ['energy_kwh', 'pmv', 'ppd']
+KEY_COLUMNS    = [TIMESTAMP, ROOM]         # ikut ditulis ke output jika ada di input
+CHUNK_SIZE     = 200_000
+WORKERS        = os.cpu_count()
+ENGINE         = 'sklearn'
+MANIFEST       = '_manifest.json'
+
+_models = {}  # diisi initializer di tiap worker
+
+
+# --- WORKER ---
+def _load_models(model_dir, engine):
+    _models.clear()
+    for name in (STATUS_MODEL, ENERGY_MODEL):
+        path = os.path.join(model_dir, name)
+        if engine == 'artifact':
+            _models[name] = model_artifact.load_artifact(path)
+        else:
+            import joblib
+            model = joblib.load(f'{path}.pkl')
+            model.n_jobs = 1  # Paralelisme dari jumlah worker, bukan thread per model
+            _models[name] = model
+
+
+def model_features(model_dir=MODEL_DIR, engine=ENGINE):
+    """Urutan fitur yang dipakai model status."""
+    path = os.path.join(model_dir, STATUS_MODEL)
+    if engine == 'artifact' or model_artifact.artifact_exists(path):
+        return model_artifact.read_manifest(path)['features']
+    import joblib
+    return list(getattr(joblib.load(f'{path}.pkl'), 'feature_names_in_', FEATURES))
+
+
+def score_frame(df, features):
+    """Prediksi status, energy_kwh, pmv, ppd untuk satu chunk (pakai model yang sudah dimuat)."""
+    X = df[features].to_numpy(dtype='float32')
+    clf, reg = _models[STATUS_MODEL], _models[ENERGY_MODEL]
+    if hasattr(clf, 'feature_names_in_'):
+        X = pd.DataFrame(X, columns=features)  # model sklearn dilatih dengan nama kolom
+    out = pd.DataFrame({c: df[c].to_numpy() for c in KEY_COLUMNS if c in df.columns})
+    out['status'] = clf.predict(X)
+    out[REG_TARGETS] = reg.predict(X)
+    return schema.compact(out)
+
+
+def _score_chunk(chunk, features, part_path):
+    start = time.perf_counter()
+    with span('score_chunk', rows_in=len(chunk), part=os.path.basename(part_path)) as s:
+        out = score_frame(chunk, features)
+        storage.save_frame(out, part_path + '.tmp.parquet')
+        os.replace(part_path + '.tmp.parquet', part_path)  # Part hanya "ada" jika sudah lengkap
+        s.rows_out = len(out)
+    return len(chunk), time.perf_counter() - start
+
+
+# --- DRIVER ---
+def list_partitions(input_path):
+    """Dict nama partisi -> path file. File tunggal = satu partisi dengan nama file-nya."""
+    if os.path.isdir(input_path):
+        return {os.path.splitext(name)[0]: os.path.join(input_path, name)
+                for name in sorted(os.listdir(input_path)) if os.path.splitext(name)[1] in storage.FORMATS}
+    return {os.path.splitext(os.path.basename(input_path))[0]: input_path}
+
+
+def part_path(output_dir, partition, index):
+    return os.path.join(output_dir, partition, f'part-{index:05d}.parquet')
+
+
+def check_manifest(output_dir, config):
+    """Tulis manifest untuk run baru; untuk resume, konfigurasi harus sama (batas chunk sama)."""
+    path = os.path.join(output_dir, MANIFEST)
+    if os.path.exists(path):
+        with open(path) as f:
+            old = json.load(f)
+        changed = [k for k in config if old.get(k) != config[k]]
+        if changed:
+            raise ValueError(f"Output '{output_dir}' dibuat dengan konfigurasi lain ({', '.join(changed)}); "
+                             f"pakai folder output baru")
+        return True
+    os.makedirs(output_dir, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(config, f, indent=2)
+    return False
+
+
+def _model_stamp(model_dir, engine):
+    """Waktu modifikasi file model, agar resume tidak mencampur hasil dari model berbeda."""
+    files = {n: os.path.join(model_dir, n, model_artifact.MANIFEST) if engine == 'artifact'
+             else os.path.join(model_dir, f'{n}.pkl') for n in (STATUS_MODEL, ENERGY_MODEL)}
+    return {n: os.path.getmtime(path) for n, path in files.items()}
+
+
+def run(input_path, output_dir=OUTPUT_DIR, model_dir=MODEL_DIR, chunksize=CHUNK_SIZE, workers=WORKERS,
+        engine=ENGINE, on_chunk=None):
+    """Skor semua partisi. Return ringkasan (dict)."""
+    features = model_features(model_dir, engine)
+    extra = [f for f in features if f not in FEATURES]
+    config = {'input': os.path.abspath(input_path), 'chunksize': chunksize, 'features': features,
+              'engine': engine, 'models': _model_stamp(model_dir, engine)}
+    resumed = check_manifest(output_dir, config)
+    partitions = list_partitions(input_path)
+
+    summary = {'partitions': len(partitions), 'chunks': 0, 'skipped': 0, 'rows': 0, 'resumed': resumed}
+    max_inflight = 2 * workers
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_load_models, initargs=(model_dir, engine)) as pool:
+        inflight = set()
+
+        def drain(block_until):
+            nonlocal inflight
+            while len(inflight) > block_until:
+                done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rows, seconds = future.result()
+                    summary['chunks'] += 1
+                    summary['rows'] += rows
+                    if on_chunk:
+                        on_chunk(summary, rows, seconds)
+
+        for partition, path in partitions.items():
+            os.makedirs(os.path.join(output_dir, partition), exist_ok=True)
+            temporal = TemporalFeatures() if extra else None
+            for index, chunk in enumerate(storage.iter_chunks(path, chunksize=chunksize)):
+                chunk = chunk.reset_index(drop=True)
+                if temporal is not None:
+                    # State temporal tetap diperbarui untuk chunk yang dilewati saat resume
+                    chunk = chunk.join(temporal.transform(chunk))
+                target = part_path(output_dir, partition, index)
+                if os.path.exists(target):
+                    summary['skipped'] += 1
+                    continue
+                drain(max_inflight - 1)  # Batasi chunk di memori
+                inflight.add(pool.submit(_score_chunk, chunk, features, target))
+        drain(0)
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def merge(output_dir, path):
+    """Gabungkan semua part (urut partisi & nomor chunk) ke satu file."""
+    rows = 0
+    with storage.FrameWriter(path) as writer:
+        for partition in sorted(os.listdir(output_dir)):
+            folder = os.path.join(output_dir, partition)
+            if not os.path.isdir(folder):
+                continue
+            for name in sorted(n for n in os.listdir(folder) if n.startswith('part-') and n.endswith('.parquet')):
+                for chunk in storage.iter_chunks(os.path.join(folder, name)):
+                    writer.write(chunk)
+                    rows += len(chunk)
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Batch scoring model status & energi untuk file histori.")
+    parser.add_argument('--input', default=INPUT_FILENAME, help="File, atau folder berisi satu file per partisi")
+    parser.add_argument('--output', default=OUTPUT_DIR)
+    parser.add_argument('--models', default=MODEL_DIR)
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--engine', choices=['sklearn', 'artifact'], default=ENGINE)
+    parser.add_argument('--merge', metavar='FILE', help="Gabungkan hasil ke satu file setelah selesai")
+    args = parser.parse_args()
+
+    print("="*50)
+    print("📦  BATCH SCORING")
+    print("="*50)
+
+    if not os.path.exists(args.input):
+        print(f"❌ Error: '{args.input}' tidak ditemukan!")
+        exit()
+
+    def report(summary, rows, seconds):
+        print(f"    ✅ chunk {summary['chunks']:>5}  {rows:>9,} baris  {seconds:6.2f} detik  "
+              f"(total {summary['rows']:,})")
+
+    print(f"\n⚙️  {args.workers} worker, engine {args.engine}, chunk {args.chunksize:,} baris -> {args.output}")
+    try:
+        with span('batch_scoring', workers=args.workers, engine=args.engine) as s:
+            summary = run(args.input, args.output, args.models, args.chunksize, args.workers, args.engine,
+                          on_chunk=report)
+            s.rows_out = summary['rows']
+            s.set(chunks=summary['chunks'], skipped=summary['skipped'])
+    except ValueError as exc:
+        print(f"❌ Error: {exc}")
+        exit(1)
+    if summary['resumed']:
+        print(f"\n♻️  Resume: {summary['skipped']} chunk sudah selesai sebelumnya, dilewati")
+    rate = summary['rows'] / max(summary['seconds'], 1e-9)
+    print(f"\n⏱️ {summary['rows']:,} baris dari {summary['partitions']} partisi dalam {summary['seconds']:.1f} detik "
+          f"({rate:,.0f} baris/detik)")
+
+    if args.merge:
+        rows = merge(args.output, args.merge)
+        print(f"💾 {rows:,} baris digabung ke '{args.merge}'")
+    print("✅ SELESAI!")
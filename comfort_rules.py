@@ -0,0 +1,125 @@
+"""
+Rule engine status kenyamanan (status, pmv, ppd) berbasis tabel aturan.
+
+Setiap rule berbentuk (kondisi, status, pmv, ppd). Kondisi adalah list
+(kolom, operator, nilai) yang semuanya harus terpenuhi. Rule dievaluasi
+berurutan dan rule pertama yang cocok yang dipakai (sama seperti rantai if/elif),
+baris yang tidak cocok dengan rule apa pun menjadi DEFAULT_RESULT.
+Evaluasi dilakukan per kolom (mask numpy), bukan per baris.
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_RESULT = ("Invalid", 0.0, 0)
+
+_OPERATORS = {
+    '==': np.equal,
+    '<':  np.less,
+    '<=': np.less_equal,
+    '>':  np.greater,
+    '>=': np.greater_equal,
+}
+
+# --- RULE 03_final_preparation.py (data asli + data gap sintetis) ---
+RULES_FINAL_PREPARATION = [
+    # 1. Ruangan kosong (occ = 0)
+    # BOROS: kosong tapi suhu dingin (AC nyala <= 23.5) DAN lampu terang (> 150)
+    ([('occupancy', '==', 0), ('temp', '<=', 23.5), ('lux', '>', 150)],           "Boros Energi", 0.0, 5),
+    # IDEAL: kosong, suhu panas (AC mati) DAN gelap (lampu mati)
+    ([('occupancy', '==', 0), ('temp', '>', 23.5), ('lux', '<=', 150)],           "Ideal", 0.0, 5),
+    # Sisa ruangan kosong -> buang
+    ([('occupancy', '==', 0)],                                                    "Invalid", 0.0, 0),
+
+    # 2. Ada orang tapi gelap (lux < 290)
+    ([('occupancy', '>', 0), ('lux', '<', 290), ('temp', '>=', 25.8), ('temp', '<=', 27.1)], "Peringatan", 0.0, 5),   # Gelap dan hangat nyaman
+    ([('occupancy', '>', 0), ('lux', '<', 290), ('temp', '>=', 22.7), ('temp', '<', 25.8)],  "Peringatan", 0.0, 5),   # Gelap dan nyaman optimal
+    ([('occupancy', '>', 0), ('lux', '<', 290), ('temp', '>=', 19.5), ('temp', '<', 22.7)],  "Peringatan", -1.0, 25), # Gelap tapi sejuk nyaman
+    ([('occupancy', '>', 0), ('lux', '<', 290), ('temp', '<', 19.5)],                        "Peringatan", -2.0, 75), # Gelap dan kedinginan
+    ([('occupancy', '>', 0), ('lux', '<', 290)],                                             "Peringatan", 2.0, 75),  # Gelap dan kepanasan
+
+    # 3. Ideal (1-18 orang)
+    ([('occupancy', '>=', 1), ('occupancy', '<=', 18), ('temp', '>=', 19.5), ('temp', '<=', 25.5),
+      ('hum', '>=', 40), ('hum', '<=', 65), ('lux', '>=', 290), ('lux', '<=', 500), ('noise', '<', 55)],
+     "Ideal", 0.0, 5),
+
+    # 4. Optimalisasi (19-25 orang), hum & noise dilonggarkan
+    ([('occupancy', '>=', 19), ('occupancy', '<=', 25), ('temp', '>=', 24.0), ('temp', '<=', 27.0),
+      ('lux', '>=', 290), ('lux', '<=', 450)],
+     "Optimalisasi", 0.5, 10),
+
+    # 5. Peringatan level 1 (26-30 orang)
+    ([('occupancy', '>=', 26), ('occupancy', '<=', 30), ('temp', '>', 26.3), ('temp', '<=', 27.3),
+      ('hum', '>', 60), ('hum', '<=', 75), ('lux', '>', 430), ('lux', '<=', 560)],
+     "Peringatan", 1.0, 25),
+    # Peringatan level 2 (31-60 orang)
+    ([('occupancy', '>=', 31), ('occupancy', '<=', 60), ('temp', '>', 27.0), ('temp', '<=', 28.8),
+      ('hum', '>', 65), ('hum', '<=', 80), ('lux', '>', 540), ('lux', '<=', 660)],
+     "Peringatan", 1.5, 50),
+
+    # 6. Kritis (> 60 orang)
+    ([('occupancy', '>', 60), ('temp', '>', 28.3), ('hum', '>', 70), ('lux', '>', 640)],
+     "Kritis", 2.5, 90),
+]
+
+# --- RULE preparation_without_dummy.py (data asli saja) ---
+RULES_WITHOUT_DUMMY = [
+    ([('occupancy', '==', 0), ('temp', '>=', 17.5), ('temp', '<=', 20.5), ('hum', '>=', 40), ('hum', '<=', 60),
+      ('lux', '>=', 430), ('noise', '<', 50)],
+     "Boros Energi", 0.0, 5),
+    ([('occupancy', '==', 0)],
+     "Invalid", 0.0, 0),
+    ([('occupancy', '>=', 1), ('occupancy', '<=', 18), ('temp', '>', 19.5), ('temp', '<=', 25.2),
+      ('hum', '>=', 40), ('hum', '<=', 60), ('lux', '>=', 380), ('lux', '<=', 450), ('noise', '<', 50)],
+     "Ideal", 0.0, 5),
+    ([('occupancy', '>=', 19), ('occupancy', '<=', 25), ('temp', '>', 24.8), ('temp', '<=', 26.8),
+      ('hum', '>', 50), ('hum', '<=', 70), ('lux', '>=', 290), ('lux', '<=', 400), ('noise', '>=', 40), ('noise', '<=', 60)],
+     "Optimalisasi", 1.0, 25),
+    ([('occupancy', '>=', 26), ('occupancy', '<=', 30), ('temp', '>', 26.3), ('temp', '<=', 27.3),
+      ('hum', '>', 60), ('hum', '<=', 75), ('lux', '>', 430), ('lux', '<=', 560), ('noise', '>=', 40), ('noise', '<=', 65)],
+     "Peringatan", 1.0, 25),
+    ([('occupancy', '>=', 31), ('occupancy', '<=', 60), ('temp', '>', 27.0), ('temp', '<=', 28.8),
+      ('hum', '>', 65), ('hum', '<=', 80), ('lux', '>', 540), ('lux', '<=', 660), ('noise', '>=', 40), ('noise', '<=', 65)],
+     "Peringatan", 1.0, 75),
+    ([('occupancy', '>', 60), ('temp', '>', 28.3), ('hum', '>', 70), ('lux', '>', 640), ('noise', '>', 55)],
+     "Kritis", 2.0, 90),
+]
+
+
+def evaluate_rules(df, rules, default=DEFAULT_RESULT):
+    """
+    Mengevaluasi tabel rule ke seluruh baris df sekaligus.
+    Return DataFrame (status, pmv, ppd) dengan index yang sama dengan df.
+    """
+    n = len(df)
+    columns = {}
+    masks = {}
+
+    def condition_mask(col, op, value):
+        # Kondisi yang sama (mis. occupancy > 0) cukup dihitung sekali untuk semua rule
+        key = (col, op, value)
+        if key not in masks:
+            if col not in columns:
+                columns[col] = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype='float64')
+            masks[key] = _OPERATORS[op](columns[col], value)
+        return masks[key]
+
+    rule_idx = np.full(n, len(rules), dtype=np.int32)
+    unassigned = np.ones(n, dtype=bool)
+    for i, (conditions, *_) in enumerate(rules):
+        hit = unassigned.copy()
+        for col, op, value in conditions:
+            hit &= condition_mask(col, op, value)
+        rule_idx[hit] = i
+        unassigned &= ~hit
+        if not unassigned.any():
+            break
+
+    outputs = [tuple(rule[1:]) for rule in rules] + [tuple(default)]
+    status = np.array([o[0] for o in outputs], dtype=object)
+    pmv = np.array([o[1] for o in outputs], dtype='float64')
+    ppd = np.array([o[2] for o in outputs], dtype='int64')
+    return pd.DataFrame({
+        'status': status[rule_idx],
+        'pmv': pmv[rule_idx],
+        'ppd': ppd[rule_idx],
+    }, index=df.index)
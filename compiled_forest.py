@@ -0,0 +1,237 @@
+"""
+Random Forest (scikit-learn) yang di-"compile" menjadi array node kontigu.
+
+Semua pohon digabung ke satu set array:
+  feature[n]      index fitur split (-2 = leaf)
+  threshold[n]    nilai split float32 (kiri jika x <= threshold)
+  children[n, 2]  index absolut child kiri & kanan
+  value[n, k]     probabilitas kelas (classifier) atau nilai target (regressor)
+  roots[t]        index root tiap pohon
+Prediksi berjalan untuk semua (baris, pohon) sekaligus: tiap iterasi turun satu level,
+pasangan yang sudah sampai leaf dikeluarkan dari active set. Tidak ada loop Python per pohon.
+
+Threshold sklearn (float64) dibulatkan ke bawah ke float32. Karena input juga float32,
+hasil `x <= threshold` tetap identik dengan sklearn.
+
+Dipakai untuk batch kecil (inference_server, ~1..ratusan baris): overhead per panggilan jauh di
+bawah sklearn. Untuk batch besar traversal numpy ini KALAH dari sklearn (10k baris: ~5x lebih
+lambat), jadi scoring massal memakai .pkl sklearn (batch_scoring engine default, tahap predict
+di perf_suite).
+
+    python compiled_forest.py --bench     # bandingkan dengan model .pkl (batch 1, 64, 10k)
+"""
+import argparse
+import time
+import numpy as np
+
+FEATURES = ['occupancy', 'temp', 'hum', 'lux', 'noise', 'luas']
+LEAF = -2
+BLOCK_ROWS = 4096  # Baris per blok traversal (membatasi ukuran active set)
+
+
+class CompiledForest:
+    ARRAYS = ('feature', 'threshold', 'children', 'value', 'roots')
+
+    def __init__(self, feature, threshold, children, value, roots, kind, classes=None, features=None,
+                 targets=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.kind = kind
+        self.classes = np.asarray(classes) if classes is not None else None
+        self.features = list(features) if features is not None else None
+        self.targets = list(targets) if targets is not None else None
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+    def arrays(self):
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    # --- PREDIKSI ---
+    def _as_matrix(self, X):
+        if hasattr(X, 'columns'):
+            X = X[self.features] if self.features is not None else X
+            X = X.to_numpy()
+        # sklearn mengubah input ke float32 sebelum dibandingkan dengan threshold
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def apply(self, X):
+        """Index leaf untuk setiap (baris, pohon) -> array (n_baris, n_pohon)."""
+        X = self._as_matrix(X)
+        leaves = np.empty((len(X), self.n_trees), dtype=np.int64)
+        for start in range(0, len(X), BLOCK_ROWS):
+            block = X[start:start + BLOCK_ROWS]
+            leaves[start:start + len(block)] = self._apply_block(block).reshape(len(block), self.n_trees)
+        return leaves
+
+    def _apply_block(self, block):
+        n, n_features = block.shape
+        flat_x = block.ravel()
+        children = self.children.reshape(-1)
+        feature = self.feature
+        threshold = self.threshold
+
+        # State yang masih aktif disimpan terkompaksi: node saat ini, offset baris, posisi output
+        node = np.tile(self.roots.astype(np.int64), n)
+        leaves = node.copy()
+        row_offset = np.repeat(np.arange(n, dtype=np.int64) * n_features, self.n_trees)
+        position = np.arange(len(node))
+        while node.size:
+            x = flat_x.take(row_offset + feature.take(node))
+            go_right = x > threshold.take(node)
+            node = children.take(2 * node + go_right)
+            is_leaf = feature.take(node) == LEAF
+            if is_leaf.any():
+                leaves[position[is_leaf]] = node[is_leaf]
+                keep = ~is_leaf
+                node, row_offset, position = node[keep], row_offset[keep], position[keep]
+        return leaves
+
+    def _leaf_mean(self, X):
+        out = np.empty((len(X), self.value.shape[1]), dtype='float64')
+        for start in range(0, len(X), BLOCK_ROWS):
+            block = X[start:start + BLOCK_ROWS]
+            leaves = self._apply_block(block)
+            out[start:start + len(block)] = self.value.take(leaves, axis=0).reshape(
+                len(block), self.n_trees, -1).mean(axis=1)
+        return out
+
+    def predict_proba(self, X):
+        if self.kind != 'classifier':
+            raise TypeError("predict_proba hanya untuk classifier")
+        return self._leaf_mean(self._as_matrix(X))
+
+    def predict(self, X):
+        values = self._leaf_mean(self._as_matrix(X))
+        if self.kind == 'classifier':
+            return self.classes[np.argmax(values, axis=1)]
+        return values[:, 0] if values.shape[1] == 1 else values
+
+
+def float32_floor(values):
+    """Membulatkan float64 ke float32 terbesar yang <= nilai aslinya."""
+    values = np.asarray(values, dtype=np.float64)
+    rounded = values.astype(np.float32)
+    too_big = rounded.astype(np.float64) > values
+    rounded[too_big] = np.nextafter(rounded[too_big], np.float32(-np.inf))
+    return rounded
+
+
+def compile_forest(model, features=None, targets=None):
+    """Mengubah RandomForestClassifier / RandomForestRegressor (sudah di-fit) menjadi CompiledForest."""
+    is_classifier = hasattr(model, 'classes_')
+    if is_classifier and getattr(model, 'n_outputs_', 1) != 1:
+        raise ValueError("Classifier multi-output belum didukung")
+    features = features if features is not None else getattr(model, 'feature_names_in_', None)
+
+    parts = {name: [] for name in ('feature', 'threshold', 'children', 'value')}
+    roots = []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        n = tree.node_count
+        is_leaf = tree.children_left == -1
+        value = tree.value[:, :, 0] if not is_classifier else tree.value[:, 0, :]
+        if is_classifier:
+            # Normalisasi seperti DecisionTreeClassifier.predict_proba
+            total = value.sum(axis=1, keepdims=True)
+            total[total == 0] = 1.0
+            value = value / total
+        # Root tidak pernah leaf kecuali pohon hanya 1 node; child leaf menunjuk ke dirinya sendiri
+        self_index = np.arange(n) + offset
+        parts['feature'].append(np.where(is_leaf, LEAF, tree.feature))
+        parts['threshold'].append(np.where(is_leaf, np.inf, tree.threshold))
+        parts['children'].append(np.stack([np.where(is_leaf, self_index, tree.children_left + offset),
+                                           np.where(is_leaf, self_index, tree.children_right + offset)], axis=1))
+        parts['value'].append(value)
+        roots.append(offset)
+        offset += n
+
+    return CompiledForest(
+        feature=np.concatenate(parts['feature']).astype(np.int32),
+        threshold=float32_floor(np.concatenate(parts['threshold'])),
+        children=np.ascontiguousarray(np.concatenate(parts['children']), dtype=np.int32),
+        value=np.ascontiguousarray(np.concatenate(parts['value']), dtype=np.float64),
+        roots=np.asarray(roots, dtype=np.int32),
+        kind='classifier' if is_classifier else 'regressor',
+        classes=model.classes_ if is_classifier else None,
+        features=features,
+        targets=targets,
+    )
+
+
+def _time_call(fn, X, repeat):
+    fn(X)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(X)
+    return (time.perf_counter() - start) / repeat
+
+
+def benchmark(model_dir='models/', data_file='train_data.parquet', batch_sizes=(1, 64, 10_000)):
+    import joblib
+    import pandas as pd
+    import storage
+
+    models = {
+        'status (classifier)': joblib.load(f'{model_dir}rf_status_model.pkl'),
+        'energy (regressor)': joblib.load(f'{model_dir}rf_energy_model.pkl'),
+    }
+    if storage.exists(data_file):
+        X_all = storage.load_frame(data_file, columns=FEATURES)
+    else:
+        rng = np.random.default_rng(42)
+        X_all = pd.DataFrame(rng.uniform([0, 18, 40, 100, 30, 176], [90, 31, 85, 750, 75, 176],
+                                         size=(max(batch_sizes), 6)), columns=FEATURES)
+
+    rows = []
+    for name, model in models.items():
+        model.n_jobs = 1
+        t0 = time.perf_counter()
+        compiled = compile_forest(model, features=FEATURES)
+        compile_s = time.perf_counter() - t0
+
+        X_check = X_all.sample(min(len(X_all), 20_000), random_state=0)
+        if compiled.kind == 'classifier':
+            ok = (np.allclose(compiled.predict_proba(X_check), model.predict_proba(X_check), atol=1e-9)
+                  and np.array_equal(compiled.predict(X_check), model.predict(X_check)))
+        else:
+            ok = np.allclose(compiled.predict(X_check), model.predict(X_check), atol=1e-9)
+        print(f"🌲 {name}: {compiled.n_trees} pohon, {compiled.n_nodes:,} node, "
+              f"{compiled.nbytes / 1e6:.1f} MB, compile {compile_s:.2f}s, hasil sama: {'✅' if ok else '❌'}")
+
+        for size in batch_sizes:
+            X = X_all.iloc[:size] if len(X_all) >= size else X_all.sample(size, replace=True, random_state=0)
+            repeat = 20 if size <= 64 else 3
+            t_sk = _time_call(model.predict, X, repeat)
+            t_cf = _time_call(compiled.predict, X, repeat)
+            rows.append({'Model': name, 'Batch': size,
+                         'sklearn (ms)': t_sk * 1000, 'compiled (ms)': t_cf * 1000,
+                         'Speedup': t_sk / t_cf, 'compiled baris/detik': size / t_cf})
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compile RF .pkl ke array node & benchmark prediksi.")
+    parser.add_argument('--bench', action='store_true', help="Benchmark vs model .pkl")
+    parser.add_argument('--model-dir', default='models/')
+    parser.add_argument('--data', default='train_data.parquet')
+    args = parser.parse_args()
+    if args.bench:
+        result = benchmark(args.model_dir, args.data)
+        print("\n📊 HASIL BENCHMARK:")
+        print(result.round(3).to_string(index=False))
+    else:
+        parser.print_help()
@@ -0,0 +1,84 @@
+"""
+Estimasi konsumsi energi AC (kWh) dari suhu, berbasis tabel breakpoint.
+
+Kurva tiap unit HVAC disimpan di hvac_kwh_curves.csv sebagai bin [temp_min, temp_max) -> kwh.
+Suhu di luar semua bin (termasuk NaN) bernilai 0.0.
+"""
+from functools import lru_cache
+import os
+import numpy as np
+import pandas as pd
+
+CURVE_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hvac_kwh_curves.csv')
+DEFAULT_UNIT = 'default'
+BLOCK_SIZE = 1 << 16
+
+
+class KwhCurve:
+    """Kurva suhu -> kWh: values[i] berlaku untuk edges[i] <= t < edges[i+1]."""
+
+    def __init__(self, edges, values):
+        self.edges = np.asarray(edges, dtype='float64')
+        self.values = np.asarray(values, dtype='float64')
+        if len(self.edges) != len(self.values) + 1 or np.any(np.diff(self.edges) <= 0):
+            raise ValueError("Breakpoint kurva kWh harus naik dan berjumlah len(values) + 1")
+        # Index 0 (di bawah bin pertama) & index terakhir (di atas bin terakhir / NaN) -> 0.0
+        self._lookup = np.concatenate([[0.0], self.values, [0.0]])
+        # Lebar bin seragam & pangkat 2 (mis. 1.0 derajat): index bisa dihitung aritmetika,
+        # hasilnya eksak di tiap breakpoint dan jauh lebih cepat dari searchsorted.
+        step = self.edges[1] - self.edges[0]
+        uniform = np.array_equal(self.edges, self.edges[0] + step * np.arange(len(self.edges)))
+        self._step = step if uniform and np.frexp(step)[0] == 0.5 else None
+
+    @classmethod
+    def from_bins(cls, bins):
+        """Membuat kurva dari list (temp_min, temp_max, kwh). Celah antar bin diisi 0.0."""
+        bins = sorted(bins)
+        edges = [bins[0][0]]
+        values = []
+        for t_min, t_max, kwh in bins:
+            if t_min < edges[-1]:
+                raise ValueError(f"Bin kWh tumpang tindih di suhu {t_min}")
+            if t_min > edges[-1]:
+                values.append(0.0)
+                edges.append(t_min)
+            values.append(kwh)
+            edges.append(t_max)
+        return cls(edges, values)
+
+    def estimate(self, temps):
+        """Estimasi kWh untuk seluruh kolom suhu sekaligus (binned lookup)."""
+        t = np.asarray(temps, dtype='float64').ravel()
+        if self._step is None:
+            return self._lookup[np.searchsorted(self.edges, t, side='right')]
+
+        out = np.empty(len(t), dtype='float64')
+        n_bins = len(self.values)
+        buf = np.empty(min(len(t), BLOCK_SIZE), dtype='float64')
+        # Diproses per blok agar buffer sementara tetap kecil (muat di cache)
+        for start in range(0, len(t), BLOCK_SIZE):
+            block = t[start:start + BLOCK_SIZE]
+            pos = buf[:len(block)]
+            np.subtract(block, self.edges[0], out=pos)
+            np.multiply(pos, 1.0 / self._step, out=pos)
+            np.floor(pos, out=pos)
+            # fmax/fmin mengabaikan NaN -> NaN jatuh ke bin "di bawah" (0.0)
+            np.fmax(pos, -1.0, out=pos)
+            np.fmin(pos, n_bins, out=pos)
+            np.take(self._lookup, pos.astype(np.intp) + 1, out=out[start:start + len(block)])
+        return out
+
+
+@lru_cache(maxsize=None)
+def load_kwh_curve(unit=DEFAULT_UNIT, path=CURVE_FILENAME):
+    """Memuat kurva kWh untuk satu unit HVAC dari file tabel."""
+    table = pd.read_csv(path)
+    rows = table[table['unit'] == unit]
+    if rows.empty:
+        raise KeyError(f"Kurva kWh untuk unit HVAC '{unit}' tidak ada di '{path}'")
+    return KwhCurve.from_bins(list(rows[['temp_min', 'temp_max', 'kwh']].itertuples(index=False, name=None)))
+
+
+def estimate_kwh(temps, unit=DEFAULT_UNIT, path=CURVE_FILENAME):
+    """Shortcut: estimasi kWh satu kolom suhu memakai kurva unit HVAC tertentu."""
+    return load_kwh_curve(unit, path).estimate(temps)
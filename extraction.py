@@ -0,0 +1,233 @@
+"""
+Ekstraksi payload JSON sensor IoT secara streaming (per chunk).
+
+raw_data.csv dibaca bertahap dengan ukuran chunk tetap, sehingga pemakaian
+memori tidak ikut membesar seiring ukuran file input.
+
+Mode incremental (`checkpoint_path`): raw dianggap append-only. Checkpoint menyimpan offset byte
+raw yang sudah diekstrak; run berikutnya seek ke offset itu, hanya baris baru yang di-decode dan
+ditulis sebagai part baru di folder dataset output (part lama tidak disentuh). Baris terakhir yang
+belum diakhiri newline (masih ditulis) menunggu run berikutnya. Jika awal raw berubah atau file
+lebih pendek dari offset (ditulis ulang), output diekstrak ulang penuh.
+Tiap ekstraksi ulang penuh menaikkan `generation` di checkpoint; agregasi (02) menyimpan generation
+yang terakhir dibacanya dan membangun ulang state jika berbeda (lihat aggregation.update_state).
+"""
+import hashlib
+import io
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+import storage
+from storage import FrameWriter
+
+# Kolom output -> key di payload, per jenis sensor
+SENSOR_FIELDS = {
+    'hvac':      {'temp': 'temp', 'hum': 'hum', 'noise': 'noise'},
+    'lux-meter': {'lux': 'light_level'},
+}
+OUTPUT_COLUMNS = ['temp', 'hum', 'noise', 'lux']
+RAW_COLUMNS = ['timestamp', 'sensor_name', 'payload']
+HEAD_BYTES = 1 << 16  # Awal raw yang di-hash di checkpoint untuk mendeteksi raw ditulis ulang
+
+
+def _decode_one(payload):
+    try:
+        data = json.loads(payload.replace("'", '"'))
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+def decode_payloads(payloads):
+    """
+    Decode banyak payload sekaligus dengan satu kali json.loads.
+    Jika ada payload rusak di dalam batch, batch tersebut di-decode ulang per baris
+    (payload rusak -> dict kosong, sama seperti versi lama).
+    """
+    payloads = pd.Series(payloads, dtype=object)
+    is_str = payloads.map(lambda p: isinstance(p, str)).to_numpy(dtype=bool)
+    decoded = [{}] * len(payloads)
+    if not is_str.any():
+        return decoded
+
+    texts = payloads[is_str].str.replace("'", '"', regex=False)
+    try:
+        bulk = json.loads('[' + ','.join(texts) + ']')
+        if len(bulk) != len(texts) or not all(isinstance(d, dict) for d in bulk):
+            raise ValueError("Jumlah/tipe payload tidak cocok")
+    except ValueError:
+        bulk = [_decode_one(p) for p in payloads[is_str]]
+
+    for pos, data in zip(np.flatnonzero(is_str), bulk):
+        decoded[pos] = data
+    return decoded
+
+
+def extract_chunk(df):
+    """Mengubah satu chunk raw (timestamp, sensor_name, payload) menjadi kolom numerik."""
+    out = pd.DataFrame({'timestamp': pd.to_datetime(df['timestamp'].to_numpy()).astype('datetime64[ns]')})
+    for col in OUTPUT_COLUMNS:
+        out[col] = np.nan
+
+    sensor = df['sensor_name'].to_numpy()
+    payload = df['payload'].to_numpy()
+    for sensor_type, fields in SENSOR_FIELDS.items():
+        mask = sensor == sensor_type
+        if not mask.any():
+            continue
+        records = pd.DataFrame.from_records(decode_payloads(payload[mask]))
+        for col, key in fields.items():
+            if key in records.columns:
+                out.loc[mask, col] = pd.to_numeric(records[key], errors='coerce').to_numpy(dtype='float64')
+    return out
+
+
+# --- CHECKPOINT (RAW APPEND-ONLY) ---
+class _ByteRange(io.RawIOBase):
+    """File-like yang hanya membaca `f` dari posisi sekarang sampai byte `end`."""
+
+    def __init__(self, f, end):
+        self.f = f
+        self.end = end
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), self.end - self.f.tell())
+        if n <= 0:
+            return 0
+        data = self.f.read(n)
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _head_hash(path, n):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read(n)).hexdigest()
+
+
+def _complete_end(path, block=1 << 16):
+    """Offset byte tepat setelah newline terakhir (akhir baris lengkap terakhir)."""
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        while pos > 0:
+            step = min(block, pos)
+            f.seek(pos - step)
+            i = f.read(step).rfind(b'\n')
+            if i >= 0:
+                return pos - step + i + 1
+            pos -= step
+    return 0
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def generation(checkpoint_path):
+    """Generation output ekstraksi di checkpoint (naik tiap ekstraksi ulang penuh), None jika belum ada."""
+    checkpoint = load_checkpoint(checkpoint_path) if checkpoint_path is not None else None
+    return checkpoint.get('generation') if checkpoint else None
+
+
+def _save_checkpoint(path, checkpoint):
+    with open(path + '.tmp', 'w') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def _resume_point(checkpoint, input_path, output_path):
+    """(offset byte, baris output) untuk melanjutkan, atau None jika harus ekstraksi ulang penuh."""
+    if checkpoint is None or checkpoint.get('source') != input_path or not storage.is_dataset(output_path):
+        return None
+    offset = checkpoint.get('offset', 0)
+    if 'offset' not in checkpoint or os.path.getsize(input_path) < offset or storage.count_rows(output_path) != checkpoint['rows']:
+        return None
+    head = min(offset, HEAD_BYTES)
+    if _head_hash(input_path, head) != checkpoint['head']:
+        return None
+    return offset, checkpoint['rows']
+
+
+def _header_end(path):
+    with open(path, 'rb') as f:
+        return len(f.readline())
+
+
+def _read_range(input_path, start, end, chunksize):
+    """Chunk raw dari byte `start` s/d `end` (keduanya batas baris setelah header)."""
+    names = list(pd.read_csv(input_path, nrows=0).columns)
+    with open(input_path, 'rb') as f:
+        f.seek(start)
+        reader = io.BufferedReader(_ByteRange(f, end))
+        yield from pd.read_csv(reader, chunksize=chunksize, header=None, names=names, usecols=RAW_COLUMNS)
+
+
+def extract_stream(input_path, output_path, chunksize=200_000, on_chunk=None, checkpoint_path=None, resume=True):
+    """
+    Membaca input per chunk, mengekstrak payload, lalu menulis (append) tiap chunk ke output.
+    Urutan baris output sama dengan raw (tidak di-sort): agregasi per detik di tahap 02 tidak butuh
+    urutan, dan selama raw hanya bertambah di akhir, baris lama tetap di posisi yang sama
+    sehingga checkpoint incremental di tahap 02 tetap valid.
+
+    Dengan `checkpoint_path` (output parquet), hanya byte raw setelah checkpoint yang dibaca dan
+    hasilnya ditulis sebagai part baru di folder dataset `output_path`. Format lain / `resume=False` selalu
+    ditulis ulang penuh, checkpoint tetap dicatat (generation naik) agar state agregasi ikut direset.
+    Return ringkasan: rows (baris baru), total_rows (baris di output), resumed, generation, seconds, rows_per_sec.
+    """
+    checkpoint = load_checkpoint(checkpoint_path) if checkpoint_path is not None else None
+    incremental = checkpoint_path is not None and storage.detect_format(output_path) == 'parquet'
+    point = _resume_point(checkpoint, input_path, output_path) if incremental and resume else None
+    last_gen = (checkpoint or {}).get('generation') or 0  # Checkpoint format lama tanpa generation -> 0
+    gen = max(last_gen, 1) if point else last_gen + 1
+
+    total_rows = 0
+    start = time.perf_counter()
+    if not incremental:
+        chunks = pd.read_csv(input_path, chunksize=chunksize, usecols=RAW_COLUMNS)
+        target, rows_before = output_path, 0
+    else:
+        if point is None:
+            storage.remove(output_path)
+        offset, rows_before = point or (_header_end(input_path), 0)
+        end = max(_complete_end(input_path), offset)
+        chunks = _read_range(input_path, offset, end, chunksize) if end > offset else ()
+        os.makedirs(output_path, exist_ok=True)
+        n_parts = len(storage.parquet_parts(output_path))
+        target = os.path.join(output_path, f'.part-{n_parts:05d}.tmp.parquet')
+
+    with FrameWriter(target) as writer:
+        for chunk in chunks:
+            writer.write(extract_chunk(chunk))
+            total_rows += len(chunk)
+            if on_chunk is not None:
+                on_chunk(total_rows, time.perf_counter() - start)
+        if writer.rows == 0:
+            writer.write(extract_chunk(pd.DataFrame(columns=RAW_COLUMNS)))  # file kosong tetap bertipe
+
+    if incremental:
+        # Part baru dipasang dulu, checkpoint terakhir; part kosong hanya disimpan sebagai part pertama (skema)
+        if total_rows or n_parts == 0:
+            os.replace(target, os.path.join(output_path, f'part-{n_parts:05d}.parquet'))
+        else:
+            os.remove(target)
+        _save_checkpoint(checkpoint_path, {'source': input_path, 'offset': end, 'rows': rows_before + total_rows,
+                                           'head': _head_hash(input_path, min(end, HEAD_BYTES)), 'generation': gen})
+    elif checkpoint_path is not None:
+        _save_checkpoint(checkpoint_path, {'source': input_path, 'generation': gen})  # Tanpa offset: tidak dilanjutkan
+
+    elapsed = time.perf_counter() - start
+    return {
+        'rows': total_rows,
+        'total_rows': rows_before + total_rows,
+        'resumed': point is not None,
+        'generation': gen if checkpoint_path is not None else None,
+        'seconds': elapsed,
+        'rows_per_sec': total_rows / elapsed if elapsed > 0 else 0.0,
+    }
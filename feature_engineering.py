@@ -0,0 +1,36 @@
+import schema
+import storage
+from instrumentation import span
+from temporal_features import TemporalFeatures, WINDOWS
+
+# --- KONFIGURASI ---
+INPUT_FILENAME  = 'train_data.parquet'
+OUTPUT_FILENAME = 'train_features.parquet'
+FEATURE_COLUMNS = ['temp', 'hum', 'lux', 'noise']
+FEATURE_WINDOWS = WINDOWS   # {'30s': 30, '5min': 300, '1h': 3600}
+CHUNK_SIZE      = 500_000   # Ekor window dibawa antar chunk, hasil sama dengan sekali jalan
+
+print("="*50)
+print("🕒  TEMPORAL FEATURE ENGINEERING")
+print("="*50)
+
+if not storage.exists(INPUT_FILENAME):
+    print(f"❌ Error: File '{INPUT_FILENAME}' tidak ditemukan!")
+    exit()
+
+features = TemporalFeatures(FEATURE_COLUMNS, FEATURE_WINDOWS)
+print(f"\n⚙️  {len(features.names)} fitur: rolling mean/std, lag, rate of change "
+      f"({', '.join(FEATURE_WINDOWS)}) untuk {', '.join(FEATURE_COLUMNS)}")
+
+# Input dari 03 sudah urut timestamp (per ruangan jika ada kolom room_id)
+rows = 0
+with span('temporal_features', windows=list(FEATURE_WINDOWS)) as s, storage.FrameWriter(OUTPUT_FILENAME) as writer:
+    for chunk in storage.iter_chunks(INPUT_FILENAME, chunksize=CHUNK_SIZE):
+        chunk = chunk.reset_index(drop=True)
+        writer.write(schema.compact(chunk.join(features.transform(chunk))))
+        rows += len(chunk)
+        print(f"    ⏳ {rows:,} baris diproses")
+    s.rows_in = s.rows_out = rows
+
+print(f"\n💾 Tersimpan ke '{OUTPUT_FILENAME}' ({rows:,} baris)")
+print("✅ SELESAI!")
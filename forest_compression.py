@@ -0,0 +1,234 @@
+"""
+Kompresi forest hasil 06: pangkas jumlah pohon & kedalaman, kuantisasi threshold/leaf value.
+
+    python forest_compression.py                         # semua varian, laporan saja
+    python forest_compression.py --tolerance 0.001 --save models/compressed/
+    python forest_compression.py --models rf_status_model --trees 100 50 20 --depths 0 12 8
+
+Varian dibuat dari CompiledForest (compiled_forest.py), jadi hasilnya langsung artifact mmap
+(model_artifact.py) yang bisa dipakai inference_server / batch_scoring:
+  trees   N pohon pertama (pohon RF iid, jadi subset mana pun setara)
+  depth   node di kedalaman `depth` jadi leaf dengan value node itu (rata-rata / distribusi
+          kelas sampel yang sampai ke node), node di bawahnya dibuang
+  dtype   threshold & value ke float32 / float16. Threshold dibulatkan ke bawah, jadi
+          float32 identik dengan sklearn; float16 mengubah split dan harus divalidasi.
+          Index fitur disimpan int8 (maks. 127 fitur).
+Setiap varian dinilai ulang di hold-out split yang sama dengan 06 (train_test_split 80/20,
+stratified, random_state=42): F1 macro (status) / R2 (energi), ukuran array, latency 1 baris,
+dan throughput batch. Varian terkecil yang skornya >= skor model asli - TOLERANCE dipilih
+(seri -> latency terkecil) dan, dengan --save, ditulis sebagai artifact.
+"""
+import argparse
+import itertools
+import os
+import time
+import numpy as np
+import pandas as pd
+import model_artifact
+import storage
+from compiled_forest import CompiledForest, LEAF, float32_floor
+from instrumentation import span
+
+# --- KONFIGURASI ---
+INPUT_FILENAME  = 'train_data.parquet'
+MODEL_DIR       = 'models/'
+MODELS          = {'rf_status_model': 'status', 'rf_energy_model': ['energy_kwh', 'pmv', 'ppd']}
+FEATURES        = ['occupancy', 'temp', 'hum', 'lux', 'noise', 'luas']
+TREE_COUNTS     = [100, 50, 25, 10]
+DEPTHS          = [None, 16, 12, 8]       # None = kedalaman penuh
+DTYPES          = ['float64', 'float32', 'float16']
+TOLERANCE       = 0.001                   # Skor boleh turun maksimal segini dari model asli
+REPORT_FILENAME = 'hasil_kompresi.csv'
+BATCH_ROWS      = 10_000
+LATENCY_REPEAT  = 200
+
+
+# --- TRANSFORMASI ---
+def _rebuild(forest, keep, feature, threshold, children, value, roots):
+    """Buang node yang tidak `keep`, index children & roots dipetakan ulang."""
+    new_index = np.cumsum(keep) - 1
+    return CompiledForest(
+        feature=feature[keep], threshold=threshold[keep],
+        children=np.ascontiguousarray(new_index[children[keep]], dtype=np.int32),
+        value=np.ascontiguousarray(value[keep]), roots=new_index[roots].astype(np.int32),
+        kind=forest.kind, classes=forest.classes, features=forest.features, targets=forest.targets)
+
+
+def select_trees(forest, n_trees):
+    """N pohon pertama. Node tiap pohon kontigu dan urut, jadi cukup slice array."""
+    if n_trees is None or n_trees >= forest.n_trees:
+        return forest
+    end = int(forest.roots[n_trees])
+    return CompiledForest(forest.feature[:end], forest.threshold[:end], forest.children[:end],
+                          forest.value[:end], forest.roots[:n_trees], forest.kind, forest.classes,
+                          forest.features, forest.targets)
+
+
+def node_depths(forest):
+    """Kedalaman tiap node (root = 0), dihitung per level untuk semua pohon sekaligus."""
+    depth = np.full(forest.n_nodes, -1, dtype=np.int32)
+    frontier = forest.roots.astype(np.int64)
+    level = 0
+    while frontier.size:
+        depth[frontier] = level
+        internal = frontier[forest.feature[frontier] != LEAF]
+        frontier = forest.children[internal].ravel().astype(np.int64)
+        level += 1
+    return depth
+
+
+def truncate_depth(forest, max_depth):
+    """Node internal di kedalaman `max_depth` jadi leaf; subtree di bawahnya dibuang."""
+    if max_depth is None:
+        return forest
+    depth = node_depths(forest)
+    if depth.max() <= max_depth:
+        return forest
+    cut = (depth == max_depth) & (forest.feature != LEAF)
+    self_index = np.arange(forest.n_nodes, dtype=np.int32)
+    feature = np.where(cut, LEAF, forest.feature).astype(forest.feature.dtype)
+    threshold = np.where(cut, np.inf, forest.threshold).astype(forest.threshold.dtype)
+    children = np.where(cut[:, None], self_index[:, None], forest.children)
+    keep = (depth >= 0) & (depth <= max_depth)
+    return _rebuild(forest, keep, feature, threshold, children, forest.value, forest.roots)
+
+
+def float16_floor(values):
+    """Seperti float32_floor: float16 terbesar yang <= nilai asli (inf tetap inf)."""
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(over='ignore'):
+        rounded = values.astype(np.float16)
+    too_big = rounded.astype(np.float64) > values
+    rounded[too_big] = np.nextafter(rounded[too_big], np.float16(-np.inf))
+    return rounded
+
+
+def quantize(forest, dtype):
+    """Threshold & value ke `dtype` ('float64' = value asli, threshold tetap float32)."""
+    feature = forest.feature.astype(np.int8) if forest.feature.max(initial=0) < 128 else forest.feature
+    if dtype == 'float16':
+        threshold = float16_floor(forest.threshold)
+    else:
+        threshold = float32_floor(forest.threshold)
+    value = np.ascontiguousarray(forest.value, dtype=dtype)
+    return CompiledForest(feature, threshold, forest.children, value, forest.roots, forest.kind,
+                          forest.classes, forest.features, forest.targets)
+
+
+def compress(forest, n_trees=None, max_depth=None, dtype='float64'):
+    return quantize(truncate_depth(select_trees(forest, n_trees), max_depth), dtype)
+
+
+# --- VALIDASI ---
+def holdout(path, target, features=FEATURES):
+    """Baris test dari split 80/20 yang sama dengan 06 (stratified status, random_state=42)."""
+    from sklearn.model_selection import train_test_split
+    targets = [target] if isinstance(target, str) else list(target)
+    df = storage.load_frame(path, columns=features + list(dict.fromkeys(['status'] + targets)), compact=True)
+    _, test = train_test_split(df, test_size=0.2, random_state=42, stratify=df['status'])
+    y = test[target].astype(str) if isinstance(target, str) else test[targets]
+    return test[features].to_numpy(dtype='float32'), y
+
+
+def score(forest, X, y):
+    from sklearn.metrics import accuracy_score, f1_score, r2_score
+    pred = forest.predict(X)
+    if forest.kind == 'classifier':
+        return {'f1_macro': f1_score(y, pred, average='macro'), 'accuracy': accuracy_score(y, pred)}
+    return {'r2': r2_score(y, pred)}
+
+
+def latency(forest, X, repeat=LATENCY_REPEAT, batch_rows=BATCH_ROWS):
+    """Median latency 1 baris (ms) & throughput batch (baris/detik)."""
+    forest.predict(X[:1])  # warm-up
+    times = []
+    for i in range(repeat):
+        row = X[i % len(X):i % len(X) + 1]
+        start = time.perf_counter()
+        forest.predict(row)
+        times.append(time.perf_counter() - start)
+    batch = X[:batch_rows]
+    start = time.perf_counter()
+    forest.predict(batch)
+    return {'latency_1_ms': float(np.median(times)) * 1000,
+            'rows_per_s': len(batch) / (time.perf_counter() - start)}
+
+
+def evaluate_variants(forest, X, y, tree_counts=TREE_COUNTS, depths=DEPTHS, dtypes=DTYPES):
+    """Satu baris laporan per kombinasi (pohon, kedalaman, dtype); baris pertama = model asli."""
+    rows = []
+    tree_counts = sorted({min(n, forest.n_trees) for n in tree_counts}, reverse=True)
+    for n_trees, max_depth, dtype in itertools.product(tree_counts, depths, dtypes):
+        with span('variant', trees=n_trees, depth=max_depth, dtype=dtype) as s:
+            variant = compress(forest, n_trees, max_depth, dtype)
+            result = {'trees': n_trees, 'max_depth': max_depth or 0, 'dtype': dtype, 'nodes': variant.n_nodes,
+                      'bytes': variant.nbytes, **score(variant, X, y), **latency(variant, X)}
+            s.set(**{k: v for k, v in result.items() if k != 'dtype'})
+        rows.append(result)
+    report = pd.DataFrame(rows)
+    # Model asli: semua pohon, kedalaman penuh, value float64 (format artifact 06)
+    original = (report['trees'] == forest.n_trees) & (report['max_depth'] == 0) & (report['dtype'] == 'float64')
+    return pd.concat([report[original], report[~original]], ignore_index=True)
+
+
+def choose(report, metric, tolerance=TOLERANCE):
+    """Varian terkecil yang skornya >= skor model asli (baris pertama) - tolerance."""
+    ok = report[report[metric] >= report[metric].iloc[0] - tolerance]
+    return ok.sort_values(['bytes', 'latency_1_ms'], kind='stable').iloc[0]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Kompresi forest (pohon, kedalaman, dtype) + laporan ukuran/latency/skor.")
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--data', default=INPUT_FILENAME)
+    parser.add_argument('--models', nargs='+', default=list(MODELS), choices=list(MODELS))
+    parser.add_argument('--trees', type=int, nargs='+', default=TREE_COUNTS)
+    parser.add_argument('--depths', type=int, nargs='+', default=[d or 0 for d in DEPTHS], help="0 = penuh")
+    parser.add_argument('--dtypes', nargs='+', default=DTYPES, choices=DTYPES)
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--save', metavar='DIR', help="Simpan varian terpilih sebagai artifact di DIR/<model>/")
+    parser.add_argument('--report', default=REPORT_FILENAME)
+    args = parser.parse_args()
+
+    print("="*50)
+    print("🗜️  FOREST COMPRESSION")
+    print("="*50)
+    if not storage.exists(args.data):
+        print(f"❌ Error: File '{args.data}' tidak ditemukan!")
+        raise SystemExit(1)
+
+    reports = []
+    for name in args.models:
+        path = os.path.join(args.model_dir, name)
+        if not model_artifact.artifact_exists(path):
+            print(f"❌ Artifact '{path}' tidak ada (jalankan 06 atau model_artifact.py --export)")
+            continue
+        forest = model_artifact.load_artifact(path, mmap=False)
+        X, y = holdout(args.data, MODELS[name], forest.features or FEATURES)
+        metric = 'f1_macro' if forest.kind == 'classifier' else 'r2'
+        print(f"\n🌲 {name}: {forest.n_trees} pohon, {forest.n_nodes:,} node, {forest.nbytes / 1e6:.2f} MB, "
+              f"validasi {len(X):,} baris hold-out")
+
+        report = evaluate_variants(forest, X, y, args.trees, [d or None for d in args.depths], args.dtypes)
+        report.insert(0, 'model', name)
+        best = choose(report, metric, args.tolerance)
+        report['selected'] = report.index == best.name
+        reports.append(report)
+
+        columns = ['trees', 'max_depth', 'dtype', 'nodes', 'bytes', metric, 'latency_1_ms', 'rows_per_s', 'selected']
+        print(report[columns].to_string(index=False, float_format=lambda v: f'{v:.5f}'))
+        base = report.iloc[0]
+        print(f"\n   ✅ Terpilih: {best['trees']} pohon, kedalaman {best['max_depth'] or 'penuh'}, {best['dtype']} -> "
+              f"{best['bytes'] / 1e6:.3f} MB ({base['bytes'] / best['bytes']:.1f}x lebih kecil), "
+              f"{metric} {best[metric]:.5f} (asli {base[metric]:.5f}, toleransi {args.tolerance})")
+
+        if args.save:
+            variant = compress(forest, int(best['trees']), int(best['max_depth']) or None, best['dtype'])
+            target = os.path.join(args.save, name)
+            os.makedirs(args.save, exist_ok=True)
+            model_artifact.save_artifact(variant, target)
+            print(f"   💾 Artifact -> {target}")
+
+    if reports:
+        pd.concat(reports, ignore_index=True).to_csv(args.report, index=False)
+        print(f"\n📄 Laporan lengkap: {args.report}")
@@ -0,0 +1,273 @@
+"""
+Tuning hyperparameter model forest dengan successive halving dan budget waktu.
+
+    python hyperparameter_search.py                              # semua kandidat, budget default
+    python hyperparameter_search.py --budget 600 --max-size-mb 50
+    python hyperparameter_search.py --models "Random Forest" --task clf
+
+Alur per model & task (clf = status, reg = energy_kwh/pmv/ppd):
+  1. N_CANDIDATES konfigurasi diambil acak dari SEARCH_SPACE.
+  2. Semua konfigurasi dilatih di subsample kecil (MIN_ROWS baris, stratified untuk status)
+     dan dinilai di data validasi (F1 macro / R2).
+  3. 1/FACTOR konfigurasi terbaik lanjut ke subsample FACTOR kali lebih besar, dan seterusnya
+     sampai seluruh data training.
+Model yang lebih besar dari MAX_SIZE_MB langsung gugur. Skor dibulatkan ke SCORE_TOLERANCE,
+jadi jika skor setara (F1 di data ini hampir selalu ~1.0) yang dipilih model paling kecil,
+lalu yang paling cepat dilatih. Jika budget habis, fit yang diperkirakan melewati budget
+tidak dimulai dan pemenang diambil dari konfigurasi yang sudah dievaluasi di data terbanyak.
+
+Data test (split 80/20 yang sama dengan 05/06) tidak disentuh: validasi diambil dari
+bagian training. Hasil: TUNING_FILENAME (semua evaluasi) dan PARAMS_FILENAME
+(parameter terbaik, dipakai 06_bestmodel_training_final.py).
+"""
+import argparse
+import json
+import os
+import pickle
+import time
+import warnings
+import numpy as np
+import pandas as pd
+import storage
+from instrumentation import span
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.metrics import f1_score, r2_score
+from sklearn.model_selection import ParameterSampler, train_test_split
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+from xgboost import XGBClassifier, XGBRegressor
+
+warnings.filterwarnings('ignore')
+
+# --- KONFIGURASI ---
+INPUT_FILENAME  = 'train_data.parquet'
+FEATURES        = ['occupancy', 'temp', 'hum', 'lux', 'noise', 'luas']
+REG_TARGETS     = ['energy_kwh', 'pmv', 'ppd']
+TUNING_FILENAME = 'hasil_tuning.csv'
+PARAMS_FILENAME = 'models/best_params.json'
+BUDGET_S        = 1800       # Budget wall-clock seluruh pencarian (detik)
+N_CANDIDATES    = 12         # Konfigurasi acak per model & task
+MIN_ROWS        = 5_000      # Ukuran subsample ronde pertama
+FACTOR          = 3          # Yang lolos tiap ronde = 1/FACTOR, data ronde berikut = FACTOR kali
+MAX_SIZE_MB     = 200        # Model lebih besar dari ini gugur
+SCORE_TOLERANCE = 1e-3       # Skor dalam toleransi ini dianggap seri
+VAL_SIZE        = 0.2        # Porsi validasi dari data training
+RANDOM_SEED     = 42
+
+SEARCH_SPACE = {
+    'Random Forest': {
+        'clf': lambda p, threads: RandomForestClassifier(**p, random_state=42, class_weight='balanced', n_jobs=threads),
+        'reg': lambda p, threads: RandomForestRegressor(**p, random_state=42, n_jobs=threads),
+        'params': {'n_estimators': [25, 50, 100, 200], 'max_depth': [None, 12, 16, 24],
+                   'min_samples_leaf': [1, 2, 5, 10]},
+    },
+    'XGBoost': {
+        'clf': lambda p, threads: XGBClassifier(**p, eval_metric='mlogloss', random_state=42, n_jobs=threads),
+        # XGBoost >= 2 melatih multi-target langsung (satu pohon per target per ronde)
+        'reg': lambda p, threads: XGBRegressor(**p, objective='reg:squarederror', random_state=42, n_jobs=threads),
+        'params': {'n_estimators': [50, 100, 200, 400], 'max_depth': [4, 6, 8],
+                   'learning_rate': [0.05, 0.1, 0.3]},
+    },
+    'Decision Tree': {
+        'clf': lambda p, threads: DecisionTreeClassifier(**p, random_state=42, class_weight='balanced'),
+        'reg': lambda p, threads: DecisionTreeRegressor(**p, random_state=42),
+        'params': {'max_depth': [None, 8, 12, 16, 24], 'min_samples_leaf': [1, 2, 5, 10]},
+    },
+}
+
+
+def model_size_mb(model):
+    """Ukuran model ter-serialisasi (pickle), proxy untuk ukuran file & memori saat serving."""
+    return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)) / 1e6
+
+
+def score(task, y_true, y_pred):
+    if task == 'clf':
+        return f1_score(y_true, y_pred, average='macro')
+    return r2_score(y_true, y_pred)
+
+
+def rung_sizes(n_rows, n_candidates, min_rows=MIN_ROWS, factor=FACTOR):
+    """Ukuran data tiap ronde: min_rows * factor^i, ronde terakhir selalu seluruh data."""
+    sizes = []
+    size, remaining = min_rows, n_candidates
+    while size < n_rows and remaining > 1:
+        sizes.append(size)
+        size *= factor
+        remaining = max(1, remaining // factor)
+    return sizes + [n_rows]
+
+
+def subsample(y, n_rows, stratify, seed):
+    """Index subsample `n_rows` baris (stratified untuk klasifikasi)."""
+    if n_rows >= len(y):
+        return np.arange(len(y))
+    idx, _ = train_test_split(np.arange(len(y)), train_size=n_rows, random_state=seed,
+                              stratify=y if stratify else None)
+    return np.sort(idx)
+
+
+def rank(entries, tolerance=SCORE_TOLERANCE):
+    """Urutkan: data evaluasi terbanyak, skor (dibulatkan ke toleransi), ukuran, waktu fit."""
+    return sorted(entries, key=lambda e: (-e['rows'], -np.round(e['score'] / tolerance), e['size_mb'], e['fit_s']))
+
+
+class Budget:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.start = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def allows(self, estimate_s=0.0):
+        return self.elapsed + estimate_s <= self.seconds
+
+
+def successive_halving(name, task, data, budget, n_candidates=N_CANDIDATES, min_rows=MIN_ROWS,
+                       factor=FACTOR, max_size_mb=MAX_SIZE_MB, threads=-1, seed=RANDOM_SEED, on_eval=None):
+    """Return list hasil evaluasi (dict) untuk satu model & task."""
+    space = SEARCH_SPACE[name]
+    X_train, y_train, X_val, y_val = data
+    configs = list(ParameterSampler(space['params'], n_iter=n_candidates, random_state=seed))
+    # Grid kecil (mis. Decision Tree) bisa punya kombinasi lebih sedikit dari n_candidates
+    configs = [dict(c) for c in {json.dumps(c, sort_keys=True): c for c in configs}.values()]
+    history, alive = [], list(range(len(configs)))
+    last_fit, prev_rows = {}, None  # index konfigurasi -> waktu fit ronde sebelumnya
+
+    for rung, n_rows in enumerate(rung_sizes(len(y_train), len(configs), min_rows, factor)):
+        idx = subsample(y_train, n_rows, task == 'clf', seed + rung)
+        X_sub, y_sub = X_train[idx], y_train[idx]
+        scale = n_rows / prev_rows if prev_rows else 1.0  # Perkiraan: waktu fit ~ linear jumlah baris
+        prev_rows = n_rows
+        evaluated = []
+        for i in alive:
+            estimate = last_fit.get(i, 0.0) * scale
+            if not budget.allows(estimate):
+                continue
+            model = space[task](configs[i], threads)
+            with span('tune_fit', rows_in=n_rows, model=name, task=task, rung=rung) as s:
+                start = time.perf_counter()
+                model.fit(X_sub, y_sub)
+                fit_s = time.perf_counter() - start
+                start = time.perf_counter()
+                pred = model.predict(X_val)
+                predict_s = time.perf_counter() - start
+                entry = {'model': name, 'task': task, 'rung': rung, 'rows': n_rows, 'params': configs[i],
+                         'score': score(task, y_val, pred), 'fit_s': fit_s, 'predict_s': predict_s,
+                         'size_mb': model_size_mb(model)}
+                entry['too_big'] = entry['size_mb'] > max_size_mb
+                s.set(score=entry['score'], size_mb=entry['size_mb'], fit_s=fit_s)
+            last_fit[i] = fit_s
+            history.append(entry)
+            if on_eval:
+                on_eval(entry)
+            if not entry['too_big']:
+                evaluated.append((i, entry))
+        if not evaluated:
+            break
+        keep = max(1, len(evaluated) // factor)
+        winners = {id(e) for e in rank([e for _, e in evaluated])[:keep]}
+        alive = [i for i, e in evaluated if id(e) in winners]
+        if not budget.allows():
+            break
+    return history
+
+
+def best_configs(history):
+    """Pemenang per (model, task): hanya model yang lolos batas ukuran."""
+    best = {}
+    for e in rank([e for e in history if not e['too_big']]):
+        best.setdefault(e['model'], {}).setdefault(e['task'], e)
+    return best
+
+
+def load_data(path=INPUT_FILENAME, features=FEATURES, val_size=VAL_SIZE, seed=RANDOM_SEED):
+    """Split train/test 80/20 seperti 05/06, lalu validasi diambil dari bagian training."""
+    df = storage.load_frame(path, columns=features + ['status'] + REG_TARGETS, compact=True)
+    X = df[features].to_numpy(dtype='float32')
+    y_cls = df['status'].to_numpy(dtype=object)
+    y_reg = df[REG_TARGETS].to_numpy(dtype='float64')
+    X_train, _, y_cls_train, _, y_reg_train, _ = train_test_split(
+        X, y_cls, y_reg, test_size=0.2, random_state=42, stratify=y_cls)
+    X_fit, X_val, y_cls_fit, y_cls_val, y_reg_fit, y_reg_val = train_test_split(
+        X_train, y_cls_train, y_reg_train, test_size=val_size, random_state=seed, stratify=y_cls_train)
+    classes, y_cls_fit = np.unique(y_cls_fit, return_inverse=True)  # XGBoost butuh label angka
+    y_cls_val = np.searchsorted(classes, y_cls_val)
+    return {'clf': (X_fit, y_cls_fit, X_val, y_cls_val), 'reg': (X_fit, y_reg_fit, X_val, y_reg_val)}
+
+
+def save_best(best, path=PARAMS_FILENAME):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    out = {name: {task: {k: e[k] for k in ('params', 'score', 'rows', 'fit_s', 'predict_s', 'size_mb')}
+                  for task, e in tasks.items()} for name, tasks in best.items()}
+    with open(path + '.tmp', 'w') as f:
+        json.dump(out, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def load_best_params(name, task, path=PARAMS_FILENAME):
+    """Parameter terbaik hasil tuning, atau None jika belum pernah dijalankan."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f).get(name, {}).get(task, {}).get('params')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Successive-halving search untuk model forest.")
+    parser.add_argument('--input', default=INPUT_FILENAME)
+    parser.add_argument('--models', nargs='+', default=list(SEARCH_SPACE), choices=list(SEARCH_SPACE))
+    parser.add_argument('--task', nargs='+', default=['clf', 'reg'], choices=['clf', 'reg'])
+    parser.add_argument('--budget', type=float, default=BUDGET_S, help="Budget wall-clock (detik)")
+    parser.add_argument('--candidates', type=int, default=N_CANDIDATES)
+    parser.add_argument('--min-rows', type=int, default=MIN_ROWS)
+    parser.add_argument('--factor', type=int, default=FACTOR)
+    parser.add_argument('--max-size-mb', type=float, default=MAX_SIZE_MB)
+    parser.add_argument('--threads', type=int, default=-1)
+    parser.add_argument('--output', default=TUNING_FILENAME)
+    parser.add_argument('--params', default=PARAMS_FILENAME)
+    args = parser.parse_args()
+
+    print("="*50)
+    print("🎛️  HYPERPARAMETER SEARCH (SUCCESSIVE HALVING)")
+    print("="*50)
+
+    if not storage.exists(args.input):
+        print(f"❌ Error: File '{args.input}' tidak ditemukan!")
+        exit()
+    with span('load') as s:
+        data = load_data(args.input)
+        s.rows_out = len(data['clf'][1])
+    print(f"\n📂 {len(data['clf'][1]):,} baris training, {len(data['clf'][3]):,} baris validasi")
+
+    def report(e):
+        flag = '  ⚠️ terlalu besar' if e['too_big'] else ''
+        print(f"    [{e['rung']}] {e['rows']:>8,} baris  skor {e['score']:.5f}  fit {e['fit_s']:6.2f}s  "
+              f"{e['size_mb']:7.2f} MB  {e['params']}{flag}")
+
+    budget = Budget(args.budget)
+    history = []
+    per_run = args.budget / (len(args.models) * len(args.task))  # Budget dibagi rata, sisa dipakai run berikutnya
+    for n, (name, task) in enumerate((m, t) for m in args.models for t in args.task):
+        print(f"\n🔎 {name} / {task} (sisa budget {args.budget - budget.elapsed:.0f} detik)")
+        run_budget = Budget(per_run * (n + 1) - budget.elapsed)
+        history += successive_halving(name, task, data[task], run_budget, args.candidates, args.min_rows,
+                                      args.factor, args.max_size_mb, args.threads, on_eval=report)
+
+    if not history:
+        print("❌ Budget habis sebelum ada model yang dievaluasi.")
+        exit()
+    df = pd.DataFrame(history)
+    df['params'] = df['params'].map(lambda p: json.dumps(p, sort_keys=True))
+    df.to_csv(args.output, index=False)
+
+    best = best_configs(history)
+    save_best(best, args.params)
+    print("\n🏆 KONFIGURASI TERBAIK (skor seri -> model terkecil, lalu fit tercepat):")
+    for name, tasks in best.items():
+        for task, e in tasks.items():
+            print(f"    {name:<14} {task}  skor {e['score']:.5f}  {e['size_mb']:7.2f} MB  fit {e['fit_s']:6.2f}s "
+                  f"({e['rows']:,} baris)  {e['params']}")
+    print(f"\n💾 {len(history)} evaluasi -> '{args.output}', parameter terbaik -> '{args.params}'")
+    print(f"✅ SELESAI dalam {budget.elapsed:.1f} detik (budget {args.budget:.0f})")
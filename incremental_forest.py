@@ -0,0 +1,160 @@
+"""
+Update Random Forest secara incremental (windowed tree replacement) + versi model.
+
+Update harian tidak melatih ulang semua pohon:
+  1. Data baru = baris dengan timestamp > `last_timestamp` di TRAINING_STATE.
+  2. Data baru dipisah menurut waktu: bagian terbaru (recent window) untuk validasi,
+     sisanya untuk melatih `n_new` pohon baru dengan parameter model yang sama.
+  3. Pohon baru ditambahkan di akhir ensemble; pohon tertua dipensiunkan jika jumlah
+     pohon melebihi `max_trees`. Biaya training sebanding dengan data baru, bukan histori.
+  4. Model lama & baru dinilai di recent window. Update hanya dipromosikan jika skornya tidak
+     turun lebih dari `max_score_drop`.
+
+Setiap hasil training (full / incremental) disimpan sebagai versi:
+  models/versions/<model>/v0003/model.pkl        model sklearn (untuk update berikutnya / rollback)
+  models/versions/<model>/v0003/artifact/        artifact mmap (lihat model_artifact.py)
+  models/versions/<model>/v0003/training.json    mode, data window, skor validasi, umur pohon
+Versi yang dipromosikan juga ditulis ke models/<model>.pkl & models/<model>/ (dipakai server).
+"""
+import copy
+import json
+import os
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import is_classifier
+import model_artifact
+
+STATE_FILENAME = 'training_state.json'
+VERSIONS_DIR = 'versions'
+
+
+# --- STATE ---
+def load_state(model_dir):
+    path = os.path.join(model_dir, STATE_FILENAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(model_dir, state):
+    path = os.path.join(model_dir, STATE_FILENAME)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def recent_split(df, fraction, timestamp='timestamp'):
+    """Pisah menurut waktu: (train, recent). `recent` = porsi `fraction` baris paling baru."""
+    df = df.sort_values(timestamp, kind='stable')
+    n_recent = int(round(len(df) * fraction))
+    cut = len(df) - n_recent
+    return df.iloc[:cut], df.iloc[cut:]
+
+
+# --- TREE REPLACEMENT ---
+def _align_classes(tree, tree_classes, all_classes):
+    """
+    Pohon yang dilatih di window tanpa semua kelas hanya punya kolom untuk kelas yang muncul.
+    Kolom value diperluas ke urutan kelas model lama (kelas yang tidak ada = 0).
+    """
+    if len(tree_classes) == len(all_classes):
+        return tree
+    state = tree.tree_.__getstate__()
+    values = state['values']
+    full = np.zeros((values.shape[0], values.shape[1], len(all_classes)), dtype=values.dtype)
+    full[:, :, np.searchsorted(all_classes, tree_classes)] = values
+    aligned = type(tree.tree_)(tree.tree_.n_features, np.array([len(all_classes)], dtype=np.intp), 1)
+    aligned.__setstate__({**state, 'values': full})
+    tree.tree_ = aligned
+    tree.n_classes_ = len(all_classes)
+    tree.classes_ = np.arange(len(all_classes), dtype=np.float64)
+    return tree
+
+
+def align_classes(model, classes):
+    """Perluas forest classifier ke urutan kelas `classes` (terurut, superset model.classes_)."""
+    classes = np.asarray(classes)
+    model.estimators_ = [_align_classes(t, model.classes_, classes) for t in model.estimators_]
+    model.classes_ = classes
+    model.n_classes_ = len(classes)
+    return model
+
+
+def grow_trees(model, X, y, n_trees, seed, sample_weight=None):
+    """Latih `n_trees` pohon baru dengan parameter `model`, hanya dari data (X, y)."""
+    params = model.get_params()
+    params.update(n_estimators=n_trees, warm_start=False, oob_score=False, random_state=seed)
+    fresh = type(model)(**params).fit(X, y, sample_weight=sample_weight)
+    trees = list(fresh.estimators_)
+    if is_classifier(model):
+        unknown = set(fresh.classes_) - set(model.classes_)
+        if unknown:
+            raise ValueError(f"Kelas baru {sorted(unknown)} tidak ada di model lama, perlu training full")
+        trees = [_align_classes(t, fresh.classes_, model.classes_) for t in trees]
+    elif fresh.n_outputs_ != model.n_outputs_:
+        raise ValueError(f"Jumlah target berubah ({model.n_outputs_} -> {fresh.n_outputs_})")
+    return trees
+
+
+def replace_trees(model, trees, max_trees):
+    """Tambah pohon baru di akhir, pensiunkan pohon tertua (awal list). Return jumlah dipensiunkan."""
+    estimators = list(model.estimators_) + list(trees)
+    retired = max(0, len(estimators) - max_trees)
+    model.estimators_ = estimators[retired:]
+    model.n_estimators = len(model.estimators_)
+    return retired
+
+
+def update_forest(model, X, y, n_new, max_trees, seed, tree_versions, version, sample_weight=None):
+    """
+    Return (model baru, tree_versions baru, jumlah pensiun). Model lama tidak diubah.
+    `tree_versions[i]` = versi tempat pohon ke-i dilatih (untuk melihat umur ensemble).
+    """
+    updated = copy.copy(model)  # estimators_ diganti list baru, pohon lama dipakai bersama
+    retired = replace_trees(updated, grow_trees(model, X, y, n_new, seed, sample_weight), max_trees)
+    versions = (list(tree_versions) + [version] * n_new)[retired:]
+    return updated, versions, retired
+
+
+# --- VERSIONING ---
+def version_dir(model_dir, name, version):
+    return os.path.join(model_dir, VERSIONS_DIR, name, f'v{version:04d}')
+
+
+def save_version(model, model_dir, name, version, features, info, targets=None, promote=True):
+    """Simpan model sebagai versi baru; jika `promote`, juga jadi model aktif (pkl + artifact)."""
+    path = version_dir(model_dir, name, version)
+    os.makedirs(path, exist_ok=True)
+    joblib.dump(model, os.path.join(path, 'model.pkl'))
+    model_artifact.export_model(model, os.path.join(path, 'artifact'), features, targets=targets)
+    info = {'version': version, 'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'promoted': promote,
+            'n_trees': len(model.estimators_), **info}
+    with open(os.path.join(path, 'training.json'), 'w') as f:
+        json.dump(info, f, indent=2, default=str)
+    if promote:
+        joblib.dump(model, os.path.join(model_dir, f'{name}.pkl'))
+        model_artifact.export_model(model, os.path.join(model_dir, name), features, targets=targets)
+    return info
+
+
+def list_versions(model_dir, name):
+    """Metadata semua versi model (urut versi)."""
+    root = os.path.join(model_dir, VERSIONS_DIR, name)
+    if not os.path.isdir(root):
+        return []
+    out = []
+    for entry in sorted(os.listdir(root)):
+        meta = os.path.join(root, entry, 'training.json')
+        if os.path.exists(meta):
+            with open(meta) as f:
+                out.append(json.load(f))
+    return out
+
+
+def time_window(df, timestamp='timestamp'):
+    if len(df) == 0:
+        return None
+    return [str(pd.Timestamp(df[timestamp].min())), str(pd.Timestamp(df[timestamp].max()))]
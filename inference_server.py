@@ -0,0 +1,318 @@
+"""
+Server inferensi lokal untuk model Random Forest hasil 06_bestmodel_training_final.py.
+
+Model dimuat SEKALI saat start dari artifact mmap (model_artifact.py); jika artifact belum
+ada, .pkl dimuat lalu di-compile. Request yang datang bersamaan dikumpulkan menjadi
+micro-batch (maks. MAX_BATCH baris atau menunggu maks. MAX_WAIT_MS) lalu diprediksi
+dengan satu kali `predict` untuk classifier dan regressor.
+
+    python inference_server.py                      # jalankan server (default 127.0.0.1:8765)
+    python inference_server.py --load-test 20000    # server + stand-in client, cetak latency
+
+Endpoint:
+    POST /predict   body: {"occupancy":.., "temp":.., "hum":.., "lux":.., "noise":.., "luas":..}
+                    atau list dari object tersebut. Jika model dilatih dengan fitur temporal,
+                    tambahkan "timestamp" (dan "room_id" untuk multi-room); fitur dihitung
+                    dengan temporal_features.TemporalFeatures yang sama seperti saat training.
+    GET  /metrics   p50/p99 latency, throughput, ukuran batch
+    GET  /health
+"""
+import argparse
+import http.client
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+import model_artifact
+from rooms import DEFAULT_ROOM
+from temporal_features import TemporalFeatures, TIMESTAMP, ROOM
+
+# --- KONFIGURASI ---
+MODEL_DIR = 'models/'
+STATUS_MODEL = 'rf_status_model'  # folder artifact (fallback: <nama>.pkl)
+ENERGY_MODEL = 'rf_energy_model'
+FEATURES = ['occupancy', 'temp', 'hum', 'lux', 'noise', 'luas']
+REG_TARGETS = ['energy_kwh', 'pmv', 'ppd']
+HOST, PORT = '127.0.0.1', 8765
+MAX_BATCH = 256     # Baris maksimum per micro-batch
+MAX_WAIT_MS = 2.0   # Waktu tunggu maksimum untuk mengumpulkan batch
+LATENCY_WINDOW = 20_000
+
+
+class LatencyStats:
+    """Counter latency & throughput (thread-safe), untuk endpoint /metrics."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.started = time.perf_counter()
+        self.predictions = 0
+        self.batches = 0
+
+    def record_batch(self, latencies_s):
+        with self._lock:
+            self._latencies.extend(latencies_s)
+            self.predictions += len(latencies_s)
+            self.batches += 1
+
+    def snapshot(self):
+        with self._lock:
+            lat = np.array(self._latencies, dtype='float64') * 1000
+            predictions, batches = self.predictions, self.batches
+        uptime = time.perf_counter() - self.started
+        return {
+            'predictions': predictions,
+            'batches': batches,
+            'mean_batch_size': predictions / batches if batches else 0.0,
+            'uptime_s': uptime,
+            'throughput_per_s': predictions / uptime if uptime > 0 else 0.0,
+            'latency_p50_ms': float(np.percentile(lat, 50)) if len(lat) else None,
+            'latency_p99_ms': float(np.percentile(lat, 99)) if len(lat) else None,
+        }
+
+
+def load_model(path):
+    """Artifact mmap jika ada, selain itu .pkl yang di-compile ke CompiledForest."""
+    if model_artifact.artifact_exists(path):
+        return model_artifact.load_artifact(path)
+    import joblib
+    from compiled_forest import compile_forest
+    return compile_forest(joblib.load(f'{path}.pkl'), features=FEATURES)
+
+
+class MicroBatchPredictor:
+    """Mengumpulkan request dari banyak thread dan memprediksinya per batch di satu worker thread."""
+
+    def __init__(self, clf, reg, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.clf = clf
+        self.reg = reg
+        self.features = list(getattr(clf, 'features', None) or FEATURES)
+        extra = [f for f in self.features if f not in FEATURES]
+        self.temporal = TemporalFeatures() if extra else None
+        if self.temporal is not None and not set(extra) <= set(self.temporal.names):
+            raise ValueError(f"Fitur model tidak dikenal: {sorted(set(extra) - set(self.temporal.names))}")
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.stats = LatencyStats()
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+
+    @classmethod
+    def from_files(cls, model_dir=MODEL_DIR, **kwargs):
+        return cls(load_model(f'{model_dir}{STATUS_MODEL}'), load_model(f'{model_dir}{ENERGY_MODEL}'), **kwargs)
+
+    def submit(self, reading):
+        """Kirim satu bacaan sensor (dict) -> Future berisi dict hasil prediksi."""
+        row = {f: float(reading[f]) for f in FEATURES}
+        if self.temporal is not None:
+            row[TIMESTAMP] = pd.Timestamp(reading[TIMESTAMP])
+            row[ROOM] = reading.get(ROOM) or DEFAULT_ROOM
+        future = Future()
+        self._queue.put((row, future, time.perf_counter()))
+        return future
+
+    def predict(self, readings, timeout=10.0):
+        futures = [self.submit(r) for r in readings]
+        return [f.result(timeout=timeout) for f in futures]
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                if self.temporal is not None:
+                    batch = self._drop_late(batch)
+                    if not batch:
+                        continue
+                rows = pd.DataFrame([row for row, _, _ in batch])
+                if self.temporal is not None:
+                    rows = rows.join(self.temporal.transform(rows))
+                X = rows[self.features].to_numpy(dtype=np.float32)
+                status = self.clf.predict(X)
+                values = np.asarray(self.reg.predict(X)).reshape(len(batch), -1)
+            except Exception as exc:
+                for _, future, _ in batch:
+                    future.set_exception(exc)
+                continue
+            done = time.perf_counter()
+            for i, (_, future, _) in enumerate(batch):
+                result = {'status': str(status[i])}
+                result.update({name: float(values[i, j]) for j, name in enumerate(REG_TARGETS)})
+                future.set_result(result)
+            self.stats.record_batch([done - t0 for _, _, t0 in batch])
+
+    def _drop_late(self, batch):
+        """Bacaan yang lebih lama dari data terakhir ruangannya ditolak (window sudah lewat)."""
+        kept, latest = [], {}
+        for item in sorted(batch, key=lambda item: item[0][TIMESTAMP]):
+            row, future, _ = item
+            room, ts = row[ROOM], row[TIMESTAMP]
+            if self.temporal.is_late(room, ts) or (room in latest and ts <= latest[room]):
+                future.set_exception(ValueError(f"timestamp {ts} terlambat / duplikat untuk ruangan {room!r}"))
+                continue
+            latest[room] = ts
+            kept.append(item)
+        return kept
+
+
+def make_handler(predictor):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive untuk client yang mengirim banyak request
+
+        def _send(self, code, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/metrics':
+                self._send(200, predictor.stats.snapshot())
+            elif self.path == '/health':
+                self._send(200, {'status': 'ok'})
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._send(404, {'error': 'not found'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length))
+                readings = payload if isinstance(payload, list) else [payload]
+                results = predictor.predict(readings)
+            except (KeyError, ValueError, TypeError) as exc:
+                self._send(400, {'error': f'input tidak valid: {exc}'})
+                return
+            except FutureTimeout:
+                self._send(503, {'error': 'timeout: prediksi tidak selesai tepat waktu (server sibuk)'})
+                return
+            except Exception as exc:
+                # Error lain dari model (diteruskan lewat future) tetap dijawab, client tidak menggantung
+                self._send(500, {'error': f'{type(exc).__name__}: {exc}'})
+                return
+            self._send(200, results if isinstance(payload, list) else results[0])
+
+        def log_message(self, *args):
+            pass  # Tidak log per request (mahal untuk ribuan request/detik)
+
+    return Handler
+
+
+class InferenceHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 512  # Default (5) terlalu kecil untuk banyak client yang connect bersamaan
+
+
+def serve(predictor, host=HOST, port=PORT):
+    return InferenceHTTPServer((host, port), make_handler(predictor))
+
+
+# --- STAND-IN CLIENT (simulasi controller gedung) ---
+class InferenceClient:
+    """Client HTTP sederhana dengan koneksi keep-alive."""
+
+    def __init__(self, host=HOST, port=PORT, timeout=10.0):
+        self.conn = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _request(self, method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body else {}
+        self.conn.request(method, path, body=body, headers=headers)
+        response = self.conn.getresponse()
+        data = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(data.get('error', response.status))
+        return data
+
+    def predict(self, reading):
+        return self._request('POST', '/predict', reading)
+
+    def metrics(self):
+        return self._request('GET', '/metrics')
+
+    def close(self):
+        self.conn.close()
+
+
+def load_test(n_requests, concurrency, host=HOST, port=PORT, seed=42):
+    """Kirim n_requests bacaan acak dari `concurrency` client paralel, return metrics server."""
+    rng = np.random.default_rng(seed)
+    readings = pd.DataFrame({
+        'occupancy': rng.integers(0, 90, n_requests),
+        'temp': rng.uniform(18, 31, n_requests),
+        'hum': rng.uniform(40, 85, n_requests),
+        'lux': rng.uniform(100, 750, n_requests),
+        'noise': rng.uniform(30, 75, n_requests),
+        'luas': 176.0,
+    }).to_dict('records')
+
+    def worker(part):
+        client = InferenceClient(host, port)
+        try:
+            for reading in part:
+                client.predict(reading)
+        finally:
+            client.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, [readings[i::concurrency] for i in range(concurrency)]))
+    elapsed = time.perf_counter() - start
+    client = InferenceClient(host, port)
+    metrics = client.metrics()
+    client.close()
+    metrics['client_elapsed_s'] = elapsed
+    metrics['client_throughput_per_s'] = n_requests / elapsed
+    return metrics
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Server inferensi micro-batch untuk model RF.")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH)
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT_MS)
+    parser.add_argument('--load-test', type=int, metavar='N', help="Jalankan stand-in client dengan N request")
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args()
+
+    print("📂 Memuat model...")
+    t0 = time.perf_counter()
+    predictor = MicroBatchPredictor.from_files(args.model_dir, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    print(f"   ✅ Model dimuat dalam {time.perf_counter() - t0:.2f} detik")
+    server = serve(predictor, args.host, args.port)
+
+    if args.load_test:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"🥊 Load test: {args.load_test:,} request, {args.concurrency} client paralel...")
+        result = load_test(args.load_test, args.concurrency, args.host, args.port)
+        for key, value in result.items():
+            print(f"   {key:<24} {value:,.3f}" if isinstance(value, float) else f"   {key:<24} {value:,}")
+        server.shutdown()
+    else:
+        print(f"🚀 Server berjalan di http://{args.host}:{args.port} (Ctrl+C untuk berhenti)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.shutdown()
@@ -0,0 +1,153 @@
+"""
+Instrumentasi ringan: span bernama di sekitar tiap langkah script, ditulis sebagai JSON lines.
+
+Aktif hanya jika environment variable PIPELINE_METRICS diisi (path file, atau '-' untuk stderr).
+Saat tidak aktif, `span()` mengembalikan objek no-op yang sama setiap kali, jadi biayanya
+hanya satu pengecekan global.
+
+    with span('filter_invalid', rows_in=len(df)) as s:
+        df = df[df['status'] != 'Invalid']
+        s.rows_out = len(df)
+        s.set(invalid=jumlah_invalid)
+
+Satu baris JSON per span:
+    {"ts": ..., "run_id": ..., "script": "03_final_preparation.py", "span": "prepare/filter_invalid",
+     "elapsed_s": ..., "rows_in": ..., "rows_out": ..., "dropped": ..., "rss_mb": ..., "peak_rss_mb": ...,
+     "status": "ok", ...field tambahan}
+PIPELINE_RUN_ID (diisi run_pipeline.py) mengelompokkan semua span dari satu run.
+"""
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+METRICS_ENV = 'PIPELINE_METRICS'
+RUN_ID_ENV = 'PIPELINE_RUN_ID'
+
+_lock = threading.Lock()
+_local = threading.local()
+_sink = None
+_run_id = None
+_script = None
+
+
+def memory_usage():
+    """
+    RSS proses ini dalam MB. `private_mb` (RssAnon) adalah memori milik proses sendiri;
+    `shared_mb` (RssFile) adalah halaman file/mmap yang bisa dibagi antar proses.
+    """
+    usage = {'rss_mb': None, 'private_mb': None, 'shared_mb': None}
+    fields = {'VmRSS': 'rss_mb', 'RssAnon': 'private_mb', 'RssFile': 'shared_mb'}
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                key, value = line.split(':', 1)
+                if key in fields:
+                    usage[fields[key]] = int(value.split()[0]) / 1024
+    except OSError:
+        usage['rss_mb'] = peak_rss_mb()
+    return usage
+
+
+def peak_rss_mb():
+    """Peak RSS proses ini sejak start (MB)."""
+    import resource
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def configure(path=None, run_id=None, script=None):
+    """Aktifkan (path) atau matikan (None) output metrik. Dipanggil otomatis dari environment saat import."""
+    global _sink, _run_id, _script
+    with _lock:
+        if _sink not in (None, sys.stderr):
+            _sink.close()
+        if not path:
+            _sink = None
+        elif path == '-':
+            _sink = sys.stderr
+        else:
+            _sink = open(path, 'a', buffering=1)  # line-buffered: aman di-tail saat run berjalan
+    _run_id = run_id or os.environ.get(RUN_ID_ENV) or uuid.uuid4().hex[:12]
+    _script = script or os.path.basename(sys.argv[0] or 'python')
+
+
+def enabled():
+    return _sink is not None
+
+
+def emit(record):
+    line = json.dumps(record, default=str)
+    with _lock:
+        if _sink is not None:
+            _sink.write(line + '\n')
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+    def set(self, **fields):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    def __init__(self, name, rows_in=None, fields=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.dropped = None
+        self.fields = fields or {}
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        self.path = '/'.join([s.name for s in stack] + [self.name])
+        stack.append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        _local.stack.pop()
+        dropped = self.dropped
+        if dropped is None and self.rows_in is not None and self.rows_out is not None:
+            dropped = self.rows_in - self.rows_out
+        record = {
+            'ts': time.time(), 'run_id': _run_id, 'script': _script, 'span': self.path,
+            'elapsed_s': round(elapsed, 6), 'rows_in': self.rows_in, 'rows_out': self.rows_out,
+            'dropped': dropped, 'rss_mb': memory_usage()['rss_mb'], 'peak_rss_mb': peak_rss_mb(),
+            'status': 'ok' if exc_type is None else 'error',
+        }
+        if exc_type is not None:
+            record['error'] = f'{exc_type.__name__}: {exc}'
+        record.update(self.fields)
+        emit(record)
+        return False
+
+
+def span(name, rows_in=None, **fields):
+    """Context manager untuk satu langkah. No-op jika instrumentasi tidak aktif."""
+    if _sink is None:
+        return NOOP_SPAN
+    return Span(name, rows_in, fields)
+
+
+configure(os.environ.get(METRICS_ENV))
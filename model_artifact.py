@@ -0,0 +1,160 @@
+"""
+Format artifact model yang bisa di-memory-map (dibagi antar proses worker).
+
+Satu model = satu folder:
+  manifest.json   metadata kecil: jenis model, urutan fitur, kelas label, nama target,
+                  dan daftar array (file, dtype, shape)
+  <array>.npy     array node CompiledForest (feature, threshold, children, value, roots)
+
+Array dibuka dengan `np.load(mmap_mode='r')`, jadi load hanya membaca manifest dan header
+.npy. Halaman data dibaca OS saat dipakai dan dibagi lewat page cache, sehingga 16 worker
+di satu host tidak menyimpan 16 salinan pohon.
+
+    python model_artifact.py --report models/            # waktu load & RSS: .pkl vs artifact
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import numpy as np
+from compiled_forest import CompiledForest, compile_forest
+from instrumentation import memory_usage
+
+MANIFEST = 'manifest.json'
+FEATURES = ['occupancy', 'temp', 'hum', 'lux', 'noise', 'luas']
+REG_TARGETS = ['energy_kwh', 'pmv', 'ppd']
+FORMAT_VERSION = 1
+
+
+def save_artifact(forest, path):
+    """Simpan CompiledForest ke folder `path` (ditulis ke folder sementara lalu di-rename)."""
+    tmp_path = path.rstrip('/\\') + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    arrays = {}
+    for name, array in forest.arrays().items():
+        filename = f'{name}.npy'
+        np.save(os.path.join(tmp_path, filename), np.ascontiguousarray(array))
+        arrays[name] = {'file': filename, 'dtype': str(array.dtype), 'shape': list(array.shape)}
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'kind': forest.kind,
+        'features': forest.features,
+        'classes': forest.classes.tolist() if forest.classes is not None else None,
+        'targets': forest.targets,
+        'n_trees': forest.n_trees,
+        'n_nodes': forest.n_nodes,
+        'arrays': arrays,
+    }
+    with open(os.path.join(tmp_path, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    if os.path.exists(path):
+        old_path = path.rstrip('/\\') + '.old'
+        shutil.rmtree(old_path, ignore_errors=True)
+        os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+    else:
+        os.replace(tmp_path, path)
+    return manifest
+
+
+def export_model(model, path, features, targets=None):
+    """Compile model sklearn lalu simpan sebagai artifact."""
+    return save_artifact(compile_forest(model, features=features, targets=targets), path)
+
+
+def read_manifest(path):
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Versi artifact tidak didukung: {manifest.get('format_version')} ({path})")
+    return manifest
+
+
+def load_artifact(path, mmap=True):
+    """Buka artifact sebagai CompiledForest. mmap=True -> array read-only & dibagi antar proses."""
+    manifest = read_manifest(path)
+    arrays = {}
+    for name, info in manifest['arrays'].items():
+        array = np.load(os.path.join(path, info['file']), mmap_mode='r' if mmap else None)
+        if str(array.dtype) != info['dtype'] or list(array.shape) != info['shape']:
+            raise ValueError(f"Array '{name}' tidak cocok dengan manifest ({path})")
+        arrays[name] = array
+    return CompiledForest(**arrays, kind=manifest['kind'], classes=manifest['classes'],
+                          features=manifest['features'], targets=manifest.get('targets'))
+
+
+def artifact_exists(path):
+    return os.path.exists(os.path.join(path, MANIFEST))
+
+
+_WORKER_CODE = """
+import json, sys, time
+import numpy as np
+import model_artifact
+kind, path = sys.argv[1], sys.argv[2]
+before = model_artifact.memory_usage()
+t1 = time.perf_counter()
+if kind == 'pickle':
+    import joblib
+    model = joblib.load(path)
+    model.n_jobs = 1
+else:
+    model = model_artifact.load_artifact(path)
+t2 = time.perf_counter()
+X = np.random.default_rng(0).uniform([0, 18, 40, 100, 30, 176], [90, 31, 85, 750, 75, 176], size=(64, 6))
+model.predict(X if kind != 'pickle' else __import__('pandas').DataFrame(X, columns=model.feature_names_in_))
+t3 = time.perf_counter()
+after = model_artifact.memory_usage()
+print(json.dumps({'load_ms': (t2 - t1) * 1000, 'first_predict_ms': (t3 - t2) * 1000,
+                  **{k: (after[k] - before[k]) if after[k] is not None else None for k in after}}))
+"""
+
+
+def measure_load(kind, path):
+    """Load model di proses baru (cold start), return waktu load & tambahan RSS."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.path.dirname(os.path.abspath(__file__)) + os.pathsep + env.get('PYTHONPATH', '')
+    out = subprocess.run([sys.executable, '-c', _WORKER_CODE, kind, path],
+                         capture_output=True, text=True, check=True, env=env)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def report(model_dir='models/', names=('rf_status_model', 'rf_energy_model')):
+    rows = []
+    for name in names:
+        pkl_path = os.path.join(model_dir, f'{name}.pkl')
+        artifact_path = os.path.join(model_dir, name)
+        if os.path.exists(pkl_path):
+            rows.append({'model': name, 'format': 'pickle', **measure_load('pickle', pkl_path)})
+        if artifact_exists(artifact_path):
+            rows.append({'model': name, 'format': 'artifact (mmap)', **measure_load('artifact', artifact_path)})
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export / ukur artifact model yang bisa di-mmap.")
+    parser.add_argument('--export', metavar='MODEL_DIR', help="Buat artifact dari .pkl di folder ini")
+    parser.add_argument('--report', metavar='MODEL_DIR', help="Ukur waktu load & RSS (.pkl vs artifact)")
+    args = parser.parse_args()
+
+    if args.export:
+        import joblib
+        for name, targets in (('rf_status_model', None), ('rf_energy_model', REG_TARGETS)):
+            model = joblib.load(os.path.join(args.export, f'{name}.pkl'))
+            manifest = export_model(model, os.path.join(args.export, name), FEATURES, targets=targets)
+            print(f"💾 {name}: {manifest['n_trees']} pohon, {manifest['n_nodes']:,} node")
+    if args.report:
+        print("📊 Cold start per proses worker (tambahan memori setelah load + 1x predict):")
+        fmt = lambda v: f"{v:6.1f}" if v is not None else '   n/a'
+        for row in report(args.report):
+            print(f"   {row['model']:<16} {row['format']:<16} load {row['load_ms']:8.1f} ms   "
+                  f"predict pertama {row['first_predict_ms']:7.1f} ms   RSS +{fmt(row['rss_mb'])} MB "
+                  f"(privat +{fmt(row['private_mb'])}, shared +{fmt(row['shared_mb'])})")
+    if not (args.export or args.report):
+        parser.print_help()
@@ -0,0 +1,134 @@
+"""
+Scheduler benchmark model: job classifier & regressor dijalankan bersamaan dengan budget core tetap.
+
+Kandidat didefinisikan sebagai dict (lihat 05_model_training.py):
+    {'name': 'Random Forest',
+     'clf': lambda threads: RandomForestClassifier(..., n_jobs=threads),
+     'reg': lambda threads: RandomForestRegressor(..., n_jobs=threads),
+     'parallel': True,     # False -> model single-thread, selalu dapat 1 core
+     'cost': 4,            # perkiraan relatif lama training (untuk urutan & pembagian core)
+     'per_target': False}  # True -> satu job regressor per target (mis. XGBoost)
+Factory menerima jumlah thread yang dialokasikan, jadi kandidat baru cukup ditambahkan ke list.
+
+Job dijalankan di thread pool (fit/predict sklearn & xgboost melepas GIL), job paling mahal
+dimulai lebih dulu, dan total thread yang berjalan tidak melebihi budget.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+from sklearn.utils.validation import has_fit_parameter
+from instrumentation import span
+
+
+class BenchmarkJob:
+    def __init__(self, candidate, task, factory, cost, parallel, target=None):
+        self.candidate = candidate
+        self.task = task          # 'clf' atau 'reg'
+        self.factory = factory
+        self.cost = cost
+        self.parallel = parallel
+        self.target = target      # nama kolom jika regressor dilatih per target
+        self.threads = 1
+        self.result = None
+
+    @property
+    def label(self):
+        suffix = f"[{self.target}]" if self.target else ''
+        return f"{self.candidate} / {self.task}{suffix}"
+
+
+def build_jobs(candidates, reg_targets):
+    jobs = []
+    for c in candidates:
+        parallel = c.get('parallel', True)
+        cost = c.get('cost', 1)
+        jobs.append(BenchmarkJob(c['name'], 'clf', c['clf'], cost, parallel))
+        if c.get('per_target'):
+            jobs += [BenchmarkJob(c['name'], 'reg', c['reg'], cost, parallel, target=t) for t in reg_targets]
+        else:
+            jobs.append(BenchmarkJob(c['name'], 'reg', c['reg'], cost, parallel))
+    return jobs
+
+
+def allocate_threads(jobs, core_budget):
+    """Model single-thread dapat 1 core, sisa budget dibagi ke model paralel sesuai `cost`."""
+    parallel = [j for j in jobs if j.parallel]
+    for j in jobs:
+        j.threads = 1
+    free = core_budget - (len(jobs) - len(parallel))
+    total_cost = sum(j.cost for j in parallel)
+    if parallel and free > len(parallel):
+        for j in parallel:
+            j.threads = max(1, int(free * j.cost / total_cost))
+    return jobs
+
+
+def _run_job(job, data):
+    X_train, X_test, y_train, y_test = data[job.task]
+    if job.target is not None:
+        y_train = y_train[job.target]
+    model = job.factory(job.threads)
+    # Bobot baris (data compact, lihat steady_state.py); model tanpa sample_weight (KNN) dilatih tanpa bobot
+    weight = data.get('sample_weight')
+    fit_kwargs = {'sample_weight': weight} if weight is not None and has_fit_parameter(model, 'sample_weight') else {}
+    with span('job', rows_in=len(X_train), job=job.label, threads=job.threads) as s:
+        start = time.perf_counter()
+        model.fit(X_train, y_train, **fit_kwargs)
+        fit_s = time.perf_counter() - start
+        start = time.perf_counter()
+        pred = model.predict(X_test)
+        predict_s = time.perf_counter() - start
+        s.set(fit_s=fit_s, predict_s=predict_s)
+    return {'pred': pred, 'fit_s': fit_s, 'predict_s': predict_s, 'weighted': bool(fit_kwargs)}
+
+
+def run_jobs(jobs, data, core_budget, on_done=None):
+    """
+    Jalankan semua job. `data` = {'clf': (X_train, X_test, y_train, y_test), 'reg': (...)},
+    opsional 'sample_weight': bobot baris training.
+    Job dimulai selama thread yang sedang dipakai + thread job <= core_budget.
+    """
+    queue = sorted(jobs, key=lambda j: j.cost, reverse=True)
+    running = {}
+    used = 0
+    with ThreadPoolExecutor(max_workers=max(1, len(jobs))) as pool:
+        while queue or running:
+            # Mulai job berikutnya yang muat di budget (job pertama selalu boleh jalan)
+            for job in list(queue):
+                if used + job.threads <= core_budget or not running:
+                    queue.remove(job)
+                    running[pool.submit(_run_job, job, data)] = job
+                    used += job.threads
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                job = running.pop(future)
+                used -= job.threads
+                job.result = future.result()
+                if on_done:
+                    on_done(job)
+    return jobs
+
+
+def collect_predictions(jobs, reg_targets):
+    """Gabungkan hasil job per kandidat: prediksi clf/reg + total fit & predict time."""
+    per_candidate = {}
+    for job in jobs:
+        entry = per_candidate.setdefault(job.candidate, {'fit_s': 0.0, 'predict_s': 0.0, 'reg_parts': {}})
+        entry['fit_s'] += job.result['fit_s']
+        entry['predict_s'] += job.result['predict_s']
+        if job.task == 'clf':
+            entry['pred_clf'] = job.result['pred']
+        elif job.target is None:
+            entry['pred_reg'] = job.result['pred']
+        else:
+            entry['reg_parts'][job.target] = job.result['pred']
+    for entry in per_candidate.values():
+        parts = entry.pop('reg_parts')
+        if parts:
+            entry['pred_reg'] = np.column_stack([parts[t] for t in reg_targets])
+    return per_candidate
+
+
+def default_core_budget():
+    return len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
@@ -0,0 +1,95 @@
+"""
+Pipeline multi-room: extract -> agregasi -> labeling per ruangan, paralel di beberapa proses.
+
+    python multi_room_pipeline.py                        # input & konfigurasi default
+    python multi_room_pipeline.py --input raw_rooms/     # folder berisi <room_id>.csv
+    python multi_room_pipeline.py --workers 8
+
+Output per ruangan ada di ROOMS_DIR/<room_id>/ (extracted, clean, gap_intervals, train_data), lalu
+shard train_data digabung ke COMBINED_FILENAME dan tabel gap ke COMBINED_GAPS. Ruangan yang gagal dilewati dan dilaporkan.
+"""
+import argparse
+import os
+import sys
+import time
+import rooms
+from instrumentation import span
+
+# --- KONFIGURASI ---
+INPUT_FILENAME    = 'raw_data.csv'              # file raw (kolom room_id / device_id) atau folder <room_id>.csv
+ROOMS_FILENAME    = rooms.ROOMS_FILENAME
+ROOMS_DIR         = 'rooms/'
+COMBINED_FILENAME = 'train_data_rooms.parquet'
+COMBINED_CUBE     = 'summary_cube_rooms.parquet'  # Summary cube semua ruangan (lihat summary_cube.py)
+COMBINED_GAPS     = 'gap_intervals_rooms.parquet'  # Gap hasil deteksi otomatis semua ruangan
+WORKERS           = os.cpu_count()
+CHUNK_SIZE        = 200_000
+THRESHOLD_RATIO   = 0.3
+GAP_WINDOWS       = [("2025-12-24 00:00:00", "2025-12-28 23:59:59")]  # Window sintetis tambahan, dipotong per ruangan
+GAP_RESOLUTION    = 's'
+SHORT_GAP_S       = 300  # Gap terdeteksi <= ini diinterpolasi, lebih panjang diisi data sintetis
+RANDOM_SEED       = 42
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Jalankan pipeline per ruangan secara paralel.")
+    parser.add_argument('--input', default=INPUT_FILENAME)
+    parser.add_argument('--rooms', default=ROOMS_FILENAME, help="Tabel metadata ruangan")
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--no-gap', action='store_true', help="Gap tidak diisi (tanpa interpolasi & data sintetis)")
+    args = parser.parse_args()
+
+    print("="*50)
+    print("🏢  MULTI-ROOM PIPELINE")
+    print("="*50)
+
+    if not os.path.exists(args.input):
+        print(f"❌ Error: '{args.input}' tidak ditemukan!")
+        sys.exit(1)
+    room_table = rooms.load_rooms(args.rooms)
+    print(f"\n📋 {len(room_table)} ruangan terdaftar di '{args.rooms}'")
+
+    # 1. PARTISI
+    print(f"\n✂️  [1/3] Mempartisi raw per ruangan: {args.input}...")
+    with span('partition') as s:
+        partitions = rooms.partition_raw(args.input, ROOMS_DIR, room_table, chunksize=CHUNK_SIZE)
+        s.set(rooms=len(partitions))
+    print(f"    {len(partitions)} partisi ruangan")
+
+    # 2. PROSES PER RUANGAN
+    print(f"\n⚙️   [2/3] Memproses ruangan dengan {args.workers} worker...")
+    options = {'gap_windows': [] if args.no_gap else GAP_WINDOWS, 'gap_resolution': GAP_RESOLUTION,
+               'fill_gaps': not args.no_gap, 'short_gap_s': SHORT_GAP_S,
+               'seed': RANDOM_SEED, 'threshold_ratio': THRESHOLD_RATIO, 'chunksize': CHUNK_SIZE}
+
+    def report(result):
+        if result['ok']:
+            print(f"    ✅ {result['room_id']:<16} {result['raw_rows']:>10,} raw -> {result['train_rows']:>10,} "
+                  f"baris train, {result['gaps']:,} gap ({result['seconds']:.1f} detik)")
+        else:
+            print(f"    ❌ {result['room_id']:<16} {result['error']}")
+
+    start = time.perf_counter()
+    with span('rooms', workers=args.workers) as s:
+        results = rooms.run_rooms(partitions, room_table, ROOMS_DIR, workers=args.workers,
+                                  options=options, on_done=report)
+        s.set(failed=sum(not r['ok'] for r in results))
+    elapsed = time.perf_counter() - start
+    new_rows = sum(r['new_rows'] for r in results if r['ok'])
+    print(f"    ⏱️ {new_rows:,} baris raw baru dalam {elapsed:.1f} detik ({new_rows / max(elapsed, 1e-9):,.0f} baris/detik)")
+
+    # 3. GABUNG SHARD
+    print(f"\n💾  [3/3] Menggabungkan shard ke: {COMBINED_FILENAME}...")
+    with span('combine') as s:
+        combined_rows = rooms.combine_shards(results, ROOMS_DIR, COMBINED_FILENAME, cube_path=COMBINED_CUBE,
+                                             gaps_path=COMBINED_GAPS)
+        s.rows_out = combined_rows
+    print(f"    {combined_rows:,} baris dari {sum(r['ok'] for r in results)} ruangan, cube -> {COMBINED_CUBE}, gap -> {COMBINED_GAPS}")
+
+    failed = [r for r in results if not r['ok']]
+    print("\n" + "="*50)
+    if failed:
+        print(f"⚠️  SELESAI dengan {len(failed)} ruangan gagal: {', '.join(r['room_id'] for r in failed)}")
+        print("="*50)
+        sys.exit(1)
+    print(f"✅  SELESAI! {len(results)} ruangan diproses.")
+    print("="*50)
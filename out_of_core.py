@@ -0,0 +1,374 @@
+"""
+Training out-of-core: data training dibaca per chunk dari disk, tidak pernah utuh di memori.
+
+    python out_of_core.py --evaluate                          # in-memory vs out-of-core (RF & XGBoost)
+    python out_of_core.py --evaluate train_data_rooms.parquet --chunksize 200000
+
+Split hold-out tetap stratified seperti train_test_split(..., stratify=status):
+  1. Pass pertama hanya membaca kolom status -> jumlah baris per kelas (StratifiedSplit.scan).
+  2. Tiap kelas mendapat tepat round(n_kelas x test_size) baris test. Per chunk, jumlah baris test
+     kelas itu diambil dari distribusi hipergeometrik (sisa kuota test vs sisa baris kelas), lalu
+     posisinya diacak. Hasilnya sampel acak tanpa pengembalian yang sama dengan memilih sekaligus,
+     tapi cukup memori satu chunk. Generator di-reset tiap pass -> split identik di setiap pass
+     (dengan chunksize yang sama).
+Model:
+  Random Forest  satu pass shuffle eksternal membagi baris train acak ke bucket parquet sementara
+                 (~chunksize baris per bucket); n_estimators pohon dibagi rata ke bucket, lalu
+                 pohon digabung jadi satu forest (incremental_forest.grow_trees).
+                 Tanpa shuffle, chunk file yang urut waktu membuat tiap pohon hanya mengenal satu periode.
+  XGBoost        DataIter yang membaca chunk -> ExtMemQuantileDMatrix (histogram di-cache ke disk).
+Metrik test dihitung streaming (StreamingMetrics): confusion matrix & jumlah error per target.
+Memori puncak = satu chunk + model, berapa pun jumlah baris.
+"""
+import argparse
+import math
+import os
+import resource
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+import incremental_forest
+import storage
+from instrumentation import span
+
+warnings.filterwarnings('ignore')
+
+CHUNK_SIZE = 500_000
+LABEL = 'status'
+WEIGHT = 'weight'
+TIMESTAMP = 'timestamp'
+
+
+# --- SPLIT STRATIFIED STREAMING ---
+class StratifiedSplit:
+    """Penanda baris test per chunk, proporsi tiap kelas sama dengan train_test_split stratified."""
+
+    def __init__(self, counts, test_size=0.2, seed=42, window=None):
+        self.counts = counts.sort_index()
+        self.classes = self.counts.index.to_numpy()
+        self.test_counts = np.round(self.counts.to_numpy() * test_size).astype('int64')
+        self.test_size = test_size
+        self.seed = seed
+        self.window = window  # [timestamp pertama, terakhir] jika ada kolom timestamp
+        self.reset()
+
+    @classmethod
+    def scan(cls, path, label=LABEL, test_size=0.2, seed=42, chunksize=CHUNK_SIZE):
+        """Pass pertama: jumlah baris per kelas (dan rentang waktu) tanpa membaca kolom lain."""
+        columns = [label] + ([TIMESTAMP] if TIMESTAMP in storage.read_columns(path) else [])
+        counts, lo, hi = pd.Series(dtype='int64'), None, None
+        for chunk in storage.iter_chunks(path, chunksize=chunksize, columns=columns):
+            counts = counts.add(chunk[label].astype(str).value_counts(), fill_value=0)
+            if TIMESTAMP in chunk.columns and len(chunk):
+                lo = min(lo, chunk[TIMESTAMP].min()) if lo is not None else chunk[TIMESTAMP].min()
+                hi = max(hi, chunk[TIMESTAMP].max()) if hi is not None else chunk[TIMESTAMP].max()
+        window = [str(pd.Timestamp(lo)), str(pd.Timestamp(hi))] if lo is not None else None
+        return cls(counts.astype('int64'), test_size, seed, window)
+
+    @property
+    def n_rows(self):
+        return int(self.counts.sum())
+
+    @property
+    def n_test(self):
+        return int(self.test_counts.sum())
+
+    @property
+    def n_train(self):
+        return self.n_rows - self.n_test
+
+    def reset(self):
+        """Mulai pass baru dari awal file (split sama dengan pass sebelumnya)."""
+        self._rng = np.random.default_rng(self.seed)
+        self._left = self.counts.to_numpy().copy()
+        self._left_test = self.test_counts.copy()
+
+    def mask(self, labels):
+        """Boolean array: True = baris test. Chunk harus dibaca berurutan sejak reset()."""
+        codes = pd.Categorical(np.asarray(labels).astype(str), categories=self.classes).codes
+        if (codes < 0).any():
+            raise ValueError("Kelas di chunk tidak ada saat scan (file berubah sejak scan?)")
+        is_test = np.zeros(len(codes), dtype=bool)
+        for c in np.unique(codes):
+            rows = np.flatnonzero(codes == c)
+            left, left_test = self._left[c], self._left_test[c]
+            if len(rows) > left:
+                raise ValueError("Jumlah baris melebihi hasil scan (file berubah sejak scan?)")
+            n_test = left_test if len(rows) == left else \
+                self._rng.hypergeometric(left_test, left - left_test, len(rows))
+            is_test[self._rng.choice(rows, n_test, replace=False)] = True
+            self._left[c] -= len(rows)
+            self._left_test[c] -= n_test
+        return is_test
+
+
+def iter_split(path, columns, split, chunksize=CHUNK_SIZE, label=LABEL):
+    """Yield (train, test) per chunk. `split.reset()` dipanggil di awal setiap pass."""
+    split.reset()
+    columns = list(dict.fromkeys(list(columns) + [label]))
+    for chunk in storage.iter_chunks(path, chunksize=chunksize, columns=columns, compact=True):
+        is_test = split.mask(chunk[label])
+        yield chunk[~is_test], chunk[is_test]
+
+
+def _target(df, targets):
+    return df[targets[0]] if len(targets) == 1 else df[targets]
+
+
+def _weight(df):
+    return df[WEIGHT].to_numpy(dtype='float64') if WEIGHT in df.columns else None
+
+
+# --- RANDOM FOREST: POHON PER BUCKET ---
+def shuffle_buckets(path, columns, split, out_dir, chunksize=CHUNK_SIZE, seed=42):
+    """
+    Shuffle eksternal satu pass: baris train dibagi acak ke ceil(n_train / chunksize) file bucket
+    di `out_dir`. File input biasanya urut waktu; bucket acak membuat tiap bucket sampel dari
+    seluruh rentang data, jadi pohon per bucket tidak hanya mengenal satu periode.
+    Return list path bucket yang berisi data.
+    """
+    n_buckets = max(1, math.ceil(split.n_train / chunksize))
+    rng = np.random.default_rng([seed, 1])
+    paths = [os.path.join(out_dir, f'bucket-{i:04d}.parquet') for i in range(n_buckets)]
+    writers = [storage.FrameWriter(p) for p in paths]
+    try:
+        for train, _ in iter_split(path, columns, split, chunksize):
+            bucket = rng.integers(n_buckets, size=len(train))
+            for i in np.unique(bucket):
+                writers[i].write(train[bucket == i])
+    finally:
+        for w in writers:
+            w.close(empty_columns=list(columns))
+    return [p for p, w in zip(paths, writers) if w.rows]
+
+
+def fit_forest(template, buckets, features, targets, classes=None, seed=42, on_chunk=None):
+    """
+    Latih forest dari `template` (estimator belum dilatih, n_estimators = total pohon): pohon dibagi
+    rata ke semua bucket (min. 1 per bucket), lalu digabung jadi satu forest.
+    Classifier diperluas ke `classes` (hasil scan) agar bucket tanpa kelas tertentu tetap bisa digabung.
+    """
+    n_trees = max(template.n_estimators, len(buckets))
+    model = None
+    for i, path in enumerate(buckets):
+        per_chunk = n_trees // len(buckets) + (i < n_trees % len(buckets))
+        train = storage.load_frame(path, compact=True)
+        rows = len(train)
+        X, y, w = train[features], _target(train, targets), _weight(train)
+        with span('fit_chunk', rows_in=rows, chunk=i, trees=per_chunk):
+            if model is None:
+                model = clone(template).set_params(n_estimators=per_chunk, random_state=seed).fit(X, y, sample_weight=w)
+                if classes is not None:
+                    incremental_forest.align_classes(model, classes)
+            else:
+                trees = incremental_forest.grow_trees(model, X, y, per_chunk, seed + i, sample_weight=w)
+                incremental_forest.replace_trees(model, trees, max_trees=len(model.estimators_) + len(trees))
+        del train, X, y, w
+        if on_chunk:
+            on_chunk(i, rows, len(model.estimators_))
+    return model
+
+
+# --- XGBOOST: EXTERNAL MEMORY ---
+def _xgb_iter(path, features, targets, split, chunksize, cache_dir, classes=None):
+    import xgboost as xgb
+
+    class ChunkIter(xgb.DataIter):
+        """Baris train per chunk untuk ExtMemQuantileDMatrix (dibaca ulang tiap pass)."""
+
+        def __init__(self):
+            super().__init__(cache_prefix=os.path.join(cache_dir, 'xgb'))
+            self._chunks = None
+
+        def next(self, input_data):
+            if self._chunks is None:
+                columns = features + targets + ([WEIGHT] if WEIGHT in storage.read_columns(path) else [])
+                self._chunks = iter_split(path, columns, split, chunksize)
+            for train, _ in self._chunks:
+                if len(train) == 0:
+                    continue
+                if classes is not None:
+                    y = pd.Categorical(train[targets[0]].astype(str), categories=classes).codes
+                else:
+                    y = train[targets].to_numpy(dtype='float32')
+                input_data(data=train[features].to_numpy(dtype='float32'), label=y, weight=_weight(train))
+                return True
+            return False
+
+        def reset(self):
+            self._chunks = None
+
+    return ChunkIter()
+
+
+def fit_xgboost(params, path, features, targets, split, chunksize=CHUNK_SIZE, num_boost_round=100, threads=None):
+    """
+    Booster XGBoost dari data external memory. Classifier jika target = [LABEL] (kelas = split.classes).
+    Return booster; prediksi dengan predict_xgboost.
+    """
+    import xgboost as xgb
+    classify = targets == [LABEL]
+    params = {'tree_method': 'hist', 'nthread': threads or os.cpu_count(), **params}
+    if classify:
+        params.update(objective='multi:softprob', num_class=len(split.classes))
+    with tempfile.TemporaryDirectory(prefix='xgb_cache_') as cache_dir:
+        it = _xgb_iter(path, features, targets, split, chunksize, cache_dir, split.classes if classify else None)
+        with span('xgb_dmatrix', rows_in=split.n_train):
+            dtrain = xgb.ExtMemQuantileDMatrix(it, max_bin=params.get('max_bin', 256), nthread=params['nthread'])
+        with span('xgb_train', rounds=num_boost_round):
+            booster = xgb.train(params, dtrain, num_boost_round=num_boost_round)
+        del dtrain
+    return booster
+
+
+def predict_xgboost(booster, X, classes=None):
+    pred = booster.inplace_predict(np.asarray(X, dtype='float32'))
+    return np.asarray(classes)[pred.argmax(axis=1)] if classes is not None else pred
+
+
+# --- METRIK STREAMING ---
+class StreamingMetrics:
+    """Akurasi, F1 macro, MAE, RMSE, R2 (rata-rata per target) dari prediksi per chunk, dibobot opsional."""
+
+    def __init__(self, classes=None, n_targets=0):
+        self.classes = np.asarray(classes) if classes is not None else None
+        k = len(self.classes) if classes is not None else 0
+        self.confusion = np.zeros((k, k))
+        self.n = 0.0
+        self.sums = {s: np.zeros(n_targets) for s in ('abs', 'sq', 'y', 'y2')}
+
+    def update_clf(self, y_true, y_pred, weight=None):
+        k = len(self.classes)
+        t = pd.Categorical(np.asarray(y_true).astype(str), categories=self.classes).codes
+        p = pd.Categorical(np.asarray(y_pred).astype(str), categories=self.classes).codes
+        self.confusion += np.bincount(t * k + p, weights=weight, minlength=k * k).reshape(k, k)
+
+    def update_reg(self, y_true, y_pred, weight=None):
+        y = np.asarray(y_true, dtype='float64').reshape(len(y_true), -1)
+        err = y - np.asarray(y_pred, dtype='float64').reshape(y.shape)
+        w = np.ones(len(y)) if weight is None else np.asarray(weight, dtype='float64')
+        self.n += w.sum()
+        self.sums['abs'] += w @ np.abs(err)
+        self.sums['sq'] += w @ (err * err)
+        self.sums['y'] += w @ y
+        self.sums['y2'] += w @ (y * y)
+
+    def result(self):
+        out = {}
+        if self.classes is not None and self.confusion.sum():
+            tp = np.diag(self.confusion)
+            support, predicted = self.confusion.sum(axis=1), self.confusion.sum(axis=0)
+            present = (support + predicted) > 0  # Sama dengan sklearn: kelas yang muncul di y_true/y_pred
+            f1 = 2 * tp[present] / (support[present] + predicted[present])
+            out.update(accuracy=tp.sum() / self.confusion.sum(), f1_macro=f1.mean())
+        if self.n:
+            sst = self.sums['y2'] - self.sums['y'] ** 2 / self.n
+            out.update(mae=np.mean(self.sums['abs'] / self.n), rmse=np.sqrt(np.mean(self.sums['sq'] / self.n)),
+                       r2=np.mean(1 - self.sums['sq'] / sst))
+        return out
+
+
+def evaluate_models(path, features, reg_targets, split, predict_clf=None, predict_reg=None, chunksize=CHUNK_SIZE):
+    """Nilai model di baris test (streaming). predict_* = fungsi X -> prediksi."""
+    metrics = StreamingMetrics(split.classes, len(reg_targets))
+    columns = features + reg_targets + ([WEIGHT] if WEIGHT in storage.read_columns(path) else [])
+    for _, test in iter_split(path, columns, split, chunksize):
+        if len(test) == 0:
+            continue
+        w = _weight(test)
+        if predict_clf is not None:
+            metrics.update_clf(test[LABEL], predict_clf(test[features]), w)
+        if predict_reg is not None:
+            metrics.update_reg(test[reg_targets], predict_reg(test[features]), w)
+    return metrics.result()
+
+
+# --- EVALUASI: in-memory vs out-of-core ---
+FEATURES = ['occupancy', 'temp', 'hum', 'lux', 'noise', 'luas']
+REG_TARGETS = ['energy_kwh', 'pmv', 'ppd']
+XGB_PARAMS = {'max_depth': 6, 'eta': 0.3, 'seed': 42}
+
+
+def _run_variant(variant, path, chunksize, n_estimators):
+    """Jalan di proses terpisah agar memori puncak (ru_maxrss) per varian bisa dibandingkan."""
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+    start = time.perf_counter()
+    engine, where = variant
+    clf_t = RandomForestClassifier(n_estimators=n_estimators, random_state=42, class_weight='balanced', n_jobs=-1)
+    reg_t = RandomForestRegressor(n_estimators=n_estimators, random_state=42, n_jobs=-1)
+    if where == 'in-memory':
+        from sklearn.model_selection import train_test_split
+        df = storage.load_frame(path, columns=FEATURES + [LABEL] + REG_TARGETS, compact=True)
+        train, test = train_test_split(df, test_size=0.2, random_state=42, stratify=df[LABEL])
+        del df
+        classes = np.sort(train[LABEL].astype(str).unique())
+        metrics = StreamingMetrics(classes, len(REG_TARGETS))
+        if engine == 'rf':
+            clf = clone(clf_t).fit(train[FEATURES], train[LABEL].astype(str))
+            reg = clone(reg_t).fit(train[FEATURES], train[REG_TARGETS])
+            pred_clf, pred_reg = clf.predict(test[FEATURES]), reg.predict(test[FEATURES])
+        else:
+            import xgboost as xgb
+            codes = pd.Categorical(train[LABEL].astype(str), categories=classes).codes
+            clf = xgb.train({**XGB_PARAMS, 'objective': 'multi:softprob', 'num_class': len(classes), 'tree_method': 'hist'},
+                            xgb.QuantileDMatrix(train[FEATURES].to_numpy('float32'), codes), n_estimators)
+            reg = xgb.train({**XGB_PARAMS, 'tree_method': 'hist'},
+                            xgb.QuantileDMatrix(train[FEATURES].to_numpy('float32'), train[REG_TARGETS].to_numpy('float32')),
+                            n_estimators)
+            pred_clf = predict_xgboost(clf, test[FEATURES], classes)
+            pred_reg = predict_xgboost(reg, test[FEATURES])
+        metrics.update_clf(test[LABEL], pred_clf)
+        metrics.update_reg(test[REG_TARGETS], pred_reg)
+        result, rows = metrics.result(), len(train)
+    else:
+        split = StratifiedSplit.scan(path, chunksize=chunksize)
+        if engine == 'rf':
+            with tempfile.TemporaryDirectory(prefix='buckets_') as tmp:
+                buckets = shuffle_buckets(path, FEATURES + [LABEL] + REG_TARGETS, split, tmp, chunksize)
+                clf = fit_forest(clf_t, buckets, FEATURES, [LABEL], split.classes)
+                reg = fit_forest(reg_t, buckets, FEATURES, REG_TARGETS)
+            result = evaluate_models(path, FEATURES, REG_TARGETS, split, clf.predict, reg.predict, chunksize)
+        else:
+            clf = fit_xgboost(XGB_PARAMS, path, FEATURES, [LABEL], split, chunksize, n_estimators)
+            reg = fit_xgboost(XGB_PARAMS, path, FEATURES, REG_TARGETS, split, chunksize, n_estimators)
+            result = evaluate_models(path, FEATURES, REG_TARGETS, split,
+                                     lambda X: predict_xgboost(clf, X, split.classes),
+                                     lambda X: predict_xgboost(reg, X), chunksize)
+        rows = split.n_train
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KB
+    return {'model': {'rf': 'Random Forest', 'xgb': 'XGBoost'}[engine], 'mode': where, 'rows_train': rows,
+            **result, 'peak_mb': peak_mb, 'seconds': time.perf_counter() - start}
+
+
+def evaluate(path='train_data.parquet', chunksize=CHUNK_SIZE, n_estimators=100):
+    variants = [(e, w) for e in ('rf', 'xgb') for w in ('in-memory', 'out-of-core')]
+    rows = []
+    # Satu proses baru per varian (spawn) -> ru_maxrss tidak terbawa dari varian sebelumnya
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'),
+                             max_tasks_per_child=1) as pool:
+        for variant in variants:
+            rows.append(pool.submit(_run_variant, variant, path, chunksize, n_estimators).result())
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Training out-of-core (streaming per chunk).")
+    parser.add_argument('--evaluate', metavar='FILE', nargs='?', const='train_data.parquet',
+                        help="Bandingkan training in-memory vs out-of-core (default train_data.parquet)")
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--trees', type=int, default=100, help="Jumlah pohon RF / boosting round XGBoost")
+    args = parser.parse_args()
+    if not args.evaluate:
+        parser.print_help()
+        raise SystemExit
+    if not storage.exists(args.evaluate):
+        print(f"❌ Error: '{args.evaluate}' tidak ditemukan!")
+        raise SystemExit(1)
+    print(f"📊 In-memory vs out-of-core ({args.evaluate}, chunk {args.chunksize:,} baris, {args.trees} pohon/round):")
+    report = evaluate(args.evaluate, args.chunksize, args.trees)
+    print(report.to_string(index=False, float_format=lambda v: f'{v:.5f}'))
@@ -0,0 +1,247 @@
+"""
+Benchmark performa pipeline yang bisa diulang.
+
+Data mentah sintetis (format raw_data.csv) dibuat dari clean_data.csv pada skala 1x, 10x, 100x
+(1x = rentang waktu clean_data.csv). Setiap tahap dijalankan sebagai subprocess di folder
+sementara, lalu dicatat: wall time, jumlah baris input, baris/detik, dan peak RSS (os.wait4).
+Dengan --stages, tahap hulu yang menghasilkan input tahap terpilih tetap dijalankan (tidak diukur).
+Tahap dianggap gagal jika exit code bukan 0 atau ada output yang tidak dibuat.
+
+    python perf_suite.py --scales 1 10                       # jalankan & tampilkan hasil
+    python perf_suite.py --save-baseline perf_baseline.json  # simpan sebagai baseline
+    python perf_suite.py --compare perf_baseline.json        # bandingkan, exit 1 jika ada regresi
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import storage
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# --- KONFIGURASI ---
+SOURCE_FILENAME = os.path.join(REPO_DIR, 'clean_data.csv')
+SCALES = [1, 10, 100]
+HVAC_PER_SECOND = 4      # Bacaan hvac per detik di data mentah sintetis
+LUX_PER_SECOND = 4       # Bacaan lux-meter per detik
+CORRUPT_RATIO = 0.01     # Porsi payload rusak (menguji jalur fallback decoder)
+RANDOM_SEED = 42
+TOLERANCE = 0.20         # Regresi jika wall time / peak RSS naik lebih dari 20%
+MIN_WALL_S = 0.5         # Tahap yang lebih cepat dari ini tidak dinilai (noise start-up)
+
+# Scoring massal pakai .pkl sklearn (seperti batch_scoring default); compiled forest hanya untuk batch kecil
+_PREDICT_CODE = """
+import joblib, storage
+clf = joblib.load('models/rf_status_model.pkl')
+reg = joblib.load('models/rf_energy_model.pkl')
+features = list(clf.feature_names_in_)
+for chunk in storage.iter_chunks('train_data.parquet', chunksize=100_000, columns=features):
+    clf.predict(chunk)
+    reg.predict(chunk)
+"""
+
+_MODEL_OUTPUTS = ['models/rf_status_model.pkl', 'models/rf_energy_model.pkl',
+                  'models/rf_status_model/manifest.json', 'models/rf_energy_model/manifest.json']
+
+# name, command, file input (input pertama untuk baris/detik), file output
+STAGES = [
+    ('extract',      ['01_extracting_data.py'],           ['raw_data.csv'],
+     ['extracted_data.parquet']),
+    ('aggregate',    ['02_agregate.py'],                  ['extracted_data.parquet'],
+     ['clean_data.parquet', 'gap_intervals.parquet']),
+    ('prepare',      ['03_final_preparation.py'],         ['clean_data.parquet', 'gap_intervals.parquet'],
+     ['train_data.parquet', 'summary_cube.parquet']),
+    ('prepare_real', ['preparation_without_dummy.py'],    ['clean_data.parquet'],
+     ['train_data1.parquet', 'summary_cube1.parquet']),
+    ('train',        ['06_bestmodel_training_final.py'],  ['train_data.parquet'],
+     _MODEL_OUTPUTS),
+    ('predict',      ['-c', _PREDICT_CODE],               ['train_data.parquet'] + _MODEL_OUTPUTS[:2],
+     []),
+]
+
+
+def required_stages(names, stages=STAGES):
+    """Tahap `names` + tahap hulu yang menghasilkan inputnya, urut seperti STAGES."""
+    producer = {out: s[0] for s in stages for out in s[3]}
+    inputs = {s[0]: s[2] for s in stages}
+    needed, todo = set(), list(names)
+    while todo:
+        name = todo.pop()
+        if name not in needed:
+            needed.add(name)
+            todo.extend(producer[i] for i in inputs[name] if i in producer)
+    return [s for s in stages if s[0] in needed]
+
+
+# --- DATA SINTETIS ---
+def _format_payloads(keys, values, corrupt):
+    text = pd.Series("{", index=range(len(values)))
+    for i, key in enumerate(keys):
+        sep = ', ' if i else ''
+        text = text + f"{sep}'{key}': " + pd.Series(values[:, i]).round(4).astype(str)
+    text = text + "}"
+    text[corrupt] = 'garbage{'
+    return text
+
+
+def generate_raw(path, scale, source=SOURCE_FILENAME, seed=RANDOM_SEED):
+    """Tulis raw_data.csv sintetis sebesar `scale` x rentang waktu clean_data.csv. Return jumlah baris."""
+    rng = np.random.default_rng(seed)
+    base = storage.load_frame(source)
+    base_ts = pd.to_datetime(base['timestamp']).to_numpy()
+    span = base_ts.max() - base_ts.min() + np.timedelta64(1, 's')
+    n_rows = 0
+    with open(path, 'w', newline='') as f:
+        f.write('timestamp,sensor_name,payload\n')
+        for copy in range(scale):
+            ts = base_ts + copy * span
+            parts = []
+            for sensor, keys, cols, per_second in (
+                    ('hvac', ['temp', 'hum', 'noise'], ['temp', 'hum', 'noise'], HVAC_PER_SECOND),
+                    ('lux-meter', ['light_level'], ['lux'], LUX_PER_SECOND)):
+                n = len(base) * per_second
+                offset = rng.integers(0, 1_000_000_000, n).astype('timedelta64[ns]')
+                values = np.repeat(base[cols].to_numpy(dtype='float64'), per_second, axis=0)
+                values = values * rng.normal(1.0, 0.01, values.shape)
+                parts.append(pd.DataFrame({
+                    'timestamp': np.repeat(ts, per_second) + offset,
+                    'sensor_name': sensor,
+                    'payload': _format_payloads(keys, values, rng.random(n) < CORRUPT_RATIO),
+                }))
+            chunk = pd.concat(parts, ignore_index=True).sort_values('timestamp', kind='stable')
+            chunk.to_csv(f, header=False, index=False, date_format='%Y-%m-%d %H:%M:%S.%f')
+            n_rows += len(chunk)
+    return n_rows
+
+
+# --- MENJALANKAN TAHAP ---
+def run_stage(args, workdir, log_path):
+    """Jalankan satu tahap, return (returncode, wall detik, peak RSS MB)."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = REPO_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    env.setdefault('MPLBACKEND', 'Agg')
+    cmd = [sys.executable] + [os.path.join(REPO_DIR, a) if a.endswith('.py') else a for a in args]
+    start = time.perf_counter()
+    with open(log_path, 'w') as log:
+        proc = subprocess.Popen(cmd, cwd=workdir, stdout=log, stderr=subprocess.STDOUT, env=env)
+        _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - start
+    # ru_maxrss dalam KB di Linux, byte di macOS
+    peak_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    return os.waitstatus_to_exitcode(status), wall, peak_mb
+
+
+def run_scale(scale, stages=STAGES, keep_dir=None, log=print, measured=None):
+    """Jalankan `stages` berurutan; hanya tahap di `measured` (None = semua) yang dicatat."""
+    workdir = keep_dir or tempfile.mkdtemp(prefix=f'perf_{scale}x_')
+    os.makedirs(workdir, exist_ok=True)
+    results = {}
+    try:
+        t0 = time.perf_counter()
+        raw_rows = generate_raw(os.path.join(workdir, 'raw_data.csv'), scale)
+        log(f"🧪 Skala {scale}x: {raw_rows:,} baris mentah dibuat ({time.perf_counter() - t0:.1f} detik)")
+        for name, args, inputs, outputs in stages:
+            timed = measured is None or name in measured
+            log_path = os.path.join(workdir, f'{name}.log')
+            missing = [i for i in inputs if not storage.exists(os.path.join(workdir, i))]
+            if missing:
+                log(f"   ⏭️ {name:<13} dilewati: input {', '.join(missing)} tidak ada")
+                results[name] = {'ok': False, 'skipped': True, 'missing': missing}
+                break
+            rows = storage.count_rows(os.path.join(workdir, inputs[0]))
+            code, wall, peak_mb = run_stage(args, workdir, log_path)
+            # Exit 0 tanpa output (mis. script exit() karena input kosong) tetap dianggap gagal
+            missing = [o for o in outputs if not os.path.exists(os.path.join(workdir, o))]
+            if code != 0 or missing:
+                reason = f"exit {code}" if code != 0 else f"output {', '.join(missing)} tidak dibuat"
+                log(f"   ❌ {name:<13} gagal ({reason}), lihat {log_path}")
+                results[name] = {'ok': False}
+                keep_dir = keep_dir or workdir  # simpan folder untuk debug
+                break
+            if not timed:
+                log(f"   ⏩ {name:<13} {wall:8.2f}s  (menyiapkan input, tidak diukur)")
+                continue
+            results[name] = {'ok': True, 'rows': rows, 'wall_s': wall,
+                             'rows_per_s': rows / wall if wall > 0 else None, 'peak_rss_mb': peak_mb}
+            log(f"   ✅ {name:<13} {wall:8.2f}s  {rows:>12,} baris  {rows / wall:>12,.0f} baris/s  "
+                f"peak {peak_mb:8.1f} MB")
+    finally:
+        if not keep_dir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def run_suite(scales=SCALES, stage_names=None, keep_dir=None):
+    stages = required_stages(stage_names) if stage_names else STAGES
+    report = {
+        'meta': {'created_at': time.strftime('%Y-%m-%d %H:%M:%S'), 'python': platform.python_version(),
+                 'platform': platform.platform(), 'cpu_count': os.cpu_count()},
+        'results': {},
+    }
+    for scale in scales:
+        scale_dir = os.path.join(keep_dir, f'{scale}x') if keep_dir else None
+        report['results'][f'{scale}x'] = run_scale(scale, stages, keep_dir=scale_dir, measured=stage_names)
+    return report
+
+
+# --- BASELINE ---
+def compare(report, baseline, tolerance=TOLERANCE):
+    """Return list (skala, tahap, metrik, baseline, sekarang, rasio) yang melewati toleransi."""
+    regressions = []
+    for scale, stages in report['results'].items():
+        for name, current in stages.items():
+            old = baseline.get('results', {}).get(scale, {}).get(name)
+            if not old or not old.get('ok'):
+                continue
+            if not current.get('ok'):
+                regressions.append((scale, name, 'ok', True, False, None))
+                continue
+            for metric in ('wall_s', 'peak_rss_mb'):
+                if metric == 'wall_s' and max(old[metric], current[metric]) < MIN_WALL_S:
+                    continue
+                ratio = current[metric] / old[metric] if old[metric] else None
+                if ratio is not None and ratio > 1 + tolerance:
+                    regressions.append((scale, name, metric, old[metric], current[metric], ratio))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark performa tahap pipeline pada data sintetis.")
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES, help="Skala data (1 = ukuran clean_data.csv)")
+    parser.add_argument('--stages', nargs='+', choices=[s[0] for s in STAGES], help="Hanya tahap tertentu")
+    parser.add_argument('--save-baseline', metavar='PATH', help="Simpan hasil sebagai baseline JSON")
+    parser.add_argument('--compare', metavar='PATH', help="Bandingkan dengan baseline JSON")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--output', metavar='PATH', help="Simpan hasil run ini ke JSON")
+    parser.add_argument('--keep', metavar='DIR', help="Simpan folder kerja (data & log) di DIR")
+    args = parser.parse_args()
+
+    print("="*50)
+    print("⏱️   PERFORMANCE SUITE")
+    print("="*50)
+    report = run_suite(args.scales, args.stages, args.keep)
+
+    for path in (args.save_baseline, args.output):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"💾 Hasil disimpan ke {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ REGRESI (toleransi {args.tolerance:.0%}):")
+            for scale, name, metric, old, new, ratio in regressions:
+                detail = f"{old:.2f} -> {new:.2f} ({ratio:.2f}x)" if ratio else "tahap gagal"
+                print(f"   {scale:<5} {name:<13} {metric:<12} {detail}")
+            sys.exit(1)
+        print(f"\n✅ Tidak ada regresi dibanding {args.compare} (toleransi {args.tolerance:.0%})")
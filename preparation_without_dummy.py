@@ -1,68 +1,31 @@
 import pandas as pd
 import numpy as np
-import os
+import schema
+import storage
+import summary_cube
+from instrumentation import span
+from rooms import get_room, label_frame
+from comfort_rules import RULES_WITHOUT_DUMMY
 
 # --- KONFIGURASI ---
-INPUT_FILENAME  = 'clean_data.csv'
-OUTPUT_FILENAME = 'train_data1.csv'
-
-# --- FUNGSI KALKULASI ---
-def get_kwh_estimation(t):
-    """Menghitung estimasi konsumsi energi berdasarkan suhu."""
-    if pd.isna(t): return 0.0 # Safety check
-    if   18.0 <= t < 19.0: return 0.84
-    elif 19.0 <= t < 20.0: return 0.80
-    elif 20.0 <= t < 21.0: return 0.76
-    elif 21.0 <= t < 22.0: return 0.71
-    elif 22.0 <= t < 23.0: return 0.67
-    elif 23.0 <= t < 24.0: return 0.63
-    elif 24.0 <= t < 25.0: return 0.59
-    elif 25.0 <= t < 26.0: return 0.50
-    elif 26.0 <= t < 27.0: return 0.42
-    elif 27.0 <= t < 28.0: return 0.34
-    elif 28.0 <= t < 29.0: return 0.25
-    elif 29.0 <= t < 30.0: return 0.17
-    elif 30.0 <= t < 31.0: return 0.10
-    elif 31.0 <= t < 32.0: return 0.05
-    else: return 0.0
-
-def get_compliance_status(row):
-    # Tidak perlu handle NaN jadi 0 di sini karena data sudah di-drop sebelumnya
-    occ = row['occupancy']
-    t   = row['temp']
-    h   = row['hum']
-    l   = row['lux']
-    n   = row['noise']
-    
-    # Logic Kepatuhan
-    if (occ == 0):
-        if (17.5 <= t <= 20.5) and (40 <= h <= 60) and (l >= 430) and (n < 50):
-            return "Boros Energi", 0.0, 5
-        else:
-            return "Invalid", 0.0, 0
-    if (1 <= occ <= 18) and (19.5 < t <= 25.2) and (40 <= h <= 60) and (380 <= l <= 450) and (n < 50):
-        return "Ideal", 0.0, 5
-    if (19 <= occ <= 25) and (24.8 < t <= 26.8) and (50 < h <= 70) and (290 <= l <= 400) and (40 <= n <= 60):
-        return "Optimalisasi", 1.0, 25
-    if (26 <= occ <= 30) and (26.3 < t <= 27.3) and (60 < h <= 75) and (430 < l <= 560) and (40 <= n <= 65):
-        return "Peringatan", 1.0, 25
-    if (31 <= occ <= 60) and (27.0 < t <= 28.8) and (65 < h <= 80) and (540 < l <= 660) and (40 <= n <= 65):
-        return "Peringatan", 1.0, 75
-    if (occ > 60) and (t > 28.3) and (h > 70) and (l > 640) and (n > 55):
-        return "Kritis", 2.0, 90
-    return "Invalid", 0.0, 0
-
+INPUT_FILENAME  = 'clean_data.parquet'
+OUTPUT_FILENAME = 'train_data1.parquet'  # .csv untuk export
+CUBE_FILENAME   = 'summary_cube1.parquet'  # Ringkasan per ruangan/jam/status (data tanpa dummy)
+ROOM_ID         = 'default'  # Luas & unit HVAC diambil dari rooms.csv
 
 # --- MAIN PROGRAM ---
 
 print("🚀 Memulai proses data asli...")
+room = get_room(ROOM_ID)
 
 # 1. Load Data Asli
-if not os.path.exists(INPUT_FILENAME):
+if not storage.exists(INPUT_FILENAME):
     print(f"❌ Error: File '{INPUT_FILENAME}' tidak ditemukan.")
     exit()
 
-df_final = pd.read_csv(INPUT_FILENAME)
+with span('load') as s:
+    df_final = storage.load_frame(INPUT_FILENAME)
+    s.rows_out = len(df_final)
 print(f"📂 Data Awal dimuat: {len(df_final):,} baris.")
 
 # 2. Generate Kolom Tambahan (Occupancy, Hum, Lux, Noise) jika SEKUENS KOLOM hilang
@@ -107,7 +70,9 @@ cols_to_check = ['occupancy', 'temp', 'hum', 'lux', 'noise']
 cols_exist = [c for c in cols_to_check if c in df_final.columns]
 
 initial_count = len(df_final)
-df_final.dropna(subset=cols_exist, inplace=True)
+with span('drop_nan', rows_in=initial_count) as s:
+    df_final.dropna(subset=cols_exist, inplace=True)
+    s.rows_out = len(df_final)
 dropped_count = initial_count - len(df_final)
 
 if dropped_count > 0:
@@ -118,10 +83,10 @@ else:
 
 # 4. Final Calculation
 print("⚡ Menghitung Estimasi kWh & Status...")
-df_final['energy_kwh'] = df_final['temp'].apply(get_kwh_estimation)
-
-status_results = [get_compliance_status(row) for idx, row in df_final.iterrows()]
-df_final['status'], df_final['pmv'], df_final['ppd'] = zip(*status_results)
+with span('calculate', rows_in=len(df_final)) as s:
+    label_frame(df_final, room, RULES_WITHOUT_DUMMY)
+    s.rows_out = len(df_final)
+    s.set(invalid=int((df_final['status'] == 'Invalid').sum()))
 
 
 # 5. Pembulatan
@@ -131,11 +96,20 @@ df_final[cols_exist_round] = df_final[cols_exist_round].round(2)
 
 
 # 6. Simpan Hasil
+print(f"\n💾 Menyimpan ke '{OUTPUT_FILENAME}'...")
+cube = None
+with span('save', rows_in=len(df_final)) as s:
+    schema.compact(df_final)  # float32 / uint8 / category, lihat schema.py
+    storage.save_frame(df_final, OUTPUT_FILENAME)
+    if 'timestamp' in df_final.columns:  # Cube dikunci per jam, butuh timestamp
+        cube = summary_cube.build(df_final, ROOM_ID)
+        summary_cube.save(cube, CUBE_FILENAME)
+    elif storage.exists(CUBE_FILENAME):
+        storage.remove(CUBE_FILENAME)  # Cube lama tidak lagi sesuai dengan OUTPUT_FILENAME
+    s.rows_out = len(df_final)
+
 print("\n📊 Statistik Data Akhir:")
-print(df_final[['status']].value_counts())
+print(summary_cube.status_counts(cube, ROOM_ID) if cube is not None else df_final[['status']].value_counts())
 print("\n🔍 Preview Data:")
 print(df_final.head())
-
-print(f"\n💾 Menyimpan ke '{OUTPUT_FILENAME}'...")
-df_final.to_csv(OUTPUT_FILENAME, index=False)
 print("✅ SELESAI! Data siap.")
\ No newline at end of file
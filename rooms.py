@@ -0,0 +1,318 @@
+"""
+Metadata ruangan & pemrosesan pipeline per ruangan (multi-room).
+
+rooms.csv berisi satu baris per ruangan:
+  room_id    id ruangan (nama folder shard)
+  luas       luas ruangan (m2), jadi fitur `luas`
+  hvac_unit  nama kurva kWh di hvac_kwh_curves.csv
+  devices    id device milik ruangan, dipisah ';' (opsional, untuk raw yang hanya punya device_id)
+
+Raw data dipartisi per ruangan dari:
+  - folder berisi <room_id>.csv (satu file per ruangan), atau
+  - satu file raw dengan kolom `room_id`, atau kolom `device_id` yang dipetakan lewat `devices`,
+  - file raw tanpa keduanya dianggap milik DEFAULT_ROOM.
+Setiap ruangan diproses di proses worker terpisah: extract -> agregasi per detik (incremental)
+-> deteksi gap -> labeling. Error di satu ruangan hanya menandai ruangan itu gagal.
+room_id dipakai sebagai nama folder, jadi hanya boleh huruf/angka/'_'/'-'/'.' (tidak diawali '.');
+room_id di raw yang tidak terdaftar di rooms.csv masuk ke UNASSIGNED_ROOM.
+
+Data training satu ruangan (gap, occupancy, label, filter Invalid) dibuat oleh `build_training_frame`,
+dipakai bersama oleh 03_final_preparation.py dan `process_room`.
+"""
+import os
+import re
+import time
+import traceback
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+import aggregation
+import schema
+import storage
+import summary_cube
+from comfort_rules import evaluate_rules, RULES_FINAL_PREPARATION
+from energy_curve import estimate_kwh
+from extraction import extract_stream, generation
+from instrumentation import span
+from synthetic_data import generate_gap_data, synthesize_occupancy
+
+ROOMS_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rooms.csv')
+DEFAULT_ROOM = 'default'
+UNASSIGNED_ROOM = '_unassigned'  # device yang tidak terdaftar di rooms.csv
+RAW_COLUMNS = ['timestamp', 'sensor_name', 'payload']
+ROOM_ID_PATTERN = re.compile(r'[A-Za-z0-9_-][A-Za-z0-9_.-]*')  # satu komponen path, tanpa '/', '.', '..'
+SENSOR_COLUMNS = ['temp', 'hum', 'lux', 'noise']
+ROUND_COLUMNS = ['temp', 'hum', 'lux', 'noise', 'energy_kwh']
+
+# Nama file di dalam folder shard tiap ruangan
+RAW_SHARD = 'raw_data.csv'
+EXTRACTED_SHARD = 'extracted_data.parquet'
+CLEAN_SHARD = 'clean_data.parquet'
+TRAIN_SHARD = 'train_data.parquet'
+CUBE_SHARD = 'summary_cube.parquet'
+GAP_SHARD = 'gap_intervals.parquet'
+STATE_SHARD = 'aggregation_state.parquet'
+CHECKPOINT_SHARD = 'aggregation_state.json'
+EXTRACT_CHECKPOINT_SHARD = 'extraction_state.json'
+
+
+# --- KONFIGURASI RUANGAN ---
+def check_room_id(room_id):
+    """room_id aman dipakai sebagai nama folder shard, selain itu ValueError."""
+    if not isinstance(room_id, str) or not ROOM_ID_PATTERN.fullmatch(room_id):
+        raise ValueError(f"room_id {room_id!r} tidak valid (hanya huruf, angka, '_', '-', '.')")
+    return room_id
+
+
+def shard_dir(out_dir, room_id):
+    """Folder shard ruangan di `out_dir` (room_id divalidasi dulu)."""
+    return os.path.join(out_dir, check_room_id(room_id))
+
+
+def load_rooms(path=ROOMS_FILENAME):
+    """Dict room_id -> {'room_id', 'luas', 'hvac_unit', 'devices'}."""
+    table = pd.read_csv(path, dtype={'room_id': str, 'hvac_unit': str, 'devices': str})
+    if table['room_id'].duplicated().any():
+        raise ValueError(f"room_id duplikat di '{path}': {sorted(table.loc[table['room_id'].duplicated(), 'room_id'])}")
+    for room_id in table['room_id']:
+        check_room_id(room_id)
+    rooms = {}
+    for row in table.itertuples(index=False):
+        devices = row.devices if isinstance(row.devices, str) else ''
+        rooms[row.room_id] = {
+            'room_id': row.room_id,
+            'luas': float(row.luas),
+            'hvac_unit': row.hvac_unit,
+            'devices': [d.strip() for d in devices.split(';') if d.strip()],
+        }
+    return rooms
+
+
+def get_room(room_id=DEFAULT_ROOM, path=ROOMS_FILENAME):
+    rooms = load_rooms(path)
+    if room_id not in rooms:
+        raise KeyError(f"Ruangan '{room_id}' tidak ada di '{path}'")
+    return rooms[room_id]
+
+
+def label_frame(df, room, rules=RULES_FINAL_PREPARATION):
+    """Menambah kolom luas, energy_kwh, status, pmv, ppd sesuai metadata ruangan (in-place)."""
+    df['luas'] = room['luas']
+    df['energy_kwh'] = estimate_kwh(df['temp'], unit=room['hvac_unit'])
+    df[['status', 'pmv', 'ppd']] = evaluate_rules(df, rules)
+    return df
+
+
+# --- DATA TRAINING SATU RUANGAN (03 & process_room) ---
+def build_training_frame(df_clean, gaps, room, rng, extra_windows=(), resolution='s', fill_gaps=True,
+                         rules=RULES_FINAL_PREPARATION, room_column=False, log=None):
+    """
+    Data per detik satu ruangan -> data training berlabel (skema compact):
+      gap short diinterpolasi, occupancy sintetis dari suhu, gap long + `extra_windows` (dipotong
+      agar tidak tumpang tindih dengan data / gap long) diisi data sintetis, label (luas, energy_kwh, status, pmv, ppd), baris Invalid dibuang, pembulatan.
+    `fill_gaps=False` -> gap hasil deteksi tidak diisi (extra_windows tetap dipakai).
+    `room_column` -> kolom room_id di depan. `log` (mis. print) menerima pesan progres.
+    Return (DataFrame, ringkasan dict).
+    """
+    log = log or (lambda *args: None)
+    with span('fill_short_gaps', rows_in=len(df_clean)) as s:
+        df = aggregation.fill_short_gaps(df_clean, gaps, resolution) if fill_gaps else df_clean.copy()
+        s.rows_out = len(df)
+    n_short = int((gaps['kind'] == 'short').sum()) if fill_gaps else 0
+    log(f"🩹 {n_short:,} gap pendek diinterpolasi -> {len(df):,} baris.")
+
+    # Pastikan kolom sensor ada
+    for col in SENSOR_COLUMNS:
+        if col not in df.columns:
+            log(f"⚠️ Kolom {col} tidak ada, generate random wajar...")
+            df[col] = rng.uniform(20, 30, len(df))  # Random range luas
+
+    log("🧠 Menganalisa Sensor Asli (Temp) untuk menentukan Occupancy...")
+    with span('occupancy', rows_in=len(df)) as s:
+        df['occupancy'] = synthesize_occupancy(df['temp'], rng=rng)
+        s.rows_out = len(df)
+
+    log("🧩 Generating Gap Data...")
+    detected = aggregation.gap_windows(gaps, 'long') if fill_gaps else []
+    # Window tambahan dipotong: slot yang sudah ada di data / gap panjang terdeteksi tidak dibuat lagi
+    extra = aggregation.trim_windows(extra_windows, df['timestamp'], occupied=detected, resolution=resolution)
+    windows = detected + extra
+    with span('gap_data', windows=len(windows)) as s:
+        df_gap = generate_gap_data(windows, rng=rng, resolution=resolution)
+        s.rows_out = len(df_gap)
+    log(f"   {len(df_gap):,} baris gap dari {len(windows)} window "
+        f"({len(detected)} gap panjang terdeteksi + {len(extra)} window tambahan setelah dipotong).")
+
+    log("🔗 Menggabungkan Data...")
+    with span('merge', rows_in=len(df) + len(df_gap)) as s:
+        df = pd.concat([df, df_gap], ignore_index=True)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+        df = df.dropna(subset=['timestamp', 'temp']).sort_values('timestamp', kind='stable')
+        s.rows_out = len(df)
+    if not df['timestamp'].is_unique:
+        raise ValueError(f"Timestamp ganda setelah merge ruangan {room['room_id']!r}: "
+                         f"{int(df['timestamp'].duplicated().sum()):,} baris")
+
+    log("⚡ Menghitung Status...")
+    with span('calculate', rows_in=len(df)) as s:
+        label_frame(df, room, rules)
+        s.rows_out = len(df)
+
+    with span('filter_invalid', rows_in=len(df)) as s:
+        invalid = int((df['status'] == 'Invalid').sum())
+        s.set(invalid=invalid)
+        if invalid > 0:
+            log(f"\n⚠️ Ditemukan {invalid:,} baris dengan status 'Invalid'.")
+            log("🗑️ Sedang menghapus data Invalid...")
+            df = df[df['status'] != 'Invalid']
+            log(f"✅ Data Invalid berhasil dibuang. Sisa data bersih: {len(df):,} baris.")
+        else:
+            log("\n✅ Selesai! Tidak ditemukan data 'Invalid' (Data sudah bersih 100%).")
+        s.rows_out = len(df)
+
+    df = df.copy()
+    df[ROUND_COLUMNS] = df[ROUND_COLUMNS].round(2)
+    if room_column:
+        df.insert(0, 'room_id', room['room_id'])
+    schema.compact(df)  # float32 / uint8 / category, lihat schema.py
+    return df, {'short_gaps': n_short, 'long_gaps': len(detected), 'windows': len(windows),
+                'gap_rows': len(df_gap), 'invalid': invalid}
+
+
+# --- PARTISI RAW ---
+def partition_raw(input_path, out_dir, rooms, chunksize=200_000):
+    """
+    Memecah raw per ruangan. Return dict room_id -> path raw ruangan.
+    Urutan baris dalam tiap ruangan sama dengan urutan di raw, jadi checkpoint incremental
+    agregasi per ruangan tetap valid selama raw hanya bertambah di akhir.
+    """
+    if os.path.isdir(input_path):
+        return {os.path.splitext(name)[0]: os.path.join(input_path, name)
+                for name in sorted(os.listdir(input_path)) if name.endswith('.csv')}
+
+    header = pd.read_csv(input_path, nrows=0).columns
+    if 'room_id' not in header and 'device_id' not in header:
+        return {DEFAULT_ROOM: input_path}
+
+    device_room = {d: r['room_id'] for r in rooms.values() for d in r['devices']}
+    paths = {}
+    for chunk in pd.read_csv(input_path, chunksize=chunksize, dtype={'room_id': str, 'device_id': str}):
+        if 'room_id' in chunk.columns:
+            # Hanya room_id terdaftar yang jadi folder (nilai raw tidak pernah langsung jadi path)
+            room_ids = chunk['room_id'].where(chunk['room_id'].isin(list(rooms)), UNASSIGNED_ROOM)
+        else:
+            room_ids = chunk['device_id'].map(device_room).fillna(UNASSIGNED_ROOM)
+        for room_id, part in chunk[RAW_COLUMNS].groupby(room_ids.to_numpy(), sort=False):
+            path = paths.get(room_id)
+            if path is None:
+                os.makedirs(shard_dir(out_dir, room_id), exist_ok=True)
+                path = paths[room_id] = os.path.join(shard_dir(out_dir, room_id), RAW_SHARD)
+                part.to_csv(path, index=False)
+            else:
+                part.to_csv(path, index=False, mode='a', header=False)
+    return paths
+
+
+# --- PROSES SATU RUANGAN (di worker) ---
+def room_rng(room_id, seed):
+    """Random generator ber-seed yang stabil per ruangan."""
+    return np.random.default_rng([seed, zlib.crc32(room_id.encode())])
+
+
+def process_room(room, raw_path, room_dir, gap_windows=(), gap_resolution='s', seed=42,
+                 threshold_ratio=0.3, chunksize=200_000, fill_gaps=True, short_gap_s=aggregation.SHORT_GAP_S):
+    """
+    Extract -> agregasi -> labeling untuk satu ruangan. Return ringkasan (dict).
+    Gap terdeteksi diisi jika `fill_gaps` (short: interpolasi, long: sintetis); `gap_windows` = window
+    sintetis tambahan di luar gap hasil deteksi.
+    """
+    start = time.perf_counter()
+    room_id = room['room_id']
+    os.makedirs(room_dir, exist_ok=True)
+    shard = lambda name: os.path.join(room_dir, name)
+
+    with span('room', room_id=room_id) as room_span:
+        with span('extract') as s:
+            stats = extract_stream(raw_path, shard(EXTRACTED_SHARD), chunksize=chunksize,
+                                   checkpoint_path=shard(EXTRACT_CHECKPOINT_SHARD))
+            s.rows_in = s.rows_out = stats['rows']
+
+        with span('aggregate') as s:
+            state = aggregation.AggregationState.load(shard(STATE_SHARD), shard(CHECKPOINT_SHARD))
+            s.rows_in = aggregation.update_state(state, shard(EXTRACTED_SHARD), chunksize=chunksize,
+                                                 generation=generation(shard(EXTRACT_CHECKPOINT_SHARD)))
+            decision, _ = aggregation.finalize(state, threshold_ratio, shard(CLEAN_SHARD))
+            state.save(shard(CHECKPOINT_SHARD))
+            df_clean = storage.load_frame(shard(CLEAN_SHARD))
+            # Gap dari bucket state (sebelum drop), detik yang di-drop bukan gap
+            gaps = aggregation.detect_gaps(state.timestamps(), room_id, short_gap_s=short_gap_s,
+                                           resolution=gap_resolution)
+            storage.save_frame(gaps, shard(GAP_SHARD))
+            s.rows_out = len(df_clean)
+            s.set(decision=decision, gaps=len(gaps))
+
+        with span('label', rows_in=len(df_clean)) as s:
+            df, info = build_training_frame(df_clean, gaps, room, room_rng(room_id, seed), gap_windows,
+                                            gap_resolution, fill_gaps=fill_gaps, room_column=True)
+            storage.save_frame(df, shard(TRAIN_SHARD))
+            summary_cube.save(summary_cube.build(df, room_id), shard(CUBE_SHARD))
+            s.rows_out = len(df)
+            s.set(invalid=info['invalid'])
+        room_span.rows_out = len(df)
+
+    return {'room_id': room_id, 'ok': True, 'raw_rows': stats['total_rows'], 'new_rows': stats['rows'], 'clean_rows': len(df_clean),
+            'gaps': len(gaps), 'train_rows': len(df), 'invalid': info['invalid'], 'decision': decision,
+            'seconds': time.perf_counter() - start, 'error': None}
+
+
+def _process_room_safe(room_id, room, raw_path, out_dir, options):
+    try:
+        if room is None:
+            raise KeyError(f"Ruangan '{room_id}' tidak terdaftar di rooms.csv")
+        return process_room(room, raw_path, shard_dir(out_dir, room_id), **options)
+    except Exception as exc:
+        return {'room_id': room_id, 'ok': False, 'error': f'{type(exc).__name__}: {exc}',
+                'traceback': traceback.format_exc()}
+
+
+def run_rooms(partitions, rooms, out_dir, workers=None, options=None, on_done=None):
+    """Proses semua ruangan paralel di `workers` proses. Return list ringkasan per ruangan."""
+    options = options or {}
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_process_room_safe, room_id, rooms.get(room_id), raw_path, out_dir, options): room_id
+                   for room_id, raw_path in partitions.items()}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except BrokenProcessPool as exc:
+                # Worker mati mendadak (mis. kehabisan memori): tandai gagal, ruangan lain tetap dilaporkan
+                result = {'room_id': futures[future], 'ok': False, 'error': f'worker mati: {exc}'}
+            results.append(result)
+            if on_done:
+                on_done(result)
+    return sorted(results, key=lambda r: r['room_id'])
+
+
+def combine_shards(results, out_dir, output_path, cube_path=None, gaps_path=None):
+    """
+    Gabungkan shard train_data ruangan yang berhasil menjadi satu file (streaming per chunk).
+    Jika `cube_path` / `gaps_path` diisi, summary cube / tabel gap tiap ruangan juga digabung ke file itu.
+    """
+    rows = 0
+    ok = [r['room_id'] for r in results if r['ok']]
+    with storage.FrameWriter(output_path) as writer:
+        for room_id in ok:
+            for chunk in storage.iter_chunks(os.path.join(shard_dir(out_dir, room_id), TRAIN_SHARD)):
+                writer.write(chunk)
+                rows += len(chunk)
+    if cube_path is not None:
+        summary_cube.save(summary_cube.combine(*(summary_cube.load(os.path.join(shard_dir(out_dir, r), CUBE_SHARD))
+                                                 for r in ok)), cube_path)
+    if gaps_path is not None:
+        tables = [storage.load_frame(os.path.join(shard_dir(out_dir, r), GAP_SHARD)) for r in ok]
+        if tables:
+            storage.save_frame(pd.concat(tables, ignore_index=True), gaps_path)
+    return rows
@@ -0,0 +1,298 @@
+"""
+Driver pipeline: menjalankan script 01 -> 06 sesuai dependensi, dengan cache.
+
+Setiap tahap punya fingerprint dari:
+  - source script + modul helper lokal yang di-import (termasuk konstanta konfigurasi
+    seperti THRESHOLD_RATIO, GAP_START/GAP_END, list `models`),
+  - isi file input.
+Tahap dilewati jika fingerprint sama dengan run terakhir dan semua output masih ada.
+Tahap yang tidak saling bergantung (mis. 04 dan 05) dijalankan paralel.
+Dengan --metrics, span instrumentasi semua tahap ditulis ke satu file JSON lines
+dengan run_id yang sama (lihat instrumentation.py).
+
+    python run_pipeline.py                 # jalankan yang berubah saja
+    python run_pipeline.py --force train   # paksa tahap tertentu (dan turunannya)
+    python run_pipeline.py --dry-run       # lihat rencana tanpa menjalankan
+    python run_pipeline.py --metrics metrics.jsonl
+"""
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILENAME = '.pipeline_cache.json'
+
+STAGES = [
+    {'name': 'extract',      'script': '01_extracting_data.py',
+     'inputs': ['raw_data.csv'],           'outputs': ['extracted_data.parquet']},
+    {'name': 'aggregate',    'script': '02_agregate.py',
+     'inputs': ['extracted_data.parquet'], 'outputs': ['clean_data.parquet', 'gap_intervals.parquet']},
+    {'name': 'prepare',      'script': '03_final_preparation.py',
+     'inputs': ['clean_data.parquet', 'gap_intervals.parquet'], 'outputs': ['train_data.parquet', 'summary_cube.parquet']},
+    {'name': 'prepare_real', 'script': 'preparation_without_dummy.py',
+     'inputs': ['clean_data.parquet'],     'outputs': ['train_data1.parquet', 'summary_cube1.parquet']},
+    {'name': 'features',     'script': 'feature_engineering.py',
+     'inputs': ['train_data.parquet'],     'outputs': ['train_features.parquet']},
+    {'name': 'compact',      'script': 'steady_state_compaction.py',
+     'inputs': ['train_data.parquet'],     'outputs': ['train_compact.parquet']},
+    {'name': 'imbalance',    'script': '04_check_imbalance_data.py',
+     'inputs': ['summary_cube.parquet'],   'outputs': ['visualisasi_status_distribusi.png']},
+    {'name': 'benchmark',    'script': '05_model_training.py',
+     'inputs': ['train_data.parquet'],     'outputs': ['hasil_perbandingan_model.png']},
+    {'name': 'train',        'script': '06_bestmodel_training_final.py',
+     'inputs': ['train_data.parquet', 'models/best_params.json'],  # best_params opsional
+     'outputs': ['models/rf_status_model.pkl', 'models/rf_energy_model.pkl',
+                 'models/rf_status_model/manifest.json', 'models/rf_energy_model/manifest.json']},
+]
+
+
+# --- FINGERPRINT ---
+def _sha256_file(path, block=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(block), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class FileHasher:
+    """
+    Hash isi file, di-cache berdasarkan (size, mtime) agar file besar tidak dibaca ulang tiap run.
+    Folder dataset (part parquet, lihat storage.py) di-hash dari hash tiap part, jadi part lama
+    yang tidak berubah tidak dibaca ulang saat tahap incremental hanya menambah part baru.
+    """
+
+    def __init__(self, known=None):
+        self.known = dict(known or {})
+
+    def __call__(self, path):
+        if not os.path.exists(path):
+            return None
+        if os.path.isdir(path):
+            h = hashlib.sha256()
+            for name in sorted(os.listdir(path)):
+                if not name.startswith(('.', '_')):
+                    h.update(f'{name}:{self(os.path.join(path, name))}'.encode())
+            return h.hexdigest()
+        st = os.stat(path)
+        key = os.path.abspath(path)
+        entry = self.known.get(key)
+        if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            return entry['sha256']
+        digest = _sha256_file(path)
+        self.known[key] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': digest}
+        return digest
+
+
+def local_imports(script_path, seen=None):
+    """Modul helper lokal (file .py di repo) yang di-import script, secara transitif."""
+    seen = set() if seen is None else seen
+    with open(script_path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        names = []
+        if isinstance(node, ast.Import):
+            names = [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            names = [node.module]
+        for name in names:
+            path = os.path.join(REPO_DIR, name.split('.')[0] + '.py')
+            if os.path.exists(path) and path not in seen:
+                seen.add(path)
+                local_imports(path, seen)
+    return sorted(seen)
+
+
+def config_constants(script_path):
+    """Konstanta konfigurasi top-level script (nama HURUF_BESAR dan list `models`)."""
+    with open(script_path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    config = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and (target.id.isupper() or target.id == 'models'):
+                    config[target.id] = ast.unparse(node.value)
+    return config
+
+
+def stage_fingerprint(stage, hasher):
+    script = os.path.join(REPO_DIR, stage['script'])
+    code = {os.path.basename(p): _sha256_file(p) for p in [script] + local_imports(script)}
+    inputs = {p: hasher(p) for p in stage['inputs']}
+    config = config_constants(script)
+    digest = hashlib.sha256(json.dumps([code, inputs, config], sort_keys=True).encode()).hexdigest()
+    return digest, {'code': code, 'inputs': inputs, 'config': config}
+
+
+def explain_change(old, new):
+    """Alasan singkat kenapa tahap harus dijalankan ulang."""
+    if old is None:
+        return "belum pernah dijalankan"
+    reasons = [f"config {k}" for k in sorted(set(old['config']) | set(new['config']))
+               if old['config'].get(k) != new['config'].get(k)]
+    reasons += [f"input {k}" for k in new['inputs'] if old['inputs'].get(k) != new['inputs'][k]]
+    if not reasons and old['code'] != new['code']:
+        reasons.append("kode berubah")
+    return ", ".join(reasons) or "output hilang"
+
+
+# --- DAG ---
+def build_dependencies(stages):
+    producer = {out: s['name'] for s in stages for out in s['outputs']}
+    return {s['name']: sorted({producer[i] for i in s['inputs'] if i in producer}) for s in stages}
+
+
+def downstream(deps, names):
+    result = set(names)
+    changed = True
+    while changed:
+        changed = False
+        for stage, parents in deps.items():
+            if stage not in result and result.intersection(parents):
+                result.add(stage)
+                changed = True
+    return result
+
+
+def run_stage(stage, log_dir):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = REPO_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    env.setdefault('MPLBACKEND', 'Agg')  # plt.show() tidak memblokir saat dijalankan driver
+    log_path = os.path.join(log_dir, f"{stage['name']}.log")
+    start = time.perf_counter()
+    with open(log_path, 'w') as log:
+        proc = subprocess.run([sys.executable, os.path.join(REPO_DIR, stage['script'])],
+                              stdout=log, stderr=subprocess.STDOUT, env=env)
+    missing = [o for o in stage['outputs'] if not os.path.exists(o)]
+    ok = proc.returncode == 0 and not missing
+    return ok, time.perf_counter() - start, log_path
+
+
+def save_cache(cache, hasher, cache_path):
+    cache['files'] = hasher.known
+    with open(cache_path + '.tmp', 'w') as f:
+        json.dump(cache, f, indent=2)
+    os.replace(cache_path + '.tmp', cache_path)
+
+
+def run_pipeline(stages=STAGES, jobs=2, force=(), dry_run=False, cache_path=CACHE_FILENAME, log_dir='logs'):
+    cache = {}
+    if os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cache = json.load(f)
+    hasher = FileHasher(cache.get('files'))
+    stage_cache = cache.setdefault('stages', {})
+    deps = build_dependencies(stages)
+    forced = downstream(deps, force)
+    os.makedirs(log_dir, exist_ok=True)
+
+    status = {}  # name -> 'done' | 'skipped' | 'failed' | 'blocked'
+    running = {}
+    pending = {}
+    summary = []
+
+    def ready():
+        for s in stages:
+            name = s['name']
+            if name in status or name in running.values():
+                continue
+            parents = deps[name]
+            if any(status.get(p) in ('failed', 'blocked') for p in parents):
+                status[name] = 'blocked'
+                summary.append((name, 'blocked', 0.0, "tahap sebelumnya gagal"))
+                continue
+            if all(status.get(p) in ('done', 'skipped') for p in parents):
+                yield s
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while True:
+            for s in list(ready()):
+                name = s['name']
+                digest, detail = stage_fingerprint(s, hasher)
+                previous = stage_cache.get(name, {})
+                outputs_ok = all(os.path.exists(o) for o in s['outputs'])
+                # Saat dry-run output tahap sebelumnya belum berubah, jadi turunannya ditandai manual
+                upstream_planned = dry_run and any(status.get(p) == 'done' for p in deps[name])
+                if name not in forced and not upstream_planned and previous.get('fingerprint') == digest and outputs_ok:
+                    status[name] = 'skipped'
+                    summary.append((name, 'skipped', 0.0, "tidak ada perubahan"))
+                    continue
+                if name in forced:
+                    reason = "dipaksa (--force)"
+                elif upstream_planned:
+                    reason = "tahap sebelumnya akan dijalankan ulang"
+                else:
+                    reason = explain_change(previous.get('detail'), detail)
+                print(f"▶️  {name:<13} ({s['script']}): {reason}")
+                if dry_run:
+                    status[name] = 'done'
+                    summary.append((name, 'dry-run', 0.0, reason))
+                    continue
+                future = pool.submit(run_stage, s, log_dir)
+                running[future] = name
+                pending[name] = (digest, detail, reason)
+
+            if not running:
+                if all(s['name'] in status for s in stages):
+                    break
+                continue
+
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                ok, elapsed, log_path = future.result()
+                digest, detail, reason = pending.pop(name)
+                if ok:
+                    status[name] = 'done'
+                    stage_cache[name] = {'fingerprint': digest, 'detail': detail, 'finished_at': time.time()}
+                    summary.append((name, 'done', elapsed, reason))
+                    print(f"✅ {name:<13} selesai ({elapsed:.1f} detik)")
+                else:
+                    status[name] = 'failed'
+                    stage_cache.pop(name, None)
+                    summary.append((name, 'failed', elapsed, f"lihat log {log_path}"))
+                    print(f"❌ {name:<13} gagal, lihat {log_path}")
+
+            if not dry_run:
+                save_cache(cache, hasher, cache_path)
+
+    if not dry_run:
+        save_cache(cache, hasher, cache_path)
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Jalankan pipeline dengan cache per tahap.")
+    parser.add_argument('--jobs', type=int, default=2, help="Jumlah tahap yang boleh jalan paralel")
+    parser.add_argument('--force', nargs='*', default=[], help="Nama tahap yang dipaksa jalan ulang")
+    parser.add_argument('--dry-run', action='store_true', help="Hanya tampilkan tahap yang akan dijalankan")
+    parser.add_argument('--workdir', default='.', help="Folder data (file input/output relatif ke sini)")
+    parser.add_argument('--metrics', metavar='PATH', help="Tulis span instrumentasi (JSON lines) ke file ini")
+    args = parser.parse_args()
+
+    unknown = set(args.force) - {s['name'] for s in STAGES}
+    if unknown:
+        parser.error(f"Tahap tidak dikenal: {', '.join(sorted(unknown))}")
+
+    if args.metrics:
+        # Diteruskan ke subprocess tiap tahap lewat environment
+        os.environ['PIPELINE_METRICS'] = os.path.abspath(args.metrics)
+        os.environ.setdefault('PIPELINE_RUN_ID', time.strftime('%Y%m%dT%H%M%S-') + uuid.uuid4().hex[:6])
+    os.chdir(args.workdir)
+    print("="*50)
+    print("🚀  PIPELINE RUNNER")
+    print("="*50)
+    results = run_pipeline(jobs=args.jobs, force=args.force, dry_run=args.dry_run)
+    print("\n📊 Ringkasan:")
+    for name, state, elapsed, note in results:
+        print(f"   {name:<13} {state:<8} {elapsed:7.1f}s  {note}")
+    if any(state in ('failed', 'blocked') for _, state, _, _ in results):
+        sys.exit(1)
@@ -0,0 +1,73 @@
+"""
+Skema tipe data kolom pipeline (compaction) untuk jalur 03 -> 06.
+
+  sensor & target angka (temp, hum, lux, noise, energy_kwh, pmv, luas)  -> float32
+  occupancy, ppd (0..100)                                               -> uint8
+  status (5 label + Invalid)                                            -> category (kategori tetap)
+  room_id                                                               -> category
+  fitur float lain (mis. fitur temporal)                                -> float32
+Timestamp tetap datetime64[ns]: di memori sudah int64 epoch (8 byte), dan parquet menyimpannya
+sebagai INT64 epoch dengan anotasi timestamp, jadi tidak perlu kolom epoch terpisah.
+
+Perhitungan label (rules, kurva kWh) dan agregasi tetap di float64; compaction dilakukan
+setelahnya (sebelum disimpan) dan saat load di tahap 04-06.
+"""
+import numpy as np
+import pandas as pd
+
+STATUS_CATEGORIES = ['Boros Energi', 'Ideal', 'Kritis', 'Optimalisasi', 'Peringatan', 'Invalid']
+
+SCHEMA = {
+    'temp': 'float32',
+    'hum': 'float32',
+    'lux': 'float32',
+    'noise': 'float32',
+    'energy_kwh': 'float32',
+    'pmv': 'float32',
+    'luas': 'float32',
+    'occupancy': 'uint8',
+    'ppd': 'uint8',
+    'status': pd.CategoricalDtype(STATUS_CATEGORIES),
+    'room_id': 'category',
+}
+
+
+def _to_int(series, dtype):
+    info = np.iinfo(dtype)
+    if series.isna().any():
+        return series  # Integer numpy tidak bisa menyimpan NaN
+    values = series.to_numpy()
+    if len(values) and (values.min() < info.min or values.max() > info.max or np.any(values != np.round(values))):
+        return pd.to_numeric(series, downcast='integer')
+    return series.astype(dtype)
+
+
+def compact(df, schema=SCHEMA, downcast_floats=True):
+    """Mengubah tipe kolom sesuai skema (in-place, return df yang sama)."""
+    for col in df.columns:
+        dtype = schema.get(col)
+        series = df[col]
+        if dtype is None:
+            if downcast_floats and series.dtype == 'float64':
+                df[col] = series.astype('float32')
+            continue
+        if isinstance(dtype, str) and dtype == 'category':
+            if series.dtype.name != 'category':
+                df[col] = series.astype('category')
+        elif isinstance(dtype, pd.CategoricalDtype):
+            if series.dtype == dtype:
+                continue
+            unknown = set(series.dropna().unique()) - set(dtype.categories)
+            if unknown:
+                raise ValueError(f"Nilai '{col}' di luar kategori skema: {sorted(unknown)}")
+            df[col] = series.astype(dtype)
+        elif np.issubdtype(np.dtype(dtype), np.integer) and series.dtype != dtype:
+            df[col] = _to_int(series, dtype)
+        elif series.dtype != dtype:
+            df[col] = series.astype(dtype)
+    return df
+
+
+def memory_mb(df):
+    """Memori DataFrame (MB), termasuk isi string object."""
+    return df.memory_usage(deep=True).sum() / 1e6
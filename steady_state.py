@@ -0,0 +1,153 @@
+"""
+Compaction run-length untuk data per detik yang stabil (steady state).
+
+Baris berurutan digabung menjadi satu baris representatif selama semua kolom masih dalam
+toleransi dari baris pertama run (anchor):
+    |x - x_anchor| <= TOLERANCES[kolom]      (toleransi 0 / kolom kategori = harus sama)
+dan run putus jika selisih waktu > MAX_GAP_S, ruangan berganti, atau panjang run > MAX_RUN.
+Baris representatif = rata-rata berbobot tiap kolom angka (kolom integer dibulatkan), kolom
+kategori & timestamp dari baris pertama, dan kolom `weight` = jumlah baris asli yang diwakili.
+`status` ikut sebagai kunci, jadi satu run tidak pernah mencampur dua label.
+
+Data gap sintetis (interpolasi linear per detik) menyusut sekitar TOLERANSI / langkah per detik.
+Data sensor asli yang berisik hampir tidak menyusut. Model dilatih dengan
+`sample_weight=weight` (05 / 06 dengan USE_COMPACTED = True).
+
+    python steady_state.py --evaluate      # akurasi RF: data penuh vs data compact
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+TOLERANCES = {
+    'temp': 0.25, 'hum': 1.0, 'lux': 10.0, 'noise': 1.0, 'occupancy': 2, 'luas': 0,
+    'energy_kwh': 0.02, 'pmv': 0.1, 'ppd': 2, 'status': 0,
+}
+WEIGHT = 'weight'
+TIMESTAMP = 'timestamp'
+ROOM = 'room_id'
+MAX_GAP_S = 5        # Selisih waktu lebih dari ini memutus run
+MAX_RUN = 3600       # Panjang run maksimum (baris)
+_WINDOW = 64         # Panjang awal jendela pencarian akhir run
+
+
+def _run_starts(values, tol, hard_breaks, max_run):
+    """
+    Index awal tiap run. `values` [n, k] (kategori sudah jadi kode angka), `tol` [k].
+    Satu iterasi Python per run: akhir run dicari dengan operasi vektor di jendela yang
+    diperbesar dua kali lipat sampai ketemu.
+    """
+    n = len(values)
+    next_break = np.append(np.flatnonzero(hard_breaks), n)  # hard_breaks[i] -> run baru mulai di i
+    starts = []
+    i = 0
+    while i < n:
+        starts.append(i)
+        limit = min(n, i + max_run, next_break[np.searchsorted(next_break, i, side='right')])
+        end, window = limit, _WINDOW
+        lo = i + 1
+        while lo < limit:
+            hi = min(limit, lo + window)
+            outside = np.any(np.abs(values[lo:hi] - values[i]) > tol, axis=1)
+            if outside.any():
+                end = lo + int(np.argmax(outside))
+                break
+            lo, window = hi, window * 2
+        i = end
+    return np.asarray(starts, dtype=np.int64)
+
+
+def compact_runs(df, tolerances=TOLERANCES, max_gap_s=MAX_GAP_S, max_run=MAX_RUN):
+    """DataFrame (urut waktu per ruangan) -> DataFrame baris representatif + kolom `weight`."""
+    if len(df) == 0:
+        out = df.copy()
+        out[WEIGHT] = np.zeros(0, dtype='float32')
+        return out
+    df = df.reset_index(drop=True)
+    cols = [c for c in tolerances if c in df.columns]
+    keys, tol = [], []
+    for c in cols:
+        if pd.api.types.is_numeric_dtype(df[c]) and not isinstance(df[c].dtype, pd.CategoricalDtype):
+            keys.append(df[c].to_numpy(dtype='float64'))
+        else:
+            keys.append(pd.factorize(df[c], use_na_sentinel=False)[0].astype('float64'))
+        tol.append(float(tolerances[c]) + 1e-9)  # Toleransi inklusif (aman untuk float32)
+    values = np.column_stack(keys)
+
+    hard = np.zeros(len(df), dtype=bool)
+    if TIMESTAMP in df.columns:
+        ts = df[TIMESTAMP].to_numpy(dtype='datetime64[ns]').view('int64')
+        hard[1:] |= np.diff(ts) > max_gap_s * 1_000_000_000
+    if ROOM in df.columns:
+        room = pd.factorize(df[ROOM], use_na_sentinel=False)[0]
+        hard[1:] |= room[1:] != room[:-1]
+    starts = _run_starts(values, np.asarray(tol), hard, max_run)
+
+    w = df[WEIGHT].to_numpy(dtype='float64') if WEIGHT in df.columns else np.ones(len(df))
+    weight = np.add.reduceat(w, starts)
+    out = df.iloc[starts].reset_index(drop=True)
+    for c in df.columns:
+        series = df[c]
+        if c == WEIGHT or not pd.api.types.is_numeric_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+        mean = np.add.reduceat(series.to_numpy(dtype='float64') * w, starts) / weight
+        if pd.api.types.is_integer_dtype(series):
+            mean = np.round(mean)
+        out[c] = mean.astype(series.dtype)
+    out[WEIGHT] = weight.astype('float32')
+    return out
+
+
+# --- EVALUASI: data penuh vs compact ---
+def evaluate(path='train_data.parquet', n_estimators=100, tolerances=TOLERANCES):
+    """
+    Latih RF (setelan 06) di train split penuh dan di versi compact-nya (sample_weight),
+    keduanya dinilai di test split yang sama (resolusi penuh).
+    """
+    import storage
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+    from sklearn.metrics import accuracy_score, f1_score, mean_absolute_error, r2_score
+    from sklearn.model_selection import train_test_split
+
+    features = ['occupancy', 'temp', 'hum', 'lux', 'noise', 'luas']
+    targets = ['energy_kwh', 'pmv', 'ppd']
+    df = storage.load_frame(path, compact=True)
+    train, test = train_test_split(df, test_size=0.2, random_state=42, stratify=df['status'])
+    train = train.sort_values([c for c in (ROOM, TIMESTAMP) if c in train.columns], kind='stable')
+    start = time.perf_counter()
+    compacted = compact_runs(train, tolerances)
+    compact_s = time.perf_counter() - start
+
+    rows = []
+    for name, data, weight in (('penuh', train, None), ('compact', compacted, compacted[WEIGHT].to_numpy())):
+        clf = RandomForestClassifier(n_estimators=n_estimators, random_state=42, class_weight='balanced', n_jobs=-1)
+        reg = RandomForestRegressor(n_estimators=n_estimators, random_state=42, n_jobs=-1)
+        start = time.perf_counter()
+        clf.fit(data[features], data['status'], sample_weight=weight)
+        reg.fit(data[features], data[targets], sample_weight=weight)
+        fit_s = time.perf_counter() - start
+        pred_cls, pred_reg = clf.predict(test[features]), reg.predict(test[features])
+        rows.append({'data': name, 'rows': len(data), 'fit_s': fit_s,
+                     'accuracy': accuracy_score(test['status'], pred_cls),
+                     'f1_macro': f1_score(test['status'], pred_cls, average='macro'),
+                     'r2': r2_score(test[targets], pred_reg), 'mae': mean_absolute_error(test[targets], pred_reg)})
+    return pd.DataFrame(rows), compact_s
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compaction run-length data steady state.")
+    parser.add_argument('--evaluate', metavar='FILE', nargs='?', const='train_data.parquet',
+                        help="Bandingkan RF data penuh vs compact (default train_data.parquet)")
+    parser.add_argument('--trees', type=int, default=100)
+    args = parser.parse_args()
+    if not args.evaluate:
+        parser.print_help()
+        raise SystemExit
+    report, compact_s = evaluate(args.evaluate, n_estimators=args.trees)
+    print(f"📊 RF {args.trees} pohon, test split resolusi penuh (compaction {compact_s:.1f} detik):")
+    print(report.to_string(index=False, float_format=lambda v: f'{v:.5f}'))
+    full, small = report.iloc[0], report.iloc[1]
+    print(f"\n   Baris training {full['rows'] / small['rows']:.1f}x lebih sedikit, fit {full['fit_s'] / small['fit_s']:.1f}x "
+          f"lebih cepat; selisih akurasi {small['accuracy'] - full['accuracy']:+.5f}, "
+          f"F1 {small['f1_macro'] - full['f1_macro']:+.5f}, R2 {small['r2'] - full['r2']:+.5f}")
@@ -0,0 +1,36 @@
+import schema
+import storage
+from instrumentation import span
+from steady_state import compact_runs, TOLERANCES, MAX_GAP_S, MAX_RUN
+
+# --- KONFIGURASI ---
+INPUT_FILENAME  = 'train_data.parquet'
+OUTPUT_FILENAME = 'train_compact.parquet'   # Dipakai 05/06 jika USE_COMPACTED = True
+TOLERANCE       = TOLERANCES                # Toleransi per kolom (0 = harus sama)
+MAX_GAP         = MAX_GAP_S                 # Detik; selisih waktu lebih besar memutus run
+MAX_RUN_ROWS    = MAX_RUN
+
+print("="*50)
+print("🗜️  STEADY-STATE COMPACTION")
+print("="*50)
+
+if not storage.exists(INPUT_FILENAME):
+    print(f"❌ Error: File '{INPUT_FILENAME}' tidak ditemukan!")
+    exit()
+
+with span('load') as s:
+    df = storage.load_frame(INPUT_FILENAME, compact=True)
+    s.rows_out = len(df)
+print(f"\n📂 {len(df):,} baris dimuat dari '{INPUT_FILENAME}'")
+
+print("⚙️  Menggabungkan run baris yang stabil...")
+with span('compact_runs', rows_in=len(df)) as s:
+    df_compact = schema.compact(compact_runs(df, TOLERANCE, MAX_GAP, MAX_RUN_ROWS))
+    s.rows_out = len(df_compact)
+print(f"   {len(df):,} -> {len(df_compact):,} baris ({len(df) / max(len(df_compact), 1):.1f}x lebih sedikit)")
+print(f"   Rata-rata bobot {df_compact['weight'].mean():.1f}, maksimum {df_compact['weight'].max():.0f}")
+
+with span('save', rows_in=len(df_compact)):
+    storage.save_frame(df_compact, OUTPUT_FILENAME)
+print(f"\n💾 Tersimpan ke '{OUTPUT_FILENAME}'")
+print("✅ SELESAI!")
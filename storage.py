@@ -0,0 +1,289 @@
+"""
+Storage data antar tahap pipeline (extracted -> clean -> train).
+
+Format ditentukan dari ekstensi file:
+  .parquet  -> kolumnar, bertipe, terkompresi (default pipeline)
+  .feather  -> Arrow IPC, cepat dibaca ulang
+  .csv      -> tetap didukung untuk export / kompatibilitas
+Timestamp disimpan sebagai tipe datetime (tidak perlu pd.to_datetime lagi di tahap berikutnya)
+dan pembacaan bisa dibatasi hanya ke kolom yang dibutuhkan (column projection).
+`compact=True` menerapkan skema tipe data kecil dari schema.py saat load.
+
+Path .parquet boleh berupa folder dataset (beberapa file part, dibaca urut nama file). Tahap
+incremental (01, 02) hanya menambah / mengganti part yang berubah, tanpa menulis ulang seluruh
+file; pembaca di bawah memperlakukan folder itu sama seperti satu file.
+"""
+import os
+import shutil
+import pandas as pd
+import schema
+
+PARQUET_COMPRESSION = 'zstd'
+PARQUET_ROW_GROUP_SIZE = 100_000  # Row group kecil -> filter `since` bisa melewati data lama
+FORMATS = {'.parquet': 'parquet', '.feather': 'feather', '.csv': 'csv'}
+TIMESTAMP_COLUMN = 'timestamp'
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Format file '{path}' tidak dikenal (pakai {', '.join(FORMATS)})")
+    return FORMATS[ext]
+
+
+def resolve_path(path):
+    """
+    Jika `path` belum ada, cari file dengan nama sama tapi format lain
+    (mis. clean_data.csv lama saat pipeline sudah memakai clean_data.parquet).
+    """
+    if os.path.exists(path):
+        return path
+    stem = os.path.splitext(path)[0]
+    for ext in FORMATS:
+        if os.path.exists(stem + ext):
+            return stem + ext
+    return path
+
+
+def exists(path):
+    return os.path.exists(resolve_path(path))
+
+
+def is_dataset(path):
+    """True jika `path` folder dataset parquet (berisi file part)."""
+    return os.path.isdir(path)
+
+
+def parquet_parts(path):
+    """File part dataset urut nama (file tersembunyi / sementara '.' & '_' diabaikan), atau [path]."""
+    if not is_dataset(path):
+        return [path]
+    return [os.path.join(path, name) for name in sorted(os.listdir(path))
+            if name.endswith('.parquet') and not name.startswith(('.', '_'))]
+
+
+def write_part(df, path, name, index=False):
+    """
+    Tulis / ganti satu part `name` di folder dataset `path` secara atomik
+    (file sementara tersembunyi lalu rename, pembaca tidak pernah melihat part setengah jadi).
+    """
+    os.makedirs(path, exist_ok=True)
+    tmp = os.path.join(path, f'.{name}.tmp.parquet')
+    save_frame(df, tmp, index=index)
+    os.replace(tmp, os.path.join(path, name))
+
+
+def remove(path):
+    """Hapus file atau folder dataset (jika ada)."""
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def load_frame(path, columns=None, compact=False, since=None):
+    """
+    Membaca satu file tahap pipeline. `columns` membatasi kolom yang dibaca.
+    `since` -> hanya baris dengan timestamp > since (parquet: row group lama dilewati lewat statistik).
+    """
+    path = resolve_path(path)
+    fmt = detect_format(path)
+    columns = list(columns) if columns is not None else None
+    since = pd.Timestamp(since) if since is not None else None
+    if fmt == 'parquet':
+        filters = [(TIMESTAMP_COLUMN, '>', since)] if since is not None else None
+        df = pd.read_parquet(path, columns=columns, filters=filters)
+    else:
+        read_columns = columns
+        if since is not None and columns is not None and TIMESTAMP_COLUMN not in columns:
+            read_columns = columns + [TIMESTAMP_COLUMN]
+        if fmt == 'feather':
+            df = pd.read_feather(path, columns=read_columns)
+        else:
+            header = pd.read_csv(path, nrows=0).columns
+            parse_dates = [TIMESTAMP_COLUMN] if TIMESTAMP_COLUMN in header and (
+                read_columns is None or TIMESTAMP_COLUMN in read_columns) else None
+            df = pd.read_csv(path, usecols=read_columns, parse_dates=parse_dates)
+        if since is not None:
+            df = df[df[TIMESTAMP_COLUMN] > since].reset_index(drop=True)
+        df = df[columns] if columns is not None else df
+    return schema.compact(df) if compact else df
+
+
+def save_frame(df, path, index=False):
+    """Menyimpan DataFrame sesuai format dari ekstensi `path` (folder dataset lama di path itu diganti)."""
+    fmt = detect_format(path)
+    if is_dataset(path):
+        remove(path)
+    if fmt == 'parquet':
+        df.to_parquet(path, index=index, compression=PARQUET_COMPRESSION, row_group_size=PARQUET_ROW_GROUP_SIZE)
+    elif fmt == 'feather':
+        (df.reset_index() if index else df.reset_index(drop=True)).to_feather(path)
+    else:
+        df.to_csv(path, index=index)
+
+
+def read_head(path, n=5):
+    """Preview n baris pertama tanpa membaca seluruh file."""
+    path = resolve_path(path)
+    fmt = detect_format(path)
+    if fmt == 'csv':
+        return pd.read_csv(path, nrows=n)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        for part in parquet_parts(path):
+            pf = pq.ParquetFile(part)
+            if pf.metadata.num_rows:
+                group = next(i for i in range(pf.num_row_groups) if pf.metadata.row_group(i).num_rows)
+                return pf.read_row_group(group).slice(0, n).to_pandas()
+        return pd.DataFrame(columns=read_columns(path))
+    return load_frame(path).head(n)
+
+
+def read_columns(path):
+    """Daftar kolom file tanpa membaca datanya."""
+    path = resolve_path(path)
+    fmt = detect_format(path)
+    if fmt == 'csv':
+        return list(pd.read_csv(path, nrows=0).columns)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        parts = parquet_parts(path)
+        return list(pq.read_schema(parts[0]).names) if parts else []
+    import pyarrow as pa
+    with pa.memory_map(path) as source:
+        return list(pa.ipc.open_file(source).schema.names)
+
+
+def count_rows(path):
+    """Jumlah baris data (parquet dari metadata, csv dengan menghitung baris)."""
+    path = resolve_path(path)
+    fmt = detect_format(path)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        return sum(pq.ParquetFile(part).metadata.num_rows for part in parquet_parts(path))
+    if fmt == 'feather':
+        import pyarrow as pa
+        with pa.memory_map(path) as source:
+            return pa.ipc.open_file(source).read_all().num_rows
+    with open(path, 'rb') as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
+def iter_chunks(path, chunksize=500_000, columns=None, start_row=0, compact=False):
+    """
+    Membaca file per chunk (maks. `chunksize` baris) mulai dari baris ke-`start_row`.
+    Untuk parquet, part & row group sebelum `start_row` dilewati tanpa dibaca.
+    """
+    for chunk in _iter_chunks(path, chunksize, columns, start_row):
+        yield schema.compact(chunk) if compact else chunk
+
+
+def _iter_chunks(path, chunksize, columns, start_row):
+    path = resolve_path(path)
+    fmt = detect_format(path)
+    columns = list(columns) if columns is not None else None
+    if fmt == 'csv':
+        header = pd.read_csv(path, nrows=0).columns
+        parse_dates = [TIMESTAMP_COLUMN] if TIMESTAMP_COLUMN in header and (
+            columns is None or TIMESTAMP_COLUMN in columns) else None
+        skip = range(1, start_row + 1) if start_row else None
+        for chunk in pd.read_csv(path, chunksize=chunksize, usecols=columns,
+                                 parse_dates=parse_dates, skiprows=skip):
+            yield chunk[columns] if columns is not None else chunk
+        return
+
+    if fmt == 'feather':
+        df = load_frame(path, columns=columns).iloc[start_row:]
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+        return
+
+    import pyarrow.parquet as pq
+    for part in parquet_parts(path):
+        rows = pq.ParquetFile(part).metadata.num_rows
+        if start_row < rows:
+            yield from _iter_parquet(part, chunksize, columns, start_row)
+        start_row = max(start_row - rows, 0)
+
+
+def _iter_parquet(path, chunksize, columns, start_row):
+    """Satu file parquet per batch; row group sebelum `start_row` dilewati tanpa dibaca."""
+    import pyarrow.parquet as pq
+    pf = pq.ParquetFile(path)
+    offset = 0
+    groups = []
+    for i in range(pf.num_row_groups):
+        n = pf.metadata.row_group(i).num_rows
+        if offset + n > start_row:
+            groups.append(i)
+        offset += n
+    if not groups:
+        return
+    skip = start_row - sum(pf.metadata.row_group(i).num_rows for i in range(groups[0]))
+    for batch in pf.iter_batches(batch_size=chunksize, row_groups=groups, columns=columns):
+        if skip >= batch.num_rows:
+            skip -= batch.num_rows
+            continue
+        if skip:
+            batch = batch.slice(skip)
+            skip = 0
+        yield batch.to_pandas()
+
+
+class FrameWriter:
+    """
+    Menulis DataFrame per chunk (append) ke satu file output.
+    Chunk berikutnya harus punya kolom yang sama dengan chunk pertama.
+
+        with FrameWriter('extracted_data.parquet') as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.fmt = detect_format(path)
+        if is_dataset(path):
+            remove(path)
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        self._columns = None
+
+    def write(self, df):
+        if self._columns is None:
+            self._columns = list(df.columns)
+        df = df[self._columns]
+        if self.fmt == 'csv':
+            first = self._writer is None
+            df.to_csv(self.path, index=False, mode='w' if first else 'a', header=first)
+            self._writer = 'csv'
+        else:
+            import pyarrow as pa
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._schema = table.schema
+                if self.fmt == 'parquet':
+                    import pyarrow.parquet as pq
+                    self._writer = pq.ParquetWriter(self.path, self._schema, compression=PARQUET_COMPRESSION)
+                else:
+                    self._writer = pa.ipc.new_file(self.path, self._schema)
+            self._writer.write_table(table.cast(self._schema))
+        self.rows += len(df)
+
+    def close(self, empty_columns=None):
+        """Menutup file. Jika belum ada chunk sama sekali, tulis file kosong dengan `empty_columns`."""
+        if self._writer is None:
+            save_frame(pd.DataFrame(columns=empty_columns or self._columns or []), self.path)
+        elif self._writer != 'csv':
+            self._writer.close()
+        self._writer = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self._writer is not False:
+            self.close()
+        return False
@@ -0,0 +1,116 @@
+"""
+Summary cube: ringkasan data training per (room_id, hour, status) untuk report & dashboard.
+
+Tiap baris cube berisi `count` dan untuk setiap kolom MEASURES: <kolom>_sum, <kolom>_sumsq,
+<kolom>_min, <kolom>_max. Semua agregat bisa digabung (count & sum dijumlah, min/max diambil
+min/max), jadi cube beberapa shard digabung tanpa membaca ulang data mentah, dan mean/std
+per status, ruangan, atau jam dihitung dari cube saja.
+
+Tahap labeling (03, preparation_without_dummy, rooms.process_room) menulis ulang cube bersama
+train_data, sehingga cube selalu berisi data yang sama dengan file training di sebelahnya. Cube
+gabungan banyak ruangan hanya dibuat multi_room_pipeline (rooms.combine_shards). 04 dan statistik di 03 membaca cube, jadi ukurannya tidak bergantung jumlah baris
+(satu ruangan x 7 hari ~ 840 baris cube untuk ratusan ribu baris data).
+Statistik dari cube hanya count/mean/std/min/max: kuartil (25%/50%/75% di DataFrame.describe)
+tidak bisa digabung dari agregat, jadi tidak tersedia.
+"""
+import os
+import numpy as np
+import pandas as pd
+import schema
+import storage
+
+CUBE_FILENAME = 'summary_cube.parquet'
+KEYS = ['room_id', 'hour', 'status']
+MEASURES = ['temp', 'hum', 'lux', 'noise', 'occupancy', 'luas', 'energy_kwh', 'pmv', 'ppd']
+STATS = ('sum', 'sumsq', 'min', 'max')
+_COMBINE = {'count': 'sum', 'sum': 'sum', 'sumsq': 'sum', 'min': 'min', 'max': 'max'}
+
+
+def columns():
+    return KEYS + ['count'] + [f'{m}_{s}' for m in MEASURES for s in STATS]
+
+
+def _empty():
+    return pd.DataFrame({c: pd.Series(dtype='float64') for c in columns()}).astype(
+        {'room_id': 'object', 'hour': 'datetime64[ns]', 'status': 'object', 'count': 'int64'})
+
+
+def _finish(cube):
+    cube = cube.sort_values(KEYS, kind='stable').reset_index(drop=True)
+    cube['room_id'] = cube['room_id'].astype(str)
+    cube['status'] = cube['status'].astype(schema.SCHEMA['status'])
+    return cube[columns()]
+
+
+def build(df, room_id=None):
+    """Cube dari DataFrame berlabel. `room_id` dipakai jika df tidak punya kolom room_id."""
+    if len(df) == 0:
+        return _empty()
+    measures = [m for m in MEASURES if m in df.columns]
+    frame = pd.DataFrame({
+        'room_id': df['room_id'].astype(str).to_numpy() if 'room_id' in df.columns else room_id,
+        'hour': pd.to_datetime(df['timestamp']).dt.floor('h').to_numpy(),
+        'status': df['status'].astype(str).to_numpy(),
+    })
+    for m in measures:
+        values = df[m].to_numpy(dtype='float64')
+        frame[m] = values
+        frame[f'{m}_sq'] = values * values
+    agg = {'count': ('status', 'size')}
+    for m in measures:
+        agg.update({f'{m}_sum': (m, 'sum'), f'{m}_sumsq': (f'{m}_sq', 'sum'),
+                    f'{m}_min': (m, 'min'), f'{m}_max': (m, 'max')})
+    cube = frame.groupby(KEYS, sort=False).agg(**agg).reset_index()
+    for m in set(MEASURES) - set(measures):
+        for s in STATS:
+            cube[f'{m}_{s}'] = np.nan
+    return _finish(cube)
+
+
+def combine(*cubes):
+    """Gabungkan beberapa cube (mis. data lama + baris baru, atau beberapa ruangan)."""
+    cubes = [c for c in cubes if c is not None and len(c)]
+    if not cubes:
+        return _empty()
+    cube = pd.concat(cubes, ignore_index=True)
+    cube['status'] = cube['status'].astype(str)
+    agg = {c: _COMBINE[c.rsplit('_', 1)[-1]] for c in columns() if c not in KEYS}
+    return _finish(cube.groupby(KEYS, sort=False).agg(agg).reset_index())
+
+
+def load(path=CUBE_FILENAME):
+    """Cube di `path`, atau None jika belum ada / format lama (kolom MEASURES berbeda -> dibangun ulang)."""
+    if not storage.exists(path):
+        return None
+    cube = storage.load_frame(path)
+    return cube if list(cube.columns) == columns() else None
+
+
+def save(cube, path=CUBE_FILENAME):
+    tmp = path + '.tmp.parquet'
+    storage.save_frame(cube, tmp)
+    os.replace(tmp, path)
+
+
+# --- QUERY ---
+def status_counts(cube, room_id=None):
+    """Jumlah baris per status (urut terbanyak), seperti value_counts()."""
+    if room_id is not None:
+        cube = cube[cube['room_id'] == room_id]
+    counts = cube.groupby(cube['status'].astype(str))['count'].sum()
+    return counts[counts > 0].sort_values(ascending=False, kind='stable').rename('count')
+
+
+def describe(cube, room_id=None):
+    """Statistik count/mean/std/min/max per kolom MEASURES (DataFrame.describe tanpa kuartil)."""
+    if room_id is not None:
+        cube = cube[cube['room_id'] == room_id]
+    n = cube['count'].sum()
+    rows = {}
+    for m in MEASURES:
+        total, total_sq = cube[f'{m}_sum'].sum(), cube[f'{m}_sumsq'].sum()
+        mean = total / n if n else np.nan
+        var = (total_sq - n * mean * mean) / (n - 1) if n > 1 else np.nan
+        rows[m] = {'count': n, 'mean': mean, 'std': np.sqrt(max(var, 0.0)) if n > 1 else np.nan,
+                   'min': cube[f'{m}_min'].min(), 'max': cube[f'{m}_max'].max()}
+    return pd.DataFrame(rows)
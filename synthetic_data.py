@@ -0,0 +1,119 @@
+"""
+Generator data sintetis untuk menyeimbangkan kasus (data gap).
+
+Semua skenario & parameter untuk seluruh keyframe diambil sekaligus (batched) dari
+numpy.random.Generator ber-seed, lalu diinterpolasi linear ke resolusi per detik.
+Hasil interpolasi bisa diambil per chunk sehingga tidak perlu membuat frame per detik utuh.
+"""
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+GAP_COLUMNS = ['timestamp', 'occupancy', 'temp', 'hum', 'lux', 'noise']
+SENSOR_COLUMNS = ['temp', 'hum', 'lux', 'noise']
+
+SCENARIOS = {
+    # Format: [OccMin, OccMax, T_Min, T_Max, H_Min, H_Max, L_Min, L_Max, N_Min, N_Max]
+    'Kritis':      [61, 90,   28.5, 31.0,  72, 85,  650, 750,  58, 75], # Panas & Rame
+    'Peringatan':  [31, 60,   27.2, 28.5,  66, 78,  545, 650,  45, 60], # Agak Panas
+    'Optimal':     [19, 25,   25.0, 26.5,  52, 68,  300, 390,  42, 58], # Nyaman
+    'Ideal':       [1,  18,   21.0, 24.0,  45, 55,  390, 440,  35, 45], # Sangat Nyaman
+    'Boros':       [0,  0,    18.0, 20.0,  42, 58,  440, 500,  30, 48]  # Dingin tapi KOSONG (0 orang)
+}
+SCENARIO_PROBS = {'Kritis': 0.25, 'Peringatan': 0.25, 'Optimal': 0.20, 'Ideal': 0.10, 'Boros': 0.20}
+
+# Occupancy dari suhu sensor asli.
+# Format: (T_Max inklusif, OccMin, OccMax) -> occupancy diambil dari [OccMin, OccMax)
+OCCUPANCY_BANDS = [
+    (20.5,   0,  1),   # Dingin -> kosong (Boros Energi)
+    (24.8,   1, 18),   # Ideal
+    (26.3,  19, 25),   # Optimalisasi
+    (27.0,  26, 30),   # Peringatan bawah
+    (28.3,  31, 60),   # Peringatan atas
+    (np.inf, 61, 90),  # Sangat panas -> pasti rame banget (Kritis)
+]
+OCCUPANCY_FALLBACK = (1, 18)  # Suhu tidak terbaca (NaN) -> anggap Ideal
+
+KEYFRAME_FREQ = '5min'
+CHUNK_ROWS = 1_000_000
+
+
+def generate_gap_keyframes(windows, rng, freq=KEYFRAME_FREQ, scenarios=SCENARIOS, probs=SCENARIO_PROBS):
+    """
+    Membuat keyframe (tiap `freq`, ditambah titik akhir window) untuk semua window gap [(start, end), ...].
+    Return DataFrame keyframe dengan kolom tambahan 'window' (nomor window).
+    """
+    names = list(scenarios)
+    table = np.array([scenarios[k] for k in names], dtype='float64')
+    p = np.array([probs[k] for k in names], dtype='float64')
+
+    # Titik akhir window ikut jadi keyframe agar seluruh window terisi (gap hasil deteksi tidak kelipatan freq)
+    stamps = [pd.date_range(start=start, end=end, freq=freq).union([pd.Timestamp(end)]) for start, end in windows]
+    window_id = np.repeat(np.arange(len(stamps)), [len(s) for s in stamps])
+    n = len(window_id)
+
+    # Satu kali draw untuk skenario, occupancy, dan 4 sensor seluruh keyframe
+    params = table[rng.choice(len(names), size=n, p=p)]
+    occupancy = rng.integers(params[:, 0], params[:, 1] + 1)
+    sensors = rng.uniform(params[:, [2, 4, 6, 8]], params[:, [3, 5, 7, 9]])
+
+    keyframes = pd.DataFrame(sensors, columns=SENSOR_COLUMNS)
+    keyframes.insert(0, 'occupancy', occupancy)
+    keyframes.insert(0, 'timestamp', np.concatenate([s.values for s in stamps]) if stamps else [])
+    keyframes.insert(0, 'window', window_id)
+    return keyframes
+
+
+def iter_gap_rows(keyframes, resolution='s', chunk_rows=CHUNK_ROWS, dtype='float64'):
+    """
+    Interpolasi linear keyframe ke resolusi `resolution`, di-yield per chunk (maks. chunk_rows baris).
+    Tiap window diinterpolasi sendiri (tidak menyambung antar window).
+    """
+    step = pd.Timedelta(to_offset(resolution)).value
+    for _, key in keyframes.groupby('window', sort=True):
+        key_t = key['timestamp'].to_numpy(dtype='datetime64[ns]').astype('int64')
+        key_v = {col: key[col].to_numpy(dtype='float64') for col in ['occupancy'] + SENSOR_COLUMNS}
+        n_rows = (key_t[-1] - key_t[0]) // step + 1
+        for start in range(0, n_rows, chunk_rows):
+            t = key_t[0] + step * np.arange(start, min(start + chunk_rows, n_rows), dtype='int64')
+            chunk = pd.DataFrame({'timestamp': t.astype('datetime64[ns]')})
+            chunk['occupancy'] = np.round(np.interp(t, key_t, key_v['occupancy'])).astype(int)
+            for col in SENSOR_COLUMNS:
+                chunk[col] = np.interp(t, key_t, key_v[col]).astype(dtype)
+            yield chunk
+
+
+def iter_gap_data(windows, seed=None, rng=None, freq=KEYFRAME_FREQ, resolution='s',
+                  chunk_rows=CHUNK_ROWS, dtype='float64'):
+    """Generator data gap per chunk untuk satu atau banyak window."""
+    rng = rng if rng is not None else np.random.default_rng(seed)
+    keyframes = generate_gap_keyframes(windows, rng, freq=freq)
+    yield from iter_gap_rows(keyframes, resolution=resolution, chunk_rows=chunk_rows, dtype=dtype)
+
+
+def generate_gap_data(windows, seed=None, rng=None, freq=KEYFRAME_FREQ, resolution='s', dtype='float64'):
+    """Sama seperti iter_gap_data, tapi langsung digabung menjadi satu DataFrame."""
+    chunks = list(iter_gap_data(windows, seed=seed, rng=rng, freq=freq, resolution=resolution, dtype=dtype))
+    if not chunks:
+        return pd.DataFrame(columns=GAP_COLUMNS)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def synthesize_occupancy(temps, seed=None, rng=None, bands=OCCUPANCY_BANDS, fallback=OCCUPANCY_FALLBACK):
+    """
+    Memberikan jumlah orang yang COCOK dengan suhu sensor asli, untuk seluruh kolom sekaligus.
+    Band suhu ditentukan sekali jalan, lalu occupancy tiap band diambil dalam satu batch.
+    """
+    rng = rng if rng is not None else np.random.default_rng(seed)
+    t = np.asarray(temps, dtype='float64')
+    upper = np.array([b[0] for b in bands[:-1]], dtype='float64')
+    band = np.searchsorted(upper, t, side='left')
+    band[np.isnan(t)] = len(bands)
+
+    occupancy = np.zeros(len(t), dtype='int64')
+    for i, (occ_min, occ_max) in enumerate([b[1:] for b in bands] + [fallback]):
+        mask = band == i
+        n = int(mask.sum())
+        if n:
+            occupancy[mask] = rng.integers(occ_min, occ_max, size=n)
+    return occupancy
@@ -0,0 +1,146 @@
+"""
+Fitur temporal (rolling mean/std, lag, rate of change) untuk time series per detik.
+
+Window berbasis waktu, bukan jumlah baris: window `w` untuk baris di waktu t berisi semua
+baris dengan t - w < timestamp <= t, jadi gap (detik yang hilang / data Invalid yang dibuang)
+tidak membuat window "meminjam" data yang lebih lama. Lag `w` adalah nilai tepat pada t - w
+(NaN jika detik itu tidak ada), rate of change = (x_t - lag) / w per detik.
+
+Perhitungan memakai prefix sum (sum, sum kuadrat, jumlah nilai valid) lalu batas window dicari
+dengan searchsorted, tanpa loop per baris. Data bisa diproses per chunk: TemporalFeatures
+menyimpan ekor data tiap ruangan sepanjang window terbesar, sehingga hasil per chunk sama
+dengan hasil sekali jalan. Class yang sama dipakai untuk data training (feature_engineering.py)
+dan jalur online (inference_server.py).
+"""
+import numpy as np
+import pandas as pd
+
+WINDOWS = {'30s': 30, '5min': 300, '1h': 3600}  # nama -> detik
+COLUMNS = ['temp', 'hum', 'lux', 'noise']
+STATS = ('mean', 'std', 'lag', 'roc')
+TIMESTAMP = 'timestamp'
+ROOM = 'room_id'
+_NS = 1_000_000_000
+
+
+def feature_names(columns=COLUMNS, windows=WINDOWS):
+    return [f'{col}_{stat}_{name}' for col in columns for name in windows for stat in STATS]
+
+
+def _window_features(ts, values, start, windows, fill):
+    """Fitur untuk baris ts[start:], memakai baris sebelumnya (ekor chunk lalu) sebagai konteks."""
+    n, k = values.shape
+    current = values[start:]
+    valid = ~np.isnan(values)
+    # Nilai digeser ke rata-rata chunk agar prefix sum kuadrat tidak kehilangan presisi
+    ref = np.nan_to_num(np.nanmean(values, axis=0)) if valid.any() else np.zeros(k)
+    x = np.where(valid, values - ref, 0.0)
+    # Prefix sum dalam longdouble: selisih dua prefix besar tetap presisi untuk window kecil
+    zeros = np.zeros((1, k), dtype=np.longdouble)
+    x = x.astype(np.longdouble)
+    csum = np.concatenate([zeros, np.cumsum(x, axis=0)])
+    csum2 = np.concatenate([zeros, np.cumsum(x * x, axis=0)])
+    ccount = np.concatenate([zeros, np.cumsum(valid, axis=0)])
+
+    query = ts[start:]
+    right = np.arange(start, n) + 1
+    out = {}
+    for name, seconds in windows.items():
+        target = query - seconds * _NS
+        left = np.searchsorted(ts, target, side='right')
+        count = ccount[right] - ccount[left]
+        s = csum[right] - csum[left]
+        s2 = csum2[right] - csum2[left]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = (s / count).astype('float64') + ref
+            var = ((s2 - s * s / count) / (count - 1)).astype('float64')
+        std = np.sqrt(np.maximum(var, 0.0))
+        std[count < 2] = np.nan
+
+        pos = np.searchsorted(ts, target, side='left')
+        hit = (pos < n) & (ts[np.minimum(pos, n - 1)] == target)
+        lag = np.where(hit[:, None], values[np.minimum(pos, n - 1)], np.nan)
+        roc = (current - lag) / seconds
+
+        if fill:
+            # Model tidak menerima NaN: awal data / setelah gap dianggap stabil
+            mean = np.where(np.isnan(mean), current, mean)
+            std = np.nan_to_num(std, nan=0.0)
+            lag = np.where(np.isnan(lag), current, lag)
+            roc = np.nan_to_num(roc, nan=0.0)
+        out[name] = {'mean': mean, 'std': std, 'lag': lag, 'roc': roc}
+    return out
+
+
+class TemporalFeatures:
+    """
+    Transformer stateful: `transform(chunk)` -> DataFrame fitur dengan index yang sama.
+    Chunk per ruangan harus berurutan waktu (timestamp naik, tanpa duplikat).
+    """
+
+    def __init__(self, columns=COLUMNS, windows=WINDOWS, room_column=ROOM, fill=True):
+        self.columns = list(columns)
+        self.windows = dict(windows)
+        self.room_column = room_column
+        self.fill = fill
+        self.horizon = max(self.windows.values()) * _NS
+        self._tails = {}  # room -> (timestamp int64 ns, values [n, k])
+
+    @property
+    def names(self):
+        return feature_names(self.columns, self.windows)
+
+    def reset(self):
+        self._tails = {}
+
+    def _groups(self, df):
+        if self.room_column in df.columns:
+            codes, rooms = pd.factorize(df[self.room_column], sort=False, use_na_sentinel=False)
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(rooms) + 1))
+            return [(rooms[i], order[bounds[i]:bounds[i + 1]]) for i in range(len(rooms))]
+        return [(None, np.arange(len(df)))]
+
+    def last_timestamp(self, room=None):
+        tail = self._tails.get(room)
+        return pd.Timestamp(tail[0][-1]) if tail is not None and len(tail[0]) else None
+
+    def is_late(self, room, timestamp):
+        """True jika timestamp tidak lebih baru dari data terakhir ruangan (tidak bisa diproses)."""
+        last = self.last_timestamp(room)
+        return last is not None and pd.Timestamp(timestamp) <= last
+
+    def transform(self, df):
+        out = np.full((len(df), len(self.names)), np.nan)
+        if len(df) == 0:
+            return pd.DataFrame(out, index=df.index, columns=self.names)
+        all_ts = pd.to_datetime(df[TIMESTAMP]).to_numpy(dtype='datetime64[ns]').view('int64')
+        all_values = df[self.columns].to_numpy(dtype='float64')
+
+        for room, pos in self._groups(df):
+            pos = pos[np.argsort(all_ts[pos], kind='stable')]
+            ts, values = all_ts[pos], all_values[pos]
+            tail_ts, tail_values = self._tails.get(room, (np.empty(0, 'int64'), np.empty((0, len(self.columns)))))
+            if np.any(np.diff(ts) <= 0) or (len(tail_ts) and ts[0] <= tail_ts[-1]):
+                raise ValueError(f"Timestamp ruangan {room!r} harus naik & lebih baru dari chunk sebelumnya")
+
+            ts = np.concatenate([tail_ts, ts])
+            values = np.concatenate([tail_values, values])
+            feats = _window_features(ts, values, len(tail_ts), self.windows, self.fill)
+            col = 0
+            for c in range(len(self.columns)):
+                for name in self.windows:
+                    for stat in STATS:
+                        out[pos, col] = feats[name][stat][:, c]
+                        col += 1
+
+            # Ekor cukup sepanjang window terbesar (lag butuh tepat t - horizon)
+            keep = np.searchsorted(ts, ts[-1] - self.horizon, side='left')
+            self._tails[room] = (ts[keep:].copy(), values[keep:].copy())
+        return pd.DataFrame(out, index=df.index, columns=self.names)
+
+
+def add_temporal_features(df, columns=COLUMNS, windows=WINDOWS, fill=True):
+    """Versi batch: seluruh DataFrame sebagai satu chunk."""
+    features = TemporalFeatures(columns, windows, fill=fill).transform(df)
+    return pd.concat([df, features], axis=1)
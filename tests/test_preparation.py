@@ -0,0 +1,48 @@
+"""
+Regresi 03 -> feature_engineering pada clean_data.csv contoh:
+window sintetis tambahan tidak boleh menggandakan timestamp (gap panjang terdeteksi sudah mencakupnya).
+
+    python -m pytest -q tests/
+"""
+import os
+import shutil
+import subprocess
+import sys
+
+import pandas as pd
+
+import aggregation
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_script(name, cwd):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, os.path.join(ROOT, name)], cwd=cwd, env=env,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout[-2000:] + result.stderr[-2000:]
+
+
+def test_final_preparation_then_features(tmp_path):
+    shutil.copy(os.path.join(ROOT, 'clean_data.csv'), tmp_path)
+    run_script('03_final_preparation.py', tmp_path)
+    train = pd.read_parquet(tmp_path / 'train_data.parquet')
+    assert train['timestamp'].is_unique
+    assert train['timestamp'].is_monotonic_increasing
+
+    run_script('feature_engineering.py', tmp_path)
+    features = pd.read_parquet(tmp_path / 'train_features.parquet')
+    assert len(features) == len(train)
+
+
+def test_trim_windows_skips_data_and_detected_gaps():
+    ts = pd.to_datetime(['2025-01-01 00:00:00', '2025-01-01 00:00:01', '2025-01-01 00:01:00'])
+    detected = [(pd.Timestamp('2025-01-01 00:00:10'), pd.Timestamp('2025-01-01 00:00:20'))]
+    windows = aggregation.trim_windows([('2024-12-31 23:59:58', '2025-01-01 00:01:01')], ts, occupied=detected)
+    assert windows == [(pd.Timestamp(a), pd.Timestamp(b)) for a, b in [
+        ('2024-12-31 23:59:58', '2024-12-31 23:59:59'),
+        ('2025-01-01 00:00:02', '2025-01-01 00:00:09'),
+        ('2025-01-01 00:00:21', '2025-01-01 00:00:59'),
+        ('2025-01-01 00:01:01', '2025-01-01 00:01:01'),
+    ]]
+    assert aggregation.trim_windows([('2025-01-01 00:00:12', '2025-01-01 00:00:15')], ts, occupied=detected) == []